@@ -1,14 +1,33 @@
 import pandas as pd
-from sklearn.neighbors import NearestNeighbors
-from sklearn.preprocessing import StandardScaler
 import os
 import logging
-from typing import List, Tuple
-from tabulate import tabulate
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, List, Optional, Tuple
 import time
 import sys
+import csv
+import json
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 
+from ann_index import IVFIndex, load_or_build_ann_index
+from compact_catalog import compact_frame
+from content_features import DEFAULT_CONTENT_WEIGHT, ContentIndex, blend_neighbors, load_or_build_content_index
+from data_snapshot import load_snapshot, read_snapshot_meta, save_snapshot
+import metrics
+from metrics import timed
+from neighbor_index import DEFAULT_CHUNK_SIZE, NeighborIndex, load_or_build_neighbor_index, topk_neighbors
+from recommender_engine import MODES, RECOMMENDER_MODE
+from response_cache import ResponseCache
+from title_index import TitleIndex
+
+if TYPE_CHECKING:
+    # scikit-learn hanya diimpor saat fitur dibangun dari CSV (snapshot belum ada)
+    from sklearn.neighbors import NearestNeighbors
+    from sklearn.preprocessing import StandardScaler
+
 # Konfigurasi logging
 logging.basicConfig(
     level=logging.INFO,
@@ -26,12 +45,14 @@ ANIME_BANNER = """
 ╚═══════════════════════════════════════════════════════════════════════════╝
 """
 
-LOADING_MESSAGES = [
-    "Menganalisis database anime...",
-    "Menghitung kesamaan antar anime...",
-    "Mempersiapkan rekomendasi terbaik...",
-    "Hampir selesai..."
-]
+# Kolom yang wajib ada di anime.csv
+REQUIRED_COLUMNS = ['name', 'rating', 'members', 'episodes']
+
+# Jumlah seed per tugas yang dikirim ke worker pada mode batch
+BATCH_CHUNK_SIZE = 64
+BATCH_FORMATS = ('jsonl', 'csv')
+BATCH_CSV_FIELDS = ['query', 'title', 'rank', 'name', 'rating', 'episodes', 'type', 'members', 'genre',
+                    'similarity_score']
 
 def validate_csv_file(file_path: str) -> bool:
     """
@@ -47,8 +68,7 @@ def validate_csv_file(file_path: str) -> bool:
         df = pd.read_csv(file_path, nrows=5)
         
         # Cek kolom yang diperlukan
-        required_columns = ['name', 'rating', 'members', 'episodes']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing_columns = [col for col in REQUIRED_COLUMNS if col not in df.columns]
         
         if missing_columns:
             logger.error(f"Kolom yang diperlukan tidak ditemukan: {', '.join(missing_columns)}")
@@ -59,12 +79,25 @@ def validate_csv_file(file_path: str) -> bool:
         logger.error(f"Error saat memvalidasi file: {str(e)}")
         return False
 
-def show_loading_animation():
-    """Menampilkan animasi loading"""
-    for message in LOADING_MESSAGES:
-        print(f"\r{message}", end="", flush=True)
-        time.sleep(0.5)
-    print("\n")
+@contextmanager
+def progress(message: str, stage: Optional[str] = None):
+    """
+    Menampilkan tahap yang sedang berjalan beserta durasi sebenarnya.
+
+    Jika `stage` diberikan, durasinya juga dicatat ke histogram metrik.
+    """
+    print(f"⏳ {message}...", end="", flush=True)
+    start = time.perf_counter()
+    try:
+        if stage:
+            with timed(stage):
+                yield
+        else:
+            yield
+    except BaseException:
+        print(" gagal")
+        raise
+    print(f" selesai ({(time.perf_counter() - start) * 1000:.0f} ms)")
 
 def ensure_data_folder():
     """
@@ -93,8 +126,13 @@ def ensure_data_folder():
             print("3. Jalankan program ini kembali")
             raise FileNotFoundError(f"File anime.csv tidak ditemukan di: {data_dir}")
         
-        # Validasi format file
-        if not validate_csv_file(anime_file):
+        # Validasi format file; jika snapshot masih valid cukup periksa metadatanya
+        meta = read_snapshot_meta(anime_file)
+        if meta is not None:
+            snapshot_columns = {column['name'] for column in meta['columns']}
+            if not all(col in snapshot_columns for col in REQUIRED_COLUMNS):
+                raise ValueError("Format file anime.csv tidak valid")
+        elif not validate_csv_file(anime_file):
             raise ValueError("Format file anime.csv tidak valid")
             
         return anime_file
@@ -102,6 +140,7 @@ def ensure_data_folder():
         logger.error(f"Error saat memeriksa folder data: {str(e)}")
         raise
 
+@timed('load_data')
 def load_data(file_path: str) -> pd.DataFrame:
     """Memuat dataset anime dari file CSV."""
     try:
@@ -129,10 +168,13 @@ def load_data(file_path: str) -> pd.DataFrame:
         logger.error(f"Error saat memuat data: {str(e)}")
         raise
 
-def prepare_features(df: pd.DataFrame) -> Tuple[pd.DataFrame, StandardScaler]:
+@timed('prepare_features')
+def prepare_features(df: pd.DataFrame) -> Tuple[pd.DataFrame, 'StandardScaler']:
     """
     Mempersiapkan fitur numerik untuk model rekomendasi, termasuk kolom tambahan.
     """
+    from sklearn.preprocessing import StandardScaler
+
     try:
         # Daftar kolom numerik potensial
         potential_features = ['rating', 'members', 'episodes', 'score', 'scored_by', 'rank', 'popularity', 'favorites']
@@ -158,7 +200,33 @@ def prepare_features(df: pd.DataFrame) -> Tuple[pd.DataFrame, StandardScaler]:
         logger.error(f"Error saat mempersiapkan fitur: {str(e)}")
         raise
 
-def create_model(features: pd.DataFrame, n_neighbors: int = 5) -> NearestNeighbors:
+@timed('load_dataset')
+def load_dataset(file_path: str, mmap: bool = False) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Memuat data bersih dan fitur ternormalisasi, memakai snapshot biner jika ada.
+
+    Snapshot yang masih valid dibaca langsung tanpa parsing CSV dan normalisasi;
+    jika tidak ada atau kedaluwarsa, data dibangun dari CSV lalu disimpan ulang.
+    Dengan `mmap=True` fitur dipetakan read-only ke memori dan dibagi antar
+    worker yang membuka snapshot yang sama. Data dikembalikan dalam bentuk
+    ringkas (`compact_frame`): kategori, int32 dan teks yang di-intern.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]: (data anime, fitur ternormalisasi)
+    """
+    snapshot = load_snapshot(file_path, mmap=mmap)
+    if snapshot is None:
+        data = compact_frame(load_data(file_path))
+        features_scaled, _ = prepare_features(data)
+        save_snapshot(file_path, data, features_scaled)
+        snapshot = load_snapshot(file_path, mmap=True) if mmap else None
+        if snapshot is None:
+            return data, features_scaled
+
+    data, features_scaled = snapshot
+    return compact_frame(data), features_scaled
+
+def create_model(features: pd.DataFrame, n_neighbors: int = 5) -> 'NearestNeighbors':
     """
     Membuat dan melatih model k-NN.
     
@@ -169,22 +237,41 @@ def create_model(features: pd.DataFrame, n_neighbors: int = 5) -> NearestNeighbo
     Returns:
         NearestNeighbors: Model k-NN yang telah dilatih
     """
+    from sklearn.neighbors import NearestNeighbors
+
     model = NearestNeighbors(n_neighbors=n_neighbors)
     return model.fit(features)
 
-def find_exact_anime(query: str, df: pd.DataFrame) -> pd.DataFrame:
+@timed('find_exact_anime')
+def find_exact_anime(query: str, df: pd.DataFrame, title_index: Optional[TitleIndex] = None,
+                     fuzzy_limit: int = 5) -> pd.DataFrame:
     """
     Mencari anime yang namanya sesuai dengan query.
+
+    Jika `title_index` tersedia dan tidak ada judul yang mengandung query,
+    judul yang paling mirip (toleran salah ketik) dikembalikan sebagai gantinya
+    dan ditandai dengan `matches.attrs['fuzzy'] = True`.
     
     Args:
         query (str): Nama anime yang dicari
         df (pd.DataFrame): DataFrame anime
+        title_index (TitleIndex): Indeks judul yang dibangun dari `df` (opsional)
+        fuzzy_limit (int): Jumlah kandidat mirip maksimum
     
     Returns:
         pd.DataFrame: DataFrame berisi anime yang ditemukan
     """
+    if title_index is not None:
+        # Ambil kandidat dari posting list trigram tanpa memindai DataFrame
+        matches = df.iloc[title_index.contains(query)]
+        if matches.empty and fuzzy_limit > 0:
+            similar = title_index.similar(query, limit=fuzzy_limit)
+            matches = df.iloc[[pos for pos, _ in similar]]
+            matches.attrs['fuzzy'] = bool(similar)
+        return matches
+
     # Mencari anime yang namanya mengandung query (case insensitive)
-    return df[df['name'].str.lower().str.contains(query.lower(), na=False)]
+    return df[df['name'].str.lower().str.contains(query.lower(), na=False, regex=False)]
 
 def display_anime_list(matches: pd.DataFrame):
     """
@@ -205,19 +292,100 @@ def display_anime_list(matches: pd.DataFrame):
             print(f"   🏷️  Genre       : {anime['genre']}")
         print("─"*100)
 
-def recommend_anime(anime_name: str, df: pd.DataFrame, features_scaled: pd.DataFrame, n_recommendations: int = 5) -> Tuple[List[dict], pd.Series]:
+def _build_recommendations(df: pd.DataFrame, features_scaled: pd.DataFrame, target_pos: int,
+                           n_recommendations: int,
+                           neighbor_index: Optional[NeighborIndex] = None,
+                           ann_index: Optional[IVFIndex] = None,
+                           content_index: Optional[ContentIndex] = None,
+                           content_weight: float = 0.0) -> List[dict]:
+    """Rekomendasi (dengan skor kemiripan) untuk anime pada posisi baris tertentu."""
+    blend = content_index is not None and content_weight > 0
+    # Saat dicampur dengan skor konten, ambil kandidat numerik lebih banyak
+    n_candidates = max(n_recommendations, content_index.k) if blend else n_recommendations
+    with timed('neighbor_search'):
+        if ann_index is not None:
+            # Pencarian aproksimasi lewat klaster IVF terdekat
+            recommended_pos, rec_distances = ann_index.query(target_pos, n_candidates)
+        elif neighbor_index is not None and neighbor_index.k >= n_candidates:
+            # Ambil tetangga langsung dari tabel yang sudah dihitung
+            recommended_pos, rec_distances = neighbor_index.query(target_pos, n_candidates)
+        else:
+            # Hitung jarak hanya untuk anime target dengan seleksi parsial
+            indices, distances = topk_neighbors(features_scaled.values, np.array([target_pos]), n_candidates)
+            recommended_pos, rec_distances = indices[0], distances[0]
+
+    if blend:
+        with timed('content_blend'):
+            # Skor gabungan kemiripan numerik dan kosinus sinopsis/genre
+            recommended_pos, similarities = blend_neighbors(target_pos, features_scaled.values, content_index,
+                                                            recommended_pos, n_recommendations, content_weight)
+    else:
+        # Untuk menghitung similarity score, kita bisa menggunakan 1 - (jarak / jarak_maksimum)
+        # Untuk jarak maksimum, kita bisa ambil jarak terjauh dari rekomendasi yang dipilih
+        max_distance_in_recs = rec_distances.max() if len(rec_distances) else 0
+        # Hindari pembagian dengan nol jika hanya ada satu rekomendasi
+        similarities = 1 - (rec_distances / max_distance_in_recs) if max_distance_in_recs > 0 \
+            else np.ones(len(rec_distances))
+
+    with timed('build_results'):
+        recommendations = []
+        for pos, similarity_score in zip(recommended_pos, similarities):
+            anime = df.iloc[pos]
+            recommendations.append({
+                'name': anime['name'],
+                'rating': anime['rating'],
+                'episodes': anime['episodes'],
+                'type': anime.get('type', 'Unknown'),
+                'members': anime['members'],
+                'genre': anime.get('genre', 'Unknown'),
+                'similarity_score': float(similarity_score)
+            })
+
+    return recommendations
+
+def recommend_anime(anime_name: str, df: pd.DataFrame, features_scaled: pd.DataFrame, n_recommendations: int = 5,
+                    neighbor_index: Optional[NeighborIndex] = None,
+                    title_index: Optional[TitleIndex] = None,
+                    cache: Optional[ResponseCache] = None,
+                    version: str = '',
+                    ann_index: Optional[IVFIndex] = None,
+                    content_index: Optional[ContentIndex] = None,
+                    content_weight: float = 0.0) -> Tuple[List[dict], pd.Series]:
     """
     Memberikan rekomendasi anime berdasarkan nama anime yang diberikan menggunakan k-NN manual.
+
+    Jika `neighbor_index` tersedia, tetangga dibaca langsung dari tabel yang
+    sudah dihitung sebelumnya sehingga tidak perlu menghitung jarak ke semua anime.
+    Jika `ann_index` tersedia, tetangga dicari secara aproksimasi lewat indeks IVF.
+    Jika `content_index` tersedia dan `content_weight` > 0, skor akhir mencampur
+    kemiripan numerik dengan kemiripan sinopsis dan genre.
+
+    Jika `cache` tersedia, query yang langsung menunjuk satu judul dijawab dari
+    cache. Query yang perlu dipilih dari daftar tetap ditanyakan ke user, tetapi
+    rekomendasi untuk judul pilihannya diambil dari cache.
     """
     try:
+        query_key = ResponseCache.make_key('recommend', anime_name, n_recommendations, version=version)
+        if cache is not None:
+            cached = cache.get(query_key)
+            if cached is not None:
+                return cached
+
         # Mencari anime yang sesuai dengan nama yang dicari
-        matching_animes = find_exact_anime(anime_name, df)
+        matching_animes = find_exact_anime(anime_name, df, title_index)
 
         if matching_animes.empty:
             print(f"\n❌ Anime dengan nama '{anime_name}' tidak ditemukan dalam database.")
             print("💡 Cobalah mencari dengan kata kunci lain atau pastikan ejaan sudah benar.")
             return [], None
 
+        if matching_animes.attrs.get('fuzzy'):
+            print(f"\n💡 Tidak ada judul yang mengandung '{anime_name}'.")
+            if len(matching_animes) == 1:
+                print(f"   Menggunakan judul yang paling mirip: {matching_animes.iloc[0]['name']}")
+            else:
+                print("   Mungkin maksud Anda salah satu judul berikut:")
+
         if len(matching_animes) > 1:
             display_anime_list(matching_animes)
             print(f"\n💫 Silakan pilih nomor anime yang Anda inginkan (1-{len(matching_animes)}): ")
@@ -225,7 +393,6 @@ def recommend_anime(anime_name: str, df: pd.DataFrame, features_scaled: pd.DataF
                 choice = int(input("➤ "))
                 if 1 <= choice <= len(matching_animes):
                     target_anime = matching_animes.iloc[choice-1]
-                    target_anime_idx = target_anime.name
                 else:
                     print("\n❌ Nomor yang Anda pilih tidak valid.")
                     return [], None
@@ -234,50 +401,210 @@ def recommend_anime(anime_name: str, df: pd.DataFrame, features_scaled: pd.DataF
                 return [], None
         else:
             target_anime = matching_animes.iloc[0]
-            target_anime_idx = target_anime.name
 
-        # Mendapatkan fitur anime target
-        target_features = features_scaled.iloc[target_anime_idx].values.reshape(1, -1)
+        # Posisi baris anime target (fitur selalu berindeks posisi 0..n-1)
+        target_pos = df.index.get_loc(target_anime.name)
 
-        # Menghitung jarak Euclidean antara anime target dan semua anime lain
-        # Menggunakan broadcasting untuk efisiensi
-        distances = np.linalg.norm(features_scaled.values - target_features, axis=1)
+        def compute() -> List[dict]:
+            return _build_recommendations(df, features_scaled, target_pos, n_recommendations, neighbor_index,
+                                          ann_index, content_index, content_weight)
 
-        # Membuat DataFrame sementara untuk menyimpan jarak dan index asli
-        distances_df = pd.DataFrame({'distance': distances, 'index': df.index})
-
-        # Mengurutkan berdasarkan jarak dan mengambil n_recommendations teratas (kecuali anime target itu sendiri)
-        # Pastikan untuk mengecualikan anime target itu sendiri dari hasil
-        recommended_indices = distances_df.sort_values(by='distance')['index'].tolist()
-        recommended_indices = [idx for idx in recommended_indices if idx != target_anime_idx][:n_recommendations]
-
-        recommendations = []
-        # Untuk menghitung similarity score, kita bisa menggunakan 1 - (jarak / jarak_maksimum)
-        # Untuk jarak maksimum, kita bisa ambil jarak terjauh dari rekomendasi yang dipilih
-        max_distance_in_recs = distances_df[distances_df['index'].isin(recommended_indices)]['distance'].max()
-
-        for idx in recommended_indices:
-            anime = df.iloc[idx]
-            # Hitung similarity score
-            distance_to_rec = distances_df[distances_df['index'] == idx]['distance'].iloc[0]
-            # Hindari pembagian dengan nol jika hanya ada satu rekomendasi
-            similarity_score = 1 - (distance_to_rec / max_distance_in_recs) if max_distance_in_recs > 0 else 1
-
-            recommendations.append({
-                'name': anime['name'],
-                'rating': anime['rating'],
-                'episodes': anime['episodes'],
-                'type': anime.get('type', 'Unknown'),
-                'members': anime['members'],
-                'genre': anime.get('genre', 'Unknown'),
-                'similarity_score': similarity_score
-            })
+        if cache is None:
+            return compute(), target_anime
 
+        recommendations = cache.get_or_compute('recommend_title', target_anime['name'], compute,
+                                               k=n_recommendations, version=version)
+        if len(matching_animes) == 1 and not matching_animes.attrs.get('fuzzy'):
+            cache.put(query_key, (recommendations, target_anime))
         return recommendations, target_anime
     except Exception as e:
         logger.error(f"Error saat memberikan rekomendasi: {str(e)}")
         return [], None
 
+def recommend_many(indices, features_scaled: pd.DataFrame, k: int = 5,
+                   block_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Memberikan rekomendasi untuk banyak anime sekaligus tanpa interaksi.
+
+    Jarak dihitung sebagai perkalian matriks per blok atas `features_scaled`,
+    sehingga cocok untuk job terjadwal atas seluruh katalog.
+
+    Args:
+        indices: Posisi baris anime seed (mis. `range(len(df))` untuk seluruh katalog)
+        features_scaled (pd.DataFrame): Fitur yang telah dinormalisasi
+        k (int): Jumlah rekomendasi per anime
+        block_size (int): Jumlah seed per blok perkalian matriks
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Posisi anime rekomendasi (n_seeds x k, int32)
+        dan skor kemiripannya (n_seeds x k, float32) dengan rumus yang sama
+        seperti `recommend_anime`.
+    """
+    features = features_scaled.values if isinstance(features_scaled, pd.DataFrame) else features_scaled
+    seeds = np.asarray(indices, dtype=np.int64)
+    rec_indices, distances = topk_neighbors(features, seeds, k, chunk_size=block_size)
+
+    # Skor kemiripan: 1 - (jarak / jarak terjauh di antara rekomendasi tiap seed)
+    max_distances = distances.max(axis=1, keepdims=True) if distances.shape[1] else distances[:, :1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.where(max_distances > 0, 1 - distances / max_distances, 1).astype(np.float32)
+
+    return rec_indices, scores
+
+def resolve_seed(query: str, df: pd.DataFrame, title_index: TitleIndex) -> Optional[int]:
+    """
+    Memilih satu judul untuk query tanpa bertanya ke user (mode batch).
+
+    Aturannya deterministik: judul yang sama persis, lalu judul yang mengandung
+    query, lalu judul yang paling mirip. Jika ada beberapa kandidat, dipilih
+    yang member-nya terbanyak, lalu yang posisinya paling awal di katalog.
+
+    Returns:
+        Optional[int]: Posisi baris anime, atau None jika tidak ada yang cocok
+    """
+    candidates = title_index.exact(query) or title_index.contains(query).tolist()
+    if not candidates:
+        similar = title_index.similar(query, limit=1)
+        return similar[0][0] if similar else None
+    members = df['members'].to_numpy()
+    return min(candidates, key=lambda pos: (-members[pos], pos))
+
+# State worker mode batch; diisi sekali per proses oleh `_init_batch_worker`
+_batch_state = {}
+
+def _init_batch_worker(csv_path: str, mode: str, nprobe: Optional[int], content_weight: float):
+    """Membuka snapshot (fitur di-mmap, dibagi antar worker) dan indeks yang sudah dibangun proses utama."""
+    df, features_scaled = load_dataset(csv_path, mmap=True)
+    state = {'df': df, 'features_scaled': features_scaled, 'content_weight': content_weight,
+             'neighbor_index': None, 'ann_index': None, 'content_index': None}
+    if mode == 'ann':
+        state['ann_index'] = load_or_build_ann_index(features_scaled.values, csv_path, nprobe=nprobe)
+    else:
+        state['neighbor_index'] = load_or_build_neighbor_index(features_scaled.values, csv_path)
+    if content_weight > 0:
+        state['content_index'] = load_or_build_content_index(df, csv_path)
+    _batch_state.update(state)
+
+def _plain(value):
+    """Nilai NumPy/NaN menjadi tipe Python biasa agar bisa ditulis ke JSON."""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
+
+def _recommend_batch(seeds: List[Tuple[str, Optional[int]]], n_recommendations: int) -> List[dict]:
+    """Rekomendasi untuk satu potongan seed (dijalankan di worker)."""
+    state = _batch_state
+    results = []
+    for query, position in seeds:
+        if position is None:
+            results.append({'query': query, 'title': None, 'recommendations': []})
+            continue
+        recommendations = _build_recommendations(state['df'], state['features_scaled'], position,
+                                                 n_recommendations, state['neighbor_index'],
+                                                 state['ann_index'], state['content_index'],
+                                                 state['content_weight'])
+        results.append({
+            'query': query,
+            'title': str(state['df'].iloc[position]['name']),
+            'recommendations': [{key: _plain(value) for key, value in rec.items()} for rec in recommendations]
+        })
+    return results
+
+def _read_seed_chunks(lines, df: pd.DataFrame, title_index: TitleIndex, chunk_size: int = BATCH_CHUNK_SIZE):
+    """Membaca judul seed per baris (baris kosong dilewati) dan meresolusinya per potongan."""
+    chunk = []
+    for line in lines:
+        query = line.strip()
+        if not query:
+            continue
+        chunk.append((query, resolve_seed(query, df, title_index)))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _write_batch_results(results: List[dict], writer, output_format: str, output):
+    """Menulis hasil satu potongan seed sebagai JSONL atau baris CSV."""
+    for result in results:
+        if output_format == 'jsonl':
+            output.write(json.dumps(result, ensure_ascii=False) + "\n")
+            continue
+        if not result['recommendations']:
+            writer.writerow({'query': result['query'], 'title': result['title']})
+        for rank, rec in enumerate(result['recommendations'], 1):
+            writer.writerow(dict(rec, query=result['query'], title=result['title'], rank=rank))
+    output.flush()
+
+def run_batch(input_file, output, csv_path: str, n_recommendations: int = 5, output_format: str = 'jsonl',
+              workers: Optional[int] = None, mode: str = RECOMMENDER_MODE, nprobe: Optional[int] = None,
+              content_weight: float = 0.0) -> int:
+    """
+    Mode batch: membaca judul seed per baris dan menulis rekomendasinya secara streaming.
+
+    Judul diresolusi di proses utama dengan `resolve_seed` (tanpa prompt), lalu
+    potongan seed dikerjakan oleh pool proses. Setiap worker membuka snapshot
+    yang sama sehingga matriks fitur dibagi lewat mmap, bukan disalin. Hasil
+    ditulis sesuai urutan input begitu potongannya selesai; jumlah potongan
+    yang sedang dikerjakan dibatasi agar input dari stdin tetap mengalir.
+
+    Args:
+        input_file: File teks berisi satu judul per baris
+        output: File tujuan (JSONL atau CSV)
+        csv_path (str): Lokasi data/anime.csv
+        n_recommendations (int): Jumlah rekomendasi per seed
+        output_format (str): 'jsonl' atau 'csv'
+        workers (int): Jumlah proses worker (default: jumlah CPU; 1 = tanpa pool)
+        mode (str): 'exact' atau 'ann'
+        nprobe (int): Jumlah klaster IVF yang diperiksa pada mode ann
+        content_weight (float): Bobot kemiripan sinopsis/genre
+
+    Returns:
+        int: Jumlah seed yang diproses
+    """
+    # Proses utama membangun snapshot dan indeks lebih dulu agar worker cukup memuatnya
+    df, features_scaled = load_dataset(csv_path, mmap=True)
+    title_index = TitleIndex(df['name'])
+    if mode == 'ann':
+        load_or_build_ann_index(features_scaled.values, csv_path, nprobe=nprobe)
+    else:
+        load_or_build_neighbor_index(features_scaled.values, csv_path)
+    if content_weight > 0:
+        load_or_build_content_index(df, csv_path)
+
+    writer = csv.DictWriter(output, fieldnames=BATCH_CSV_FIELDS, extrasaction='ignore') \
+        if output_format == 'csv' else None
+    if writer is not None:
+        writer.writeheader()
+
+    workers = workers or os.cpu_count() or 1
+    chunks = _read_seed_chunks(input_file, df, title_index)
+    processed = 0
+    if workers == 1:
+        _init_batch_worker(csv_path, mode, nprobe, content_weight)
+        for chunk in chunks:
+            _write_batch_results(_recommend_batch(chunk, n_recommendations), writer, output_format, output)
+            processed += len(chunk)
+        return processed
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(csv_path, mode, nprobe, content_weight)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append((len(chunk), executor.submit(_recommend_batch, chunk, n_recommendations)))
+            if len(pending) >= workers * 2:
+                size, future = pending.popleft()
+                _write_batch_results(future.result(), writer, output_format, output)
+                processed += size
+        while pending:
+            size, future = pending.popleft()
+            _write_batch_results(future.result(), writer, output_format, output)
+            processed += size
+    return processed
+
+@timed('render')
 def display_recommendations(recommendations: List[dict], target_anime):
     """Menampilkan rekomendasi dalam format tabel yang menarik."""
     if not recommendations:
@@ -315,20 +642,95 @@ def display_recommendations(recommendations: List[dict], target_anime):
     
     print("\n" + "="*100)
 
-def main():
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sistem Rekomendasi Anime")
+    parser.add_argument('--profile', action='store_true',
+                        help="Ukur waktu setiap tahap dan tampilkan ringkasannya saat keluar")
+    parser.add_argument('--metrics-file',
+                        help="Tulis histogram waktu per tahap (format teks Prometheus) ke file ini saat keluar")
+    parser.add_argument('--mode', choices=MODES, default=RECOMMENDER_MODE,
+                        help="Pencarian tetangga exact atau aproksimasi (ann, indeks IVF)")
+    parser.add_argument('--nprobe', type=int,
+                        help="Jumlah klaster IVF yang diperiksa per query pada mode ann (recall vs latensi)")
+    parser.add_argument('--check-recall', action='store_true',
+                        help="Pada mode ann, ukur recall@10 terhadap pencarian exact saat indeks dimuat")
+    parser.add_argument('--content-weight', type=float, default=DEFAULT_CONTENT_WEIGHT,
+                        help="Bobot kemiripan sinopsis/genre terhadap kemiripan numerik (0-1, 0 = hanya numerik)")
+    parser.add_argument('--batch', metavar='FILE',
+                        help="Mode non-interaktif: baca judul seed per baris dari FILE ('-' untuk stdin)")
+    parser.add_argument('--format', choices=BATCH_FORMATS, default='jsonl',
+                        help="Format keluaran mode batch")
+    parser.add_argument('--output', metavar='FILE',
+                        help="File keluaran mode batch (default: stdout)")
+    parser.add_argument('--workers', type=int,
+                        help="Jumlah proses worker mode batch (default: jumlah CPU)")
+    parser.add_argument('-n', '--recommendations', type=int, default=5,
+                        help="Jumlah rekomendasi per judul pada mode batch")
+    args = parser.parse_args(argv)
+    if not 0 <= args.content_weight <= 1:
+        parser.error("--content-weight harus di antara 0 dan 1")
+    return args
+
+def report_metrics(args: argparse.Namespace, stream=None):
+    """Menampilkan ringkasan `--profile` dan menulis `--metrics-file` jika diminta."""
+    if args.profile:
+        print("\n" + metrics.format_summary(), file=stream)
+    if args.metrics_file:
+        with open(args.metrics_file, "w", encoding="utf-8") as f:
+            f.write(metrics.render_prometheus())
+        logger.info(f"Metrik ditulis ke: {args.metrics_file}")
+
+def main_batch(args: argparse.Namespace):
+    """Mode batch: hanya hasil yang ditulis ke stdout, log dan ringkasan ke stderr."""
+    try:
+        anime_file = ensure_data_folder()
+        input_file = sys.stdin if args.batch == '-' else open(args.batch, "r", encoding="utf-8")
+        output = open(args.output, "w", encoding="utf-8", newline='') if args.output else sys.stdout
+        try:
+            with timed('batch'):
+                count = run_batch(input_file, output, anime_file, args.recommendations, args.format,
+                                  args.workers, args.mode, args.nprobe, args.content_weight)
+        finally:
+            if input_file is not sys.stdin:
+                input_file.close()
+            if output is not sys.stdout:
+                output.close()
+        logger.info(f"Mode batch selesai: {count} judul diproses")
+        report_metrics(args, sys.stderr)
+    except Exception as e:
+        logger.error(f"Error saat menjalankan mode batch: {str(e)}")
+        sys.exit(1)
+
+def main(argv=None):
     """Fungsi utama program."""
+    args = parse_args(argv)
+    if args.profile or args.metrics_file:
+        metrics.enable()
+    if args.batch:
+        main_batch(args)
+        return
     try:
         print(ANIME_BANNER)
         
         # Memastikan folder dan file yang diperlukan tersedia
         anime_file = ensure_data_folder()
         
-        # Memuat dan mempersiapkan data
-        print("\n📚 Memuat database anime...")
-        anime_data = load_data(anime_file)
+        # Memuat dan mempersiapkan data (langsung dari snapshot jika masih valid)
+        print()
+        with progress("📚 Memuat database anime"):
+            anime_data, features_scaled = load_dataset(anime_file)
+        with progress("🔤 Membangun indeks judul"):
+            title_index = TitleIndex(anime_data['name'])
+
+        # Cache respons untuk query yang berulang dalam satu sesi
+        response_cache = ResponseCache()
+        snapshot_meta = read_snapshot_meta(anime_file)
+        data_version = snapshot_meta['source']['sha256'][:16] if snapshot_meta else ''
         
-        # Cache untuk fitur
-        features_scaled = None
+        # Cache untuk indeks tetangga (exact) atau indeks IVF (ann)
+        neighbor_index = None
+        ann_index = None
+        content_index = None
         
         while True:
             try:
@@ -346,15 +748,28 @@ def main():
                     anime_name = 'Naruto'
                     print(f"\n💡 Menggunakan anime default: {anime_name}")
                 
-                show_loading_animation()
-                
-                # Inisialisasi fitur jika belum ada
-                if features_scaled is None:
-                    logger.info("Mempersiapkan fitur...")
-                    features_scaled, _ = prepare_features(anime_data)
+                # Inisialisasi indeks tetangga jika belum ada
+                if args.mode == 'ann' and ann_index is None:
+                    with progress("🧭 Mempersiapkan indeks IVF", 'neighbor_index'):
+                        ann_index = load_or_build_ann_index(features_scaled.values, anime_file, nprobe=args.nprobe)
+                    if args.check_recall:
+                        print(f"\n📏 Recall@10 (nprobe={ann_index.nprobe}): {ann_index.recall_at_k(10):.1%}")
+                elif args.mode == 'exact' and neighbor_index is None:
+                    with progress("🧭 Mempersiapkan indeks tetangga", 'neighbor_index'):
+                        neighbor_index = load_or_build_neighbor_index(features_scaled.values, anime_file)
+                if args.content_weight > 0 and content_index is None:
+                    with progress("📝 Mempersiapkan indeks konten", 'content_index'):
+                        content_index = load_or_build_content_index(anime_data, anime_file)
 
                 logger.info(f"Mencari rekomendasi untuk: {anime_name}")
-                recommendations, target_anime = recommend_anime(anime_name, anime_data, features_scaled)
+                recommendations, target_anime = recommend_anime(anime_name, anime_data, features_scaled,
+                                                                neighbor_index=neighbor_index,
+                                                                title_index=title_index,
+                                                                cache=response_cache,
+                                                                version=f"{data_version}-{args.mode}-{args.content_weight:g}",
+                                                                ann_index=ann_index,
+                                                                content_index=content_index,
+                                                                content_weight=args.content_weight)
                 
                 display_recommendations(recommendations, target_anime)
                 
@@ -371,6 +786,9 @@ def main():
                 print(f"\n❌ Error: {str(e)}")
                 print("Silakan coba lagi dengan nama anime yang berbeda.")
                 continue
+
+        logger.info(f"Statistik cache respons: {response_cache.stats()}")
+        report_metrics(args)
                 
     except Exception as e:
         logger.error(f"Terjadi kesalahan: {str(e)}")
@@ -0,0 +1,277 @@
+"""
+Indeks tetangga terdekat aproksimasi (IVF) untuk katalog berukuran jutaan judul.
+
+Fitur dikelompokkan dengan k-means menjadi `n_lists` klaster (inverted list).
+Sebuah query hanya menghitung jarak ke centroid, lalu ke anggota `nprobe`
+klaster terdekat, bukan ke seluruh katalog. `nprobe` adalah kenop
+recall/latensi: makin besar makin akurat (sama dengan pencarian exact jika
+`nprobe = n_lists`) tetapi makin lambat. `recall_at_k` membandingkan hasilnya
+dengan pencarian exact (`topk_neighbors`), dan `tune_nprobe` mencari nprobe
+terkecil yang mencapai target recall.
+
+Indeks tidak menyimpan salinan fitur; matriks fitur (mis. hasil mmap) harus
+diberikan saat indeks dibangun atau dimuat.
+"""
+import os
+import time
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+from neighbor_index import DEFAULT_CHUNK_SIZE, source_signature, topk_neighbors
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NPROBE = int(os.environ.get("ANN_NPROBE", "8"))
+DEFAULT_KMEANS_ITERATIONS = 10
+# Jumlah sampel pelatihan k-means per klaster
+TRAINING_SAMPLES_PER_LIST = 64
+DEFAULT_TARGET_RECALL = 0.95
+
+INDEX_VERSION = 1
+
+
+def ann_index_path(csv_path: str) -> str:
+    """Mengembalikan lokasi file indeks IVF untuk file CSV tertentu."""
+    base, _ = os.path.splitext(csv_path)
+    return f"{base}_ivf.npz"
+
+
+def default_n_lists(n_rows: int) -> int:
+    """Jumlah klaster bawaan: sekitar akar jumlah baris."""
+    return max(1, min(n_rows, int(round(np.sqrt(n_rows)))))
+
+
+def _nearest_centroids(features: np.ndarray, centroids: np.ndarray,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE * 8) -> np.ndarray:
+    """Klaster terdekat untuk setiap baris, dihitung per blok agar memori terbatas."""
+    assignments = np.empty(features.shape[0], dtype=np.int32)
+    centroid_norms = np.einsum('ij,ij->i', centroids, centroids)
+    for start in range(0, features.shape[0], chunk_size):
+        block = np.asarray(features[start:start + chunk_size], dtype=np.float64)
+        # ||c||^2 - 2xc cukup untuk argmin (||x||^2 sama untuk semua centroid)
+        assignments[start:start + len(block)] = np.argmin(centroid_norms[None, :] - 2.0 * (block @ centroids.T), axis=1)
+    return assignments
+
+
+def kmeans(features: np.ndarray, n_clusters: int, n_iterations: int = DEFAULT_KMEANS_ITERATIONS,
+           seed: int = 0) -> np.ndarray:
+    """
+    Melatih centroid k-means (Lloyd) pada sampel baris.
+
+    Returns:
+        np.ndarray: Centroid (n_clusters x d, float64)
+    """
+    rng = np.random.default_rng(seed)
+    n_rows = features.shape[0]
+    sample_size = min(n_rows, max(n_clusters * TRAINING_SAMPLES_PER_LIST, 1))
+    sample = np.asarray(features[np.sort(rng.choice(n_rows, size=sample_size, replace=False))], dtype=np.float64)
+    centroids = sample[rng.choice(sample_size, size=n_clusters, replace=False)].copy()
+
+    for _ in range(n_iterations):
+        assignments = _nearest_centroids(sample, centroids)
+        counts = np.bincount(assignments, minlength=n_clusters)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        filled = counts > 0
+        centroids[filled] = sums[filled] / counts[filled, None]
+        # Klaster kosong diisi ulang dengan titik sampel acak
+        if not filled.all():
+            centroids[~filled] = sample[rng.choice(sample_size, size=int((~filled).sum()), replace=False)]
+    return centroids
+
+
+class IVFIndex:
+    """Inverted file index: baris dikelompokkan per centroid k-means terdekat."""
+
+    def __init__(self, features: np.ndarray, centroids: np.ndarray, assignments: np.ndarray,
+                 nprobe: int = DEFAULT_NPROBE, signature: Optional[np.ndarray] = None):
+        self.features = features
+        self.centroids = np.asarray(centroids, dtype=np.float64)
+        self.assignments = np.asarray(assignments, dtype=np.int32)
+        self.nprobe = nprobe
+        self.signature = signature
+        # Layout CSR: anggota klaster i adalah order[offsets[i]:offsets[i + 1]]
+        self.order = np.argsort(self.assignments, kind='stable').astype(np.int32)
+        self.offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.assignments, minlength=self.n_lists), out=self.offsets[1:])
+
+    @property
+    def n_lists(self) -> int:
+        return self.centroids.shape[0]
+
+    def __len__(self) -> int:
+        return self.assignments.shape[0]
+
+    @classmethod
+    def build(cls, features: np.ndarray, n_lists: Optional[int] = None, nprobe: int = DEFAULT_NPROBE,
+              n_iterations: int = DEFAULT_KMEANS_ITERATIONS, seed: int = 0,
+              signature: Optional[np.ndarray] = None) -> 'IVFIndex':
+        """Melatih centroid dan mengelompokkan semua baris matriks fitur."""
+        n_lists = n_lists or default_n_lists(features.shape[0])
+        started = time.perf_counter()
+        centroids = kmeans(features, n_lists, n_iterations, seed)
+        index = cls(features, centroids, _nearest_centroids(features, centroids), nprobe, signature)
+        logger.info(f"Indeks IVF dibangun untuk {len(index)} anime ({n_lists} klaster) "
+                    f"dalam {time.perf_counter() - started:.2f} detik")
+        return index
+
+    def _candidates(self, vector: np.ndarray, k: int, nprobe: int) -> np.ndarray:
+        """Anggota klaster terdekat; klaster ditambah sampai kandidat cukup untuk k."""
+        centroid_dist = np.einsum('ij,ij->i', self.centroids - vector, self.centroids - vector)
+        probe_order = np.argsort(centroid_dist, kind='stable')
+        sizes = np.diff(self.offsets)[probe_order]
+        n_probe = max(min(nprobe, self.n_lists), int(np.searchsorted(np.cumsum(sizes), k)) + 1)
+        lists = probe_order[:n_probe]
+        return np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+
+    def search(self, vector: np.ndarray, k: int, nprobe: Optional[int] = None,
+               exclude: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mencari k tetangga terdekat (aproksimasi) untuk sebuah vektor fitur.
+
+        Args:
+            vector (np.ndarray): Vektor query (d,)
+            k (int): Jumlah tetangga
+            nprobe (int): Jumlah klaster yang diperiksa (default: `self.nprobe`)
+            exclude (int): Posisi baris yang tidak boleh ikut dalam hasil
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Posisi tetangga (int32) dan jaraknya
+            (float32), urut dari yang terdekat
+        """
+        vector = np.asarray(vector, dtype=np.float64)
+        candidates = self._candidates(vector, k + (exclude is not None), nprobe or self.nprobe)
+        if exclude is not None:
+            candidates = candidates[candidates != exclude]
+        distances = np.linalg.norm(np.asarray(self.features[candidates], dtype=np.float64) - vector, axis=1)
+        # Urutan sama dengan pencarian exact: jarak, lalu posisi untuk nilai seri
+        order = np.lexsort((candidates, distances))[:k]
+        return candidates[order].astype(np.int32), distances[order].astype(np.float32)
+
+    def query(self, position: int, k: int, nprobe: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Tetangga terdekat (tanpa judul itu sendiri) untuk judul pada posisi tertentu."""
+        return self.search(self.features[position], k, nprobe, exclude=position)
+
+    def recall_at_k(self, k: int = 10, n_queries: int = 200, nprobe: Optional[int] = None,
+                    seed: int = 0) -> float:
+        """
+        Rata-rata recall@k terhadap pencarian exact untuk sampel judul acak.
+
+        Returns:
+            float: Proporsi tetangga exact yang juga ditemukan indeks (0..1)
+        """
+        rng = np.random.default_rng(seed)
+        positions = rng.choice(len(self), size=min(n_queries, len(self)), replace=False)
+        exact, _ = topk_neighbors(self.features, positions, k)
+        if exact.shape[1] == 0:
+            return 1.0
+        found = 0
+        for position, expected in zip(positions, exact):
+            approx, _ = self.query(int(position), exact.shape[1], nprobe)
+            found += len(np.intersect1d(approx, expected))
+        return found / exact.size
+
+    def tune_nprobe(self, target_recall: float = DEFAULT_TARGET_RECALL, k: int = 10,
+                    n_queries: int = 200) -> Tuple[int, float]:
+        """
+        Menggandakan nprobe sampai recall@k mencapai target, lalu memakainya.
+
+        Returns:
+            Tuple[int, float]: nprobe terpilih dan recall@k yang dicapai
+        """
+        nprobe = 1
+        while True:
+            recall = self.recall_at_k(k, n_queries, nprobe)
+            if recall >= target_recall or nprobe >= self.n_lists:
+                break
+            nprobe = min(nprobe * 2, self.n_lists)
+        self.nprobe = nprobe
+        logger.info(f"nprobe={nprobe} mencapai recall@{k} {recall:.3f}")
+        return nprobe, recall
+
+    def update(self, features: np.ndarray, remap: np.ndarray, dirty: np.ndarray) -> 'IVFIndex':
+        """
+        Memperbarui indeks untuk katalog yang sebagian barisnya berubah.
+
+        Centroid dipertahankan; baris lama yang tidak berubah tetap di klasternya
+        dan baris baru/berubah (`dirty`) dimasukkan ke klaster terdekat.
+
+        Args:
+            features (np.ndarray): Matriks fitur katalog baru
+            remap (np.ndarray): Posisi baru untuk setiap baris lama (-1 jika dihapus)
+            dirty (np.ndarray): Posisi baru dari baris yang ditambahkan atau berubah
+
+        Returns:
+            IVFIndex: Indeks baru; indeks ini tidak diubah
+        """
+        remap = np.asarray(remap, dtype=np.int64)
+        dirty = np.unique(np.asarray(dirty, dtype=np.int64))
+        assignments = np.empty(features.shape[0], dtype=np.int32)
+        kept = np.flatnonzero(remap >= 0)
+        assignments[remap[kept]] = self.assignments[kept]
+        if len(dirty):
+            assignments[dirty] = _nearest_centroids(features[dirty], self.centroids)
+        return IVFIndex(features, self.centroids, assignments, self.nprobe)
+
+    def save(self, path: str):
+        """Menyimpan centroid dan pembagian klaster ke disk (ditulis atomik)."""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            version=np.array([INDEX_VERSION]),
+            centroids=self.centroids,
+            assignments=self.assignments,
+            nprobe=np.array([self.nprobe]),
+            signature=self.signature if self.signature is not None else np.array([], dtype=np.int64)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str, features: np.ndarray) -> 'IVFIndex':
+        """Memuat indeks dari disk untuk matriks fitur yang sama dengan saat dibangun."""
+        with np.load(path) as data:
+            if int(data['version'][0]) != INDEX_VERSION:
+                raise ValueError("Versi indeks IVF tidak didukung")
+            if data['assignments'].shape[0] != features.shape[0] or data['centroids'].shape[1] != features.shape[1]:
+                raise ValueError("Indeks IVF tidak sesuai dengan matriks fitur")
+            return cls(features, data['centroids'], data['assignments'], int(data['nprobe'][0]), data['signature'])
+
+
+def load_or_build_ann_index(features: np.ndarray, csv_path: Optional[str] = None,
+                            n_lists: Optional[int] = None, nprobe: Optional[int] = None) -> IVFIndex:
+    """
+    Memuat indeks IVF dari disk jika masih valid, atau membangunnya ulang.
+
+    Args:
+        features (np.ndarray): Matriks fitur yang telah dinormalisasi
+        csv_path (str): Lokasi file sumber; indeks disimpan di sampingnya
+        n_lists (int): Jumlah klaster (default: sekitar akar jumlah baris)
+        nprobe (int): Jumlah klaster yang diperiksa per query
+
+    Returns:
+        IVFIndex: Indeks yang siap dipakai
+    """
+    path = ann_index_path(csv_path) if csv_path else None
+    signature = source_signature(csv_path) if csv_path else None
+
+    if path and os.path.exists(path):
+        try:
+            index = IVFIndex.load(path, features)
+            if np.array_equal(index.signature, signature) and (n_lists is None or index.n_lists == n_lists):
+                if nprobe is not None:
+                    index.nprobe = nprobe
+                logger.info(f"Indeks IVF dimuat dari: {path}")
+                return index
+        except Exception as e:
+            logger.warning(f"Indeks IVF tidak dapat dibaca, membangun ulang: {str(e)}")
+
+    index = IVFIndex.build(features, n_lists, nprobe or DEFAULT_NPROBE, signature=signature)
+    if path:
+        try:
+            index.save(path)
+            logger.info(f"Indeks IVF disimpan ke: {path}")
+        except OSError as e:
+            logger.warning(f"Gagal menyimpan indeks IVF: {str(e)}")
+    return index
@@ -0,0 +1,221 @@
+"""
+Server web Flask untuk template `index.html` dan `recommend.html`.
+
+Data, fitur, tabel tetangga dan indeks pencarian dimuat sekali per proses
+(dengan `gunicorn --preload` cukup sekali di master lalu dibagi ke worker
+lewat fork dan mmap). Setiap request hanya membaca struktur yang sudah jadi.
+
+Aman untuk WSGI multi-worker: `/update` menulis `data/anime.csv` secara atomik
+di bawah file lock, dan setiap worker memuat ulang katalognya sendiri saat
+tanda tangan file CSV berubah.
+
+Contoh:
+    python app.py
+    gunicorn --preload -w 4 -b 0.0.0.0:5000 app:app
+"""
+import os
+import fcntl
+import logging
+import threading
+from typing import List, Optional
+
+import numpy as np
+from flask import Flask, Response, jsonify, render_template, request
+
+from anime_recomendation import ensure_data_folder, load_dataset
+from ann_index import load_or_build_ann_index
+from catalog_refresher import build_catalog_frame
+from compact_catalog import CompactCatalog
+from jikan_client import DiskResponseCache, JikanClient, fetch_top_anime
+import metrics
+from metrics import timed
+from neighbor_index import load_or_build_neighbor_index, source_signature
+from recommender_engine import RECOMMENDER_MODE, RecommenderEngine
+from search_index import BM25Index
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SEARCH_LIMIT = 10
+TOP_ANIME_LIMIT = 12
+LATEST_ANIME_LIMIT = 20
+LATEST_YEARS = (2023, 2025)
+N_RECOMMENDATIONS = 5
+
+# Kolom yang ditulis ke data/anime.csv oleh /update
+CSV_COLUMNS = ['name', 'rating', 'type', 'episodes', 'genre', 'members', 'popularity', 'status', 'aired_from', 'synopsis']
+
+
+class CatalogService:
+    """Katalog dan semua indeks untuk satu versi file CSV (read-only setelah dibuat)."""
+
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        self.signature = source_signature(csv_path)
+        self.df, features_scaled = load_dataset(csv_path, mmap=True)
+        features = np.asarray(features_scaled.values)
+        # Record JSON dibuat saat diakses dari kolom ringkas, bukan disalin sebagai list dict
+        self.records = CompactCatalog.from_frame(self.df)
+        if RECOMMENDER_MODE == 'ann':
+            self.engine = RecommenderEngine(features, self.df['name'], mode='ann',
+                                            ann_index=load_or_build_ann_index(features, csv_path))
+        else:
+            self.engine = RecommenderEngine(features, self.df['name'],
+                                            neighbor_index=load_or_build_neighbor_index(features, csv_path))
+        self.search_index = BM25Index(self.records)
+
+        members = self.records.members
+        self.top_anime = [self.records[pos] for pos in np.argsort(-members, kind='stable')[:TOP_ANIME_LIMIT]]
+        years = self.records.years
+        recent = np.flatnonzero((years >= LATEST_YEARS[0]) & (years <= LATEST_YEARS[1]))
+        recent = recent[np.argsort(-members[recent], kind='stable')]
+        self.latest_anime = [self.records[pos] for pos in recent[:LATEST_ANIME_LIMIT].tolist()]
+        logger.info(f"Katalog web siap: {len(self.records)} anime "
+                    f"({self.records.nbytes() / max(len(self.records), 1):.0f} byte/judul untuk record)")
+
+    def is_current(self) -> bool:
+        try:
+            return np.array_equal(source_signature(self.csv_path), self.signature)
+        except OSError:
+            return True
+
+    @timed('resolve_title')
+    def resolve(self, name: str) -> Optional[int]:
+        """
+        Posisi anime untuk nama dari klien: exact, lalu substring (member
+        terbanyak), lalu judul paling mirip.
+        """
+        position = self.engine.position(name)
+        if position is not None:
+            return position
+        matches = self.engine.title_index.contains(name)
+        if len(matches):
+            return int(max(matches.tolist(), key=lambda pos: self.records.members[pos]))
+        similar = self.engine.title_index.similar(name, limit=1)
+        return similar[0][0] if similar else None
+
+    @timed('recommend')
+    def recommend(self, position: int, k: int = N_RECOMMENDATIONS) -> List[dict]:
+        """Rekomendasi dengan skor kemiripan 1 - (jarak / jarak terjauh), seperti di CLI."""
+        indices, distances = self.engine.kneighbors(position, k)
+        max_distance = distances.max() if len(distances) else 0
+        return [
+            dict(self.records[pos], similarity_score=float(1 - distance / max_distance) if max_distance > 0 else 1.0)
+            for pos, distance in zip(indices.tolist(), distances.tolist())
+        ]
+
+    @timed('search')
+    def search(self, query: str, limit: int = SEARCH_LIMIT) -> List[dict]:
+        doc_ids, _ = self.search_index.search(query, limit=limit)
+        return [self.records[pos] for pos in doc_ids.tolist()]
+
+
+_service: Optional[CatalogService] = None
+_service_lock = threading.Lock()
+
+
+def get_service() -> CatalogService:
+    """Katalog proses ini; dimuat ulang jika data/anime.csv diganti (oleh worker mana pun)."""
+    global _service
+    service = _service
+    if service is not None and service.is_current():
+        return service
+    with _service_lock:
+        if _service is None or not _service.is_current():
+            with timed('load_catalog'):
+                _service = CatalogService(_service.csv_path if _service is not None else ensure_data_folder())
+        return _service
+
+
+def update_catalog_file(csv_path: str) -> int:
+    """
+    Mengambil katalog terbaru dari Jikan dan mengganti data/anime.csv secara atomik.
+
+    File lock memastikan hanya satu worker yang memperbarui pada satu waktu.
+
+    Returns:
+        int: Jumlah anime yang ditulis
+    """
+    lock_path = f"{csv_path}.lock"
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            df = build_catalog_frame(fetch_top_anime(client=JikanClient(cache=DiskResponseCache())))
+            if df.empty:
+                raise ValueError("Tidak ada data anime yang berhasil diambil")
+            tmp_path = f"{csv_path}.tmp-{os.getpid()}"
+            df[[column for column in CSV_COLUMNS if column in df.columns]].to_csv(tmp_path, index=False)
+            os.replace(tmp_path, csv_path)
+            return len(df)
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+app = Flask(__name__)
+
+
+@app.route('/')
+def index():
+    return render_template('index.html', top_anime=get_service().top_anime)
+
+
+@app.route('/recommend', methods=['GET'])
+def recommend_page():
+    return render_template('recommend.html', preselected_anime=request.args.get('anime', ''))
+
+
+@app.route('/recommend', methods=['POST'])
+def recommend():
+    anime_name = (request.form.get('anime_name') or '').strip()
+    if not anime_name:
+        return jsonify({'success': False, 'error': 'Nama anime tidak boleh kosong'}), 400
+    try:
+        service = get_service()
+        position = service.resolve(anime_name)
+        if position is None:
+            return jsonify({'success': False, 'error': f"Anime '{anime_name}' tidak ditemukan"}), 404
+        return jsonify({
+            'success': True,
+            'selected_anime': service.records[position],
+            'recommendations': service.recommend(position)
+        })
+    except Exception as e:
+        logger.error(f"Error saat memberikan rekomendasi: {str(e)}")
+        return jsonify({'success': False, 'error': 'Terjadi kesalahan saat mencari rekomendasi'}), 500
+
+
+@app.route('/search')
+def search():
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify([])
+    return jsonify(get_service().search(query))
+
+
+@app.route('/latest-anime')
+def latest_anime():
+    return jsonify(get_service().latest_anime)
+
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """Histogram waktu per tahap proses ini dalam format teks Prometheus (aktif jika ANIME_METRICS=1)."""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
+@app.route('/update', methods=['POST'])
+def update():
+    try:
+        count = update_catalog_file(get_service().csv_path)
+        get_service()
+        return jsonify({'status': 'success', 'count': count})
+    except Exception as e:
+        logger.error(f"Error saat memperbarui data: {str(e)}")
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# Muat katalog saat modul diimpor agar `gunicorn --preload` membaginya ke semua worker
+get_service()
+
+if __name__ == '__main__':
+    app.run(debug=False)
@@ -0,0 +1,596 @@
+"""
+Benchmark fungsi-fungsi utama sistem rekomendasi pada katalog sintetis.
+
+Katalog sintetis mengikuti skema `data/anime.csv` (name, rating, type,
+episodes, genre, members, popularity, status, aired_from, synopsis) dengan
+ukuran yang bisa diatur, dari ukuran katalog asli (~2.600 judul) sampai 1 juta
+judul. Untuk setiap fungsi dilaporkan persentil latensi, throughput dan puncak
+memori (tracemalloc), lalu hasilnya ditulis sebagai JSON agar bisa dibandingkan
+dengan baseline yang disimpan.
+
+`search_anime` dan `get_anime_recommendations` di aplikasi Streamlit diukur
+lewat mesin yang dipakainya (indeks BM25 dan mesin kemiripan genre atas record
+anime populer), karena modul Streamlit tidak bisa diimpor tanpa menjalankan UI.
+
+Dengan `--startup` diukur juga waktu start CLI di proses baru (start
+interpreter, impor, memuat data, indeks judul dan tetangga, sampai rekomendasi
+pertama): cold start tanpa snapshot maupun tabel tetangga, dan warm start
+dengan keduanya sudah ada. Hasilnya dibandingkan dengan anggaran waktu.
+
+Pembaruan katalog bertahap (`CatalogSnapshot.apply_diff`) juga diukur, dan
+hasil pencarian, indeks judul dan rekomendasi genrenya dicocokkan dengan
+snapshot yang dibangun ulang penuh dari katalog yang sama; perbedaan hasil
+membuat kode keluar 1. Record tampilan (`latest_animes`) selalu dibangun
+ulang, jadi waktunya tetap sebanding dengan ukuran katalog.
+
+Contoh:
+    python benchmark.py --sizes 2600,10000,100000
+    python benchmark.py --sizes 1000000 --queries 50
+    python benchmark.py --save-baseline
+    python benchmark.py --baseline data/benchmarks/baseline.json
+    python benchmark.py --sizes "" --startup
+"""
+import io
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import subprocess
+import logging
+import platform
+import tempfile
+import tracemalloc
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from anime_recomendation import find_exact_anime, load_data, prepare_features, recommend_anime
+from catalog_refresher import CatalogDiff, CatalogSnapshot, build_latest_animes, diff_catalog
+from jikan_client import DEFAULT_IMAGE_URL
+from neighbor_index import NeighborIndex
+from search_index import BM25Index
+from similarity_engine import GenreSimilarityEngine
+from title_index import TitleIndex
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "benchmarks")
+DEFAULT_OUTPUT = os.path.join(BENCHMARK_DIR, "latest.json")
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+DEFAULT_SIZES = [2600, 10000, 100000]
+DEFAULT_QUERIES = 200
+DEFAULT_REPEAT = 3
+# Rasio p50 atau puncak memori (hasil / baseline) yang dianggap regresi
+DEFAULT_THRESHOLD = 1.25
+# Tabel tetangga dihitung O(n^2); di atas batas ini rekomendasi menghitung jarak per query
+NEIGHBOR_INDEX_MAX_ROWS = 20000
+RESULT_VERSION = 1
+# Ukuran perubahan katalog untuk benchmark pembaruan bertahap
+DIFF_CHANGED = 20
+DIFF_REMOVED = 10
+DIFF_ADDED = 15
+# Anggaran waktu start CLI sampai rekomendasi pertama (p50, termasuk start interpreter)
+COLD_START_BUDGET_MS = 5000.0
+WARM_START_BUDGET_MS = 1000.0
+DEFAULT_STARTUP_CSV = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "anime.csv")
+# Jalur start CLI sampai rekomendasi pertama, dijalankan di proses Python baru
+STARTUP_SCRIPT = """
+import sys
+from anime_recomendation import load_dataset, recommend_anime
+from neighbor_index import load_or_build_neighbor_index
+from title_index import TitleIndex
+
+csv_path = sys.argv[1]
+df, features_scaled = load_dataset(csv_path)
+title_index = TitleIndex(df['name'])
+neighbor_index = load_or_build_neighbor_index(features_scaled.values, csv_path)
+recommend_anime(df['name'].iat[0], df, features_scaled, neighbor_index=neighbor_index, title_index=title_index)
+"""
+
+GENRES = [
+    'Action', 'Adventure', 'Avant Garde', 'Award Winning', 'Boys Love', 'Comedy', 'Drama', 'Fantasy',
+    'Girls Love', 'Gourmet', 'Horror', 'Mystery', 'Romance', 'Sci-Fi', 'Slice of Life', 'Sports',
+    'Supernatural', 'Suspense', 'Ecchi', 'Erotica', 'Hentai', 'Adult Cast', 'Anthropomorphic', 'CGDCT',
+    'Childcare', 'Combat Sports', 'Crossdressing', 'Delinquents', 'Detective', 'Educational',
+    'Gag Humor', 'Gore', 'Harem', 'High Stakes Game', 'Historical', 'Idols (Female)', 'Idols (Male)',
+    'Isekai', 'Iyashikei', 'Love Polygon', 'Magical Sex Shift', 'Mahou Shoujo', 'Martial Arts', 'Mecha',
+    'Medical', 'Military', 'Music', 'Mythology', 'Organized Crime', 'Otaku Culture', 'Parody',
+    'Performing Arts', 'Pets', 'Psychological', 'Racing', 'Reincarnation', 'Reverse Harem', 'Samurai',
+    'School', 'Showbiz', 'Space', 'Strategy Game', 'Super Power', 'Survival', 'Team Sports',
+    'Time Travel', 'Vampire', 'Video Game', 'Visual Arts', 'Workplace', 'Josei', 'Kids', 'Seinen',
+    'Shoujo', 'Shounen',
+]
+TYPES = ['TV', 'Movie', 'ONA', 'OVA', 'TV Special', 'Special', 'Music', 'PV']
+TYPE_WEIGHTS = [0.55, 0.2, 0.1, 0.06, 0.03, 0.03, 0.02, 0.01]
+STATUSES = ['Finished Airing', 'Currently Airing', 'Not yet aired']
+STATUS_WEIGHTS = [0.93, 0.05, 0.02]
+SYLLABLES = ['ka', 'ki', 'ku', 'ko', 'sa', 'shi', 'su', 'so', 'ta', 'chi', 'tsu', 'to', 'na', 'ni',
+             'no', 'ha', 'hi', 'fu', 'ma', 'mi', 'mu', 'mo', 'ya', 'yu', 'yo', 'ra', 'ri', 'ru',
+             're', 'ro', 'wa', 'n', 'ga', 'gi', 'go', 'ze', 'da', 'de', 'do', 'ba', 'be', 'bo']
+
+
+def _words(rng: np.random.Generator, n_words: int, min_syllables: int = 2, max_syllables: int = 4) -> np.ndarray:
+    """Kosakata sintetis bergaya romaji tanpa duplikat."""
+    words = set()
+    while len(words) < n_words:
+        n_syllables = rng.integers(min_syllables, max_syllables + 1)
+        words.add(''.join(rng.choice(SYLLABLES, size=n_syllables)))
+    return np.array(sorted(words), dtype=object)
+
+
+def generate_catalog(n_rows: int, seed: int = 42) -> pd.DataFrame:
+    """
+    Membuat katalog anime sintetis dengan skema yang sama seperti `data/anime.csv`.
+
+    Nama selalu unik dan diakhiri nomor dengan lebar tetap, sehingga nama lengkap
+    tidak pernah menjadi substring judul lain. Kata sinopsis mengikuti sebaran
+    Zipf agar statistik term untuk pencarian mirip teks asli.
+
+    Args:
+        n_rows (int): Jumlah judul
+        seed (int): Seed generator acak
+
+    Returns:
+        pd.DataFrame: Katalog sintetis
+    """
+    rng = np.random.default_rng(seed)
+    title_words = _words(rng, 600)
+    synopsis_words = _words(rng, 5000, 1, 4)
+    width = len(str(n_rows))
+
+    first = rng.choice(title_words, size=n_rows)
+    second = rng.choice(title_words, size=n_rows)
+    names = [f"{a.capitalize()} no {b.capitalize()} {i:0{width}d}" for i, (a, b) in enumerate(zip(first, second))]
+
+    members = np.round(rng.lognormal(mean=9.5, sigma=2.0, size=n_rows)).astype(np.int64) + 100
+    popularity = np.empty(n_rows, dtype=np.int64)
+    popularity[np.argsort(-members, kind='stable')] = np.arange(1, n_rows + 1)
+    # Judul yang lebih populer cenderung punya rating lebih tinggi
+    rating = np.clip(rng.normal(6.4, 0.9, size=n_rows) + 0.25 * (np.log10(members) - 4), 1.0, 9.4).round(2)
+
+    type_values = rng.choice(TYPES, size=n_rows, p=TYPE_WEIGHTS)
+    episodes = np.where(type_values == 'TV', rng.choice([12, 13, 24, 25, 26, 50], size=n_rows),
+                        rng.integers(1, 7, size=n_rows))
+
+    genre_counts = rng.integers(1, 6, size=n_rows)
+    genre_draws = rng.integers(0, len(GENRES), size=(n_rows, 5))
+    genres = [', '.join(GENRES[g] for g in sorted(set(row[:count])))
+              for row, count in zip(genre_draws.tolist(), genre_counts.tolist())]
+
+    days = rng.integers(0, (pd.Timestamp('2025-12-31') - pd.Timestamp('1970-01-01')).days, size=n_rows)
+    aired_from = (pd.Timestamp('1970-01-01', tz='UTC') + pd.to_timedelta(days, unit='D')).strftime('%Y-%m-%dT%H:%M:%S+00:00')
+
+    zipf_weights = 1.0 / np.arange(1, len(synopsis_words) + 1)
+    lengths = rng.integers(12, 31, size=n_rows)
+    tokens = rng.choice(synopsis_words, size=int(lengths.sum()), p=zipf_weights / zipf_weights.sum())
+    synopsis = [' '.join(chunk) + '.' for chunk in np.split(tokens, np.cumsum(lengths)[:-1])]
+
+    return pd.DataFrame({
+        'name': names,
+        'rating': rating,
+        'type': type_values,
+        'episodes': episodes,
+        'genre': genres,
+        'members': members,
+        'popularity': popularity,
+        'status': rng.choice(STATUSES, size=n_rows, p=STATUS_WEIGHTS),
+        'aired_from': aired_from,
+        'synopsis': synopsis,
+    })
+
+
+def measure(function: str, size: int, call: Callable, arguments: Sequence[tuple], note: str = '',
+            warmup: bool = True) -> dict:
+    """
+    Mengukur latensi setiap panggilan, throughput dan puncak memori satu panggilan.
+
+    Panggilan pertama dipakai sebagai pemanasan (kecuali `warmup=False` untuk
+    operasi sekali jalan yang mahal). Puncak memori diukur terpisah dengan
+    tracemalloc agar overhead-nya tidak memengaruhi latensi.
+    """
+    if warmup:
+        call(*arguments[0])
+    latencies = np.empty(len(arguments), dtype=np.float64)
+    started = time.perf_counter()
+    for i, args in enumerate(arguments):
+        t0 = time.perf_counter()
+        call(*args)
+        latencies[i] = time.perf_counter() - t0
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        call(*arguments[0])
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return summarize(function, size, latencies, elapsed, peak, note)
+
+
+def summarize(function: str, size: int, latencies: np.ndarray, elapsed: float, peak: int, note: str = '') -> dict:
+    """Persentil latensi, throughput dan puncak memori sebagai satu entri hasil."""
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+    result = {
+        'size': size,
+        'function': function,
+        'calls': len(latencies),
+        'p50_ms': round(float(p50), 4),
+        'p95_ms': round(float(p95), 4),
+        'p99_ms': round(float(p99), 4),
+        'mean_ms': round(float(latencies.mean() * 1000), 4),
+        'max_ms': round(float(latencies.max() * 1000), 4),
+        'throughput_per_s': round(len(latencies) / elapsed, 2) if elapsed > 0 else None,
+        'peak_memory_bytes': int(peak),
+    }
+    if note:
+        result['note'] = note
+    logger.info(f"{function} ({size}): p50 {result['p50_ms']:.3f} ms, p99 {result['p99_ms']:.3f} ms")
+    return result
+
+
+def run_startup(csv_path: str) -> Tuple[float, int]:
+    """
+    Menjalankan `STARTUP_SCRIPT` di proses baru.
+
+    Returns:
+        Tuple[float, int]: Durasi (detik) dan puncak RSS proses anak (byte)
+    """
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', STARTUP_SCRIPT, csv_path],
+                               cwd=os.path.dirname(os.path.abspath(__file__)),
+                               stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(process.pid, 0)
+    elapsed = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"Proses start keluar dengan kode {process.returncode}")
+    # ru_maxrss dalam KiB di Linux
+    return elapsed, usage.ru_maxrss * 1024
+
+
+def benchmark_startup(csv_path: str, repeat: int = DEFAULT_REPEAT, work_dir: Optional[str] = None,
+                      cold_budget_ms: float = COLD_START_BUDGET_MS,
+                      warm_budget_ms: float = WARM_START_BUDGET_MS) -> List[dict]:
+    """
+    Mengukur cold start (salinan CSV baru tanpa snapshot/tabel tetangga) dan
+    warm start (artefak dari cold start sudah ada) di proses baru.
+    """
+    size = len(pd.read_csv(csv_path, usecols=['name']))
+    results = []
+    for function, budget_ms in (('cold_start', cold_budget_ms), ('warm_start', warm_budget_ms)):
+        latencies = np.empty(repeat, dtype=np.float64)
+        peak = 0
+        for i in range(repeat):
+            if function == 'cold_start':
+                run_dir = os.path.join(work_dir, f"startup-{i}")
+                os.makedirs(run_dir, exist_ok=True)
+                startup_csv = os.path.join(run_dir, "anime.csv")
+                shutil.copyfile(csv_path, startup_csv)
+            latencies[i], rss = run_startup(startup_csv)
+            peak = max(peak, rss)
+        result = summarize(function, size, latencies, float(latencies.sum()), peak, note='proses baru, RSS puncak')
+        result['budget_ms'] = budget_ms
+        result['over_budget'] = result['p50_ms'] > budget_ms
+        results.append(result)
+    return results
+
+
+def display_records(df: pd.DataFrame) -> List[dict]:
+    """Record anime populer seperti `latest_animes` di aplikasi Streamlit."""
+    return build_latest_animes(catalog_frame(df))
+
+
+def catalog_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Katalog dengan kolom tampilan (`year`, `image_url`) seperti di aplikasi Streamlit."""
+    return df.assign(year=pd.to_datetime(df['aired_from'], errors='coerce').dt.year, image_url=DEFAULT_IMAGE_URL)
+
+
+def changed_catalog(df: pd.DataFrame, seed: int = 42) -> pd.DataFrame:
+    """
+    Katalog baru dengan sebagian judul populer dihapus, sebagian berubah
+    (keluar dari atau masuk ke daftar populer) dan beberapa judul baru.
+
+    Urutan baris sama dengan hasil `CatalogSnapshot.apply_diff`: baris lama
+    tetap di posisinya dan judul baru di akhir.
+    """
+    rng = np.random.default_rng(seed + 2)
+    popular = set(build_latest_animes(df).names.tolist())
+    is_popular = df['name'].isin(popular).to_numpy()
+    candidates = rng.permutation(np.flatnonzero(is_popular))
+    removed = candidates[:DIFF_REMOVED]
+    dropped = candidates[DIFF_REMOVED:DIFF_REMOVED + DIFF_CHANGED // 2]
+    raised = rng.permutation(np.flatnonzero(~is_popular))[:DIFF_CHANGED - len(dropped)]
+
+    new_df = df.copy()
+    new_df.loc[new_df.index[dropped], 'members'] = 100
+    new_df.loc[new_df.index[raised], ['members', 'rating']] = [1000000, 8.5]
+    new_df = new_df.drop(index=new_df.index[removed])
+
+    # Nomor judul baru diawali nomor judul yang dihapus, sehingga term lama yang tidak
+    # lagi punya dokumen aktif menjadi awalan term lain (kasus ekspansi awalan)
+    added = catalog_frame(generate_catalog(DIFF_ADDED, seed + 3))
+    removed_names = df['name'].iloc[removed].tolist()
+    added['name'] = [f"{removed_names[i % len(removed_names)]}{i}" for i in range(len(added))]
+    added[['members', 'rating']] = [1000000, 8.5]
+    return pd.concat([new_df, added[df.columns]], ignore_index=True)
+
+
+def diff_queries(diff: CatalogDiff, limit: int) -> List[str]:
+    """Query pencarian untuk judul yang terdampak: nama lengkap, tanpa nomor, dan nomornya saja."""
+    queries = []
+    for name in diff.removed + diff.changed['name'].tolist() + diff.added['name'].tolist():
+        title, number = name.rsplit(' ', 1)
+        queries.extend([name, title, number])
+    return queries[:limit]
+
+
+def snapshot_results(snapshot: CatalogSnapshot, query: str) -> Tuple[List[str], np.ndarray]:
+    """Hasil pencarian BM25, judul mirip, substring dan rekomendasi genre untuk satu query."""
+    names = snapshot.latest_animes.names
+    catalog_titles = snapshot.recommender.title_index
+    positions, scores = snapshot.search_index.search(query, limit=10)
+    similar = snapshot.title_index.similar(query, limit=10)
+    results = [names[pos] for pos in positions.tolist()] + \
+        [names[pos] for pos, _ in similar] + \
+        [names[pos] for pos in snapshot.title_index.contains(query).tolist()] + \
+        [catalog_titles.names[pos] for pos in catalog_titles.contains(query).tolist()]
+    scores = [scores, np.array([score for _, score in similar])]
+    for pos in snapshot.title_index.exact(query):
+        recommendations = snapshot.similarity_engine.recommend(pos, 10)
+        results += [names[i] for i, _ in recommendations]
+        scores.append(np.array([score for _, score in recommendations]))
+    return results, np.concatenate(scores)
+
+
+def benchmark_incremental(size: int, df: pd.DataFrame, queries: int = DEFAULT_QUERIES, seed: int = 42,
+                          work_dir: Optional[str] = None) -> dict:
+    """
+    Mengukur `CatalogSnapshot.apply_diff` dan memeriksa bahwa hasil pencarian,
+    indeks judul dan rekomendasi genrenya sama dengan snapshot yang dibangun
+    ulang penuh dari katalog baru.
+    """
+    shared_dir = os.path.join(work_dir, f"shared_{size}")
+    old_df = catalog_frame(df)
+    new_df = changed_catalog(old_df, seed)
+    snapshot = CatalogSnapshot.build(old_df, shared_dir)
+    diff = diff_catalog(old_df, new_df)
+
+    updated = []
+    result = measure('catalog_apply_diff', size,
+                     lambda: updated.append(snapshot.apply_diff(diff, shared_dir)), [()], warmup=False,
+                     note=f"{len(diff.removed)} dihapus, {len(diff.changed)} berubah, {len(diff.added)} ditambahkan; "
+                          f"record tampilan dibangun ulang, indeks diperbarui bertahap")
+    rebuilt = CatalogSnapshot.build(new_df, shared_dir)
+
+    mismatches = []
+    for query in diff_queries(diff, queries):
+        names, scores = snapshot_results(updated[0], query)
+        expected_names, expected_scores = snapshot_results(rebuilt, query)
+        if names != expected_names or not np.allclose(scores, expected_scores, rtol=1e-4):
+            mismatches.append(query)
+    if mismatches:
+        logger.error(f"Hasil setelah apply_diff berbeda dari build ulang untuk {len(mismatches)} query, "
+                     f"mis. {mismatches[:3]}")
+    result['search_mismatches'] = len(mismatches)
+    return result
+
+
+def benchmark_size(size: int, queries: int = DEFAULT_QUERIES, repeat: int = DEFAULT_REPEAT, seed: int = 42,
+                   work_dir: Optional[str] = None,
+                   neighbor_index_max_rows: int = NEIGHBOR_INDEX_MAX_ROWS) -> List[dict]:
+    """Menjalankan semua benchmark untuk satu ukuran katalog."""
+    logger.info(f"Membuat katalog sintetis {size} judul...")
+    catalog = generate_catalog(size, seed)
+    csv_path = os.path.join(work_dir, f"anime_{size}.csv")
+    catalog.to_csv(csv_path, index=False)
+    del catalog
+
+    rng = np.random.default_rng(seed + 1)
+    results = [measure('load_data', size, load_data, [(csv_path,)] * repeat)]
+    df = load_data(csv_path)
+    results.append(measure('prepare_features', size, prepare_features, [(df,)] * repeat))
+    features_scaled, _ = prepare_features(df)
+
+    title_index = TitleIndex(df['name'])
+    sample = rng.choice(len(df), size=queries)
+    full_names = [df['name'].iat[pos] for pos in sample]
+    # Setengah query berupa nama lengkap, setengah berupa potongan judul (banyak kandidat)
+    partial_names = [name.rsplit(' ', 1)[0] for name in full_names]
+    find_queries = [(query, df, title_index) for pair in zip(full_names, partial_names) for query in pair][:queries]
+    results.append(measure('find_exact_anime', size, find_exact_anime, find_queries))
+
+    neighbor_index = None
+    note = 'jarak dihitung per query (tanpa tabel tetangga)'
+    if size <= neighbor_index_max_rows:
+        built = []
+        results.append(measure('neighbor_index_build', size,
+                               lambda features: built.append(NeighborIndex.build(features)),
+                               [(features_scaled.values,)], warmup=False))
+        neighbor_index = built[0]
+        note = 'dengan tabel tetangga'
+    stdin = sys.stdin
+    # Nama lengkap selalu unik; stdin kosong memastikan tidak ada prompt yang menunggu
+    sys.stdin = io.StringIO('')
+    try:
+        results.append(measure(
+            'recommend_anime', size,
+            lambda name: recommend_anime(name, df, features_scaled, neighbor_index=neighbor_index,
+                                         title_index=title_index),
+            [(name,) for name in full_names], note=note
+        ))
+    finally:
+        sys.stdin = stdin
+
+    records = display_records(df)
+    if records:
+        search_index = BM25Index(records)
+        search_queries = [(' '.join(records[pos]['name'].split()[:2]),) for pos in rng.choice(len(records), size=queries)]
+        results.append(measure(
+            'search_anime', size,
+            lambda query: [records[doc_id] for doc_id in search_index.search(query)[0]],
+            search_queries, note=f"{len(records)} record populer"
+        ))
+
+        similarity_engine = GenreSimilarityEngine(records)
+        results.append(measure(
+            'get_anime_recommendations', size,
+            lambda pos: [(records[i], score) for i, score in similarity_engine.recommend(pos, 5)],
+            [(int(pos),) for pos in rng.choice(len(records), size=queries)], note=f"{len(records)} record populer"
+        ))
+
+    if size <= neighbor_index_max_rows:
+        results.append(benchmark_incremental(size, df, queries, seed, work_dir))
+    return results
+
+
+def compare_with_baseline(results: List[dict], baseline: List[dict],
+                          threshold: float = DEFAULT_THRESHOLD) -> List[dict]:
+    """
+    Membandingkan hasil dengan baseline per (ukuran, fungsi).
+
+    Returns:
+        List[dict]: Rasio p50, p99 dan puncak memori terhadap baseline. Regresi
+        ditandai jika rasio p50 atau puncak memori melewati `threshold` (p99
+        terlalu berisik untuk jumlah query yang kecil)
+    """
+    previous = {(entry['size'], entry['function']): entry for entry in baseline}
+    comparison = []
+    for entry in results:
+        base = previous.get((entry['size'], entry['function']))
+        if base is None:
+            continue
+        ratios = {
+            metric: round(entry[metric] / base[metric], 3) if base[metric] else None
+            for metric in ('p50_ms', 'p99_ms', 'peak_memory_bytes')
+        }
+        comparison.append({
+            'size': entry['size'],
+            'function': entry['function'],
+            **{f"{metric}_ratio": ratio for metric, ratio in ratios.items()},
+            'regression': any(ratios[metric] is not None and ratios[metric] > threshold
+                              for metric in ('p50_ms', 'peak_memory_bytes')),
+        })
+    return comparison
+
+
+def write_results(path: str, payload: dict):
+    """Menulis hasil benchmark sebagai JSON (ditulis atomik)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def print_results(results: List[dict], comparison: Optional[List[dict]] = None):
+    ratios = {(entry['size'], entry['function']): entry for entry in comparison or []}
+    header = f"{'ukuran':>9}  {'fungsi':<26}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'ops/s':>12}{'peak MiB':>10}"
+    if comparison is not None:
+        header += f"{'vs baseline':>14}"
+    print(header)
+    print("-" * len(header))
+    for entry in results:
+        line = (f"{entry['size']:>9}  {entry['function']:<26}{entry['p50_ms']:>11.3f}{entry['p95_ms']:>11.3f}"
+                f"{entry['p99_ms']:>11.3f}{entry['throughput_per_s'] or 0:>12.1f}"
+                f"{entry['peak_memory_bytes'] / 2**20:>10.1f}")
+        ratio = ratios.get((entry['size'], entry['function']))
+        if ratio is not None:
+            marker = ' REGRESI' if ratio['regression'] else ''
+            line += f"{ratio['p50_ms_ratio'] or 0:>13.2f}x{marker}"
+        if entry.get('over_budget'):
+            line += f" MELEBIHI ANGGARAN ({entry['budget_ms']:.0f} ms)"
+        if entry.get('search_mismatches'):
+            line += f" HASIL BERBEDA ({entry['search_mismatches']} query)"
+        print(line)
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark sistem rekomendasi anime pada katalog sintetis")
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="Ukuran katalog, dipisahkan koma (mis. 2600,10000,100000,1000000)")
+    parser.add_argument('--queries', type=int, default=DEFAULT_QUERIES, help="Jumlah query per fungsi")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT,
+                        help="Jumlah pengulangan untuk load_data dan prepare_features")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--neighbor-index-max-rows', type=int, default=NEIGHBOR_INDEX_MAX_ROWS,
+                        help="Ukuran katalog terbesar yang dibuatkan tabel tetangga")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help="File JSON hasil benchmark")
+    parser.add_argument('--baseline', help="File JSON baseline untuk dibandingkan")
+    parser.add_argument('--save-baseline', action='store_true', help=f"Simpan hasil sebagai {DEFAULT_BASELINE}")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help="Rasio terhadap baseline yang dianggap regresi")
+    parser.add_argument('--startup', action='store_true',
+                        help="Ukur juga cold start dan warm start CLI di proses baru")
+    parser.add_argument('--startup-csv', default=DEFAULT_STARTUP_CSV, help="Katalog untuk benchmark start")
+    parser.add_argument('--cold-budget-ms', type=float, default=COLD_START_BUDGET_MS,
+                        help="Anggaran p50 cold start (ms)")
+    parser.add_argument('--warm-budget-ms', type=float, default=WARM_START_BUDGET_MS,
+                        help="Anggaran p50 warm start (ms)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args(argv)
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+
+    work_dir = tempfile.mkdtemp(prefix="anime-benchmark-")
+    results = []
+    try:
+        for size in sizes:
+            results.extend(benchmark_size(size, args.queries, args.repeat, args.seed, work_dir,
+                                          args.neighbor_index_max_rows))
+        if args.startup:
+            results.extend(benchmark_startup(args.startup_csv, args.repeat, work_dir,
+                                             args.cold_budget_ms, args.warm_budget_ms))
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    payload = {
+        'version': RESULT_VERSION,
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'cpu_count': os.cpu_count(),
+        },
+        'parameters': {'sizes': sizes, 'queries': args.queries, 'repeat': args.repeat, 'seed': args.seed,
+                       'startup': args.startup},
+        'results': results,
+    }
+
+    comparison = None
+    if args.baseline:
+        try:
+            with open(args.baseline, "r", encoding="utf-8") as f:
+                baseline = json.load(f)
+            comparison = compare_with_baseline(results, baseline['results'], args.threshold)
+            payload['comparison'] = {'baseline': os.path.abspath(args.baseline), 'threshold': args.threshold,
+                                     'entries': comparison}
+        except Exception as e:
+            logger.error(f"Error saat membaca baseline: {str(e)}")
+            raise
+
+    write_results(args.output, payload)
+    logger.info(f"Hasil benchmark ditulis ke: {args.output}")
+    if args.save_baseline:
+        write_results(DEFAULT_BASELINE, payload)
+        logger.info(f"Baseline disimpan ke: {DEFAULT_BASELINE}")
+
+    print_results(results, comparison)
+    # Kode keluar 1 jika ada regresi, anggaran start terlampaui atau hasil pembaruan bertahap
+    # berbeda dari build ulang, agar bisa dipakai di CI
+    regressed = bool(comparison) and any(entry['regression'] for entry in comparison)
+    failed = any(entry.get('over_budget') or entry.get('search_mismatches') for entry in results)
+    return 1 if regressed or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+"""
+Snapshot katalog anime dan penyegar latar belakang (stale-while-revalidate).
+
+`CatalogSnapshot` mengikat DataFrame katalog, daftar `latest_animes` dan semua
+indeks turunannya (mesin KNN, indeks judul, BM25, mesin kemiripan genre) untuk
+satu versi data. Snapshot tidak pernah diubah setelah dibangun.
+
+`CatalogRefresher` selalu mengembalikan snapshot terakhir yang berhasil
+dibangun. Jika snapshot sudah melewati umur maksimumnya, pembangunan ulang
+dijalankan di thread latar belakang dan hasilnya dipasang dengan satu
+penggantian referensi, sehingga request tidak pernah menunggu refresh.
+
+Jika katalog baru hanya berbeda sedikit dari snapshot lama (`diff_catalog`),
+snapshot baru diturunkan dari yang lama (`CatalogSnapshot.apply_diff`): baris
+yang tidak berubah tetap di posisinya, dan matriks fitur, tabel tetangga serta
+indeks BM25 hanya diperbarui untuk baris yang berubah.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from compact_catalog import CompactCatalog
+from jikan_client import DiskResponseCache, JikanClient, fetch_top_anime
+from shared_matrix import data_version, load_or_create_shared_matrix
+from title_index import TitleIndex
+from search_index import BM25Index
+from similarity_engine import GenreSimilarityEngine
+from recommender_engine import RecommenderEngine
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "shared")
+KNN_FEATURE_COLUMNS = ['rating', 'members']
+
+# Umur maksimum snapshot sebelum disegarkan, dan jeda sebelum mencoba lagi
+# setelah refresh gagal (detik)
+DEFAULT_MAX_AGE = 3600
+RETRY_INTERVAL = 300
+
+# Pembaruan bertahap hanya dipakai jika porsi baris yang berubah tidak lebih dari ini
+MAX_INCREMENTAL_FRACTION = 0.25
+
+
+def build_catalog_frame(rows: List[dict]) -> pd.DataFrame:
+    """Mengubah baris hasil Jikan menjadi DataFrame katalog yang sudah dibersihkan."""
+    if not rows:
+        return pd.DataFrame()
+
+    df = pd.DataFrame(rows)
+
+    # Konversi kolom tanggal
+    df['aired_from'] = pd.to_datetime(df['aired_from'], errors='coerce')
+    df['year'] = df['aired_from'].dt.year
+
+    # Isi nilai NaN dengan nilai default
+    df['rating'] = df['rating'].fillna(0.0)
+    df['members'] = df['members'].fillna(0)
+    df['episodes'] = df['episodes'].fillna(0)
+    df['synopsis'] = df['synopsis'].fillna("Tidak ada sinopsis tersedia.")
+    df['genre'] = df['genre'].fillna("Unknown")
+    df['status'] = df['status'].fillna("Unknown")
+    df['type'] = df['type'].fillna("Unknown")
+
+    # Urutkan berdasarkan rating tertinggi
+    return df.sort_values(by=['rating', 'popularity'], ascending=[False, True])
+
+
+def popular_positions(df: pd.DataFrame) -> np.ndarray:
+    """Posisi baris anime populer dengan rating tinggi, urut dari rating tertinggi."""
+    popular_anime = df.reset_index(drop=True)
+    popular_anime = popular_anime[
+        (popular_anime['members'] > 50000) &
+        (popular_anime['rating'] > 7.0)
+    ].sort_values(by=['rating', 'popularity'], ascending=[False, True])
+    return popular_anime.index.to_numpy()
+
+
+def build_latest_animes(df: pd.DataFrame) -> CompactCatalog:
+    """
+    Memilih anime populer dengan rating tinggi sebagai record tampilan.
+
+    Record disimpan kolumnar (`CompactCatalog`) dan baru menjadi dict saat diakses.
+    """
+    return CompactCatalog.from_frame(df.iloc[popular_positions(df)])
+
+
+class CatalogDiff:
+    """Perbedaan dua katalog berdasarkan nama anime."""
+
+    def __init__(self, removed: List[str], changed: pd.DataFrame, added: pd.DataFrame):
+        self.removed = removed
+        self.changed = changed
+        self.added = added
+
+    def __len__(self) -> int:
+        return len(self.removed) + len(self.changed) + len(self.added)
+
+
+def diff_catalog(old_df: pd.DataFrame, new_df: pd.DataFrame) -> Optional[CatalogDiff]:
+    """
+    Membandingkan dua katalog per judul (hash seluruh kolom setiap baris).
+
+    Returns:
+        CatalogDiff: Judul yang dihapus, berubah dan ditambahkan, atau None jika
+        nama tidak unik atau kolomnya berbeda sehingga perlu dibangun ulang
+    """
+    if list(old_df.columns) != list(new_df.columns) or \
+            old_df['name'].duplicated().any() or new_df['name'].duplicated().any():
+        return None
+
+    old_hashes = pd.Series(pd.util.hash_pandas_object(old_df, index=False).to_numpy(), index=old_df['name'].to_numpy())
+    new_hashes = pd.Series(pd.util.hash_pandas_object(new_df, index=False).to_numpy(), index=new_df['name'].to_numpy())
+
+    in_old = new_df['name'].isin(old_hashes.index).to_numpy()
+    common = new_df['name'].to_numpy()[in_old]
+    changed = in_old.copy()
+    changed[in_old] = old_hashes.loc[common].to_numpy() != new_hashes.loc[common].to_numpy()
+
+    removed = old_df.loc[~old_df['name'].isin(new_hashes.index), 'name'].tolist()
+    return CatalogDiff(removed, new_df[changed], new_df[~in_old])
+
+
+class CatalogSnapshot:
+    """Katalog dan semua indeks turunannya untuk satu versi data (read-only)."""
+
+    def __init__(self, df: pd.DataFrame, latest_animes: CompactCatalog, version: str,
+                 recommender: RecommenderEngine, title_index: TitleIndex,
+                 search_index: BM25Index, similarity_engine: GenreSimilarityEngine,
+                 search_doc_names: Optional[List[str]] = None):
+        self.df = df
+        self.latest_animes = latest_animes
+        self.version = version
+        self.recommender = recommender
+        self.title_index = title_index
+        self.search_index = search_index
+        self.similarity_engine = similarity_engine
+        # Nama anime untuk setiap id dokumen internal indeks BM25
+        self.search_doc_names = search_doc_names if search_doc_names is not None else \
+            latest_animes.names.tolist()
+        self.built_at = time.time()
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, shared_dir: str = SHARED_CACHE_DIR) -> 'CatalogSnapshot':
+        """Membangun snapshot beserta semua indeks dari DataFrame katalog."""
+        version = data_version(df, ['name'] + KNN_FEATURE_COLUMNS)
+        knn_features = load_or_create_shared_matrix(
+            os.path.join(shared_dir, f"knn_{version}"),
+            lambda: df[KNN_FEATURE_COLUMNS].to_numpy(dtype=float),
+            lambda: df['name'],
+            KNN_FEATURE_COLUMNS
+        )
+        recommender = RecommenderEngine(knn_features.matrix, knn_features.titles, version=version)
+
+        latest_animes = build_latest_animes(df)
+        return cls(
+            df,
+            latest_animes,
+            version,
+            recommender,
+            TitleIndex(latest_animes.names),
+            BM25Index(latest_animes),
+            GenreSimilarityEngine(latest_animes)
+        )
+
+    def age(self) -> float:
+        return time.time() - self.built_at
+
+    def apply_diff(self, diff: CatalogDiff, shared_dir: str = SHARED_CACHE_DIR) -> 'CatalogSnapshot':
+        """
+        Menurunkan snapshot baru dari snapshot ini dan perbedaan katalog.
+
+        Baris yang tetap dipertahankan pada urutannya, baris yang berubah diganti
+        di tempat, dan baris baru ditambahkan di akhir. Matriks fitur, tabel
+        tetangga (atau indeks IVF), indeks BM25, indeks judul dan mesin
+        kemiripan genre hanya diperbarui untuk baris yang berubah; baris lama
+        cukup dipetakan ulang ke posisi barunya. Record tampilan kolumnar
+        (`latest_animes`) tetap dibangun ulang dari DataFrame dengan operasi
+        vektor, karena urutannya (rating) bisa berubah di mana saja.
+        Snapshot ini tidak diubah.
+        """
+        old_df = self.df.reset_index(drop=True)
+        names = old_df['name']
+        keep = np.flatnonzero(~names.isin(diff.removed).to_numpy())
+        remap = np.full(len(old_df), -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+
+        # Row store: baris lama tetap di posisinya, baris berubah diganti, baris baru di akhir
+        rows = old_df.iloc[keep].set_index('name')
+        if len(diff.changed):
+            changed = diff.changed.set_index('name')
+            rows.loc[changed.index, changed.columns] = changed
+        df = pd.concat([rows, diff.added.set_index('name')]).reset_index()[old_df.columns]
+
+        positions = pd.Series(np.arange(len(df)), index=df['name'].to_numpy())
+        dirty = np.concatenate([
+            positions.loc[diff.changed['name'].to_numpy()].to_numpy(),
+            np.arange(len(keep), len(df))
+        ]).astype(np.int64)
+
+        # Matriks fitur: salin baris lama, tulis ulang baris yang berubah saja
+        version = data_version(df, ['name'] + KNN_FEATURE_COLUMNS)
+        old_features = np.asarray(self.recommender.features, dtype=float)
+        features = np.empty((len(df), old_features.shape[1]), dtype=float)
+        features[:len(keep)] = old_features[keep]
+        features[dirty] = df[KNN_FEATURE_COLUMNS].to_numpy(dtype=float)[dirty]
+        knn_features = load_or_create_shared_matrix(
+            os.path.join(shared_dir, f"knn_{version}"),
+            lambda: features,
+            lambda: df['name'],
+            KNN_FEATURE_COLUMNS
+        )
+        # Judul baris lama tidak berubah (diff berbasis nama), jadi indeks judul cukup dipetakan ulang
+        knn_title_index = self.recommender.title_index.update(df['name'], remap)
+        if self.recommender.mode == 'ann':
+            ann_index = self.recommender.ann_index.update(knn_features.matrix, remap, dirty)
+            recommender = RecommenderEngine(knn_features.matrix, knn_features.titles, version=version,
+                                            title_index=knn_title_index, mode='ann', ann_index=ann_index)
+        else:
+            neighbor_index = self.recommender.neighbor_index.update(knn_features.matrix, remap, dirty)
+            recommender = RecommenderEngine(knn_features.matrix, knn_features.titles, version=version,
+                                            title_index=knn_title_index, neighbor_index=neighbor_index)
+
+        # Record tampilan kolumnar dibangun ulang dengan operasi vektor; indeks turunannya diperbarui bertahap
+        dirty_names = set(df['name'].iloc[dirty])
+        latest_animes = build_latest_animes(df)
+        latest_positions = {name: pos for pos, name in enumerate(latest_animes.names.tolist())}
+        latest_remap = np.array([latest_positions.get(name, -1) for name in self.latest_animes.names.tolist()],
+                                dtype=np.int64)
+        latest_dirty = [pos for name, pos in latest_positions.items() if name in dirty_names]
+
+        # Indeks BM25: hapus dokumen yang keluar/berubah, tambahkan yang masuk/berubah
+        live = self.search_index.live
+        indexed = {name: doc_id for doc_id, name in enumerate(self.search_doc_names) if live[doc_id]}
+        removed_docs = [doc_id for name, doc_id in indexed.items()
+                        if name not in latest_positions or name in dirty_names]
+        added_docs = [latest_animes[pos] for name, pos in latest_positions.items()
+                      if name not in indexed or name in dirty_names]
+        if self.search_index.n_removed + len(removed_docs) > len(latest_animes):
+            # Terlalu banyak dokumen terhapus, padatkan dengan membangun ulang
+            search_index = BM25Index(latest_animes)
+            search_doc_names = latest_animes.names.tolist()
+        else:
+            search_doc_names = self.search_doc_names + [anime["name"] for anime in added_docs]
+            live = np.concatenate([live, np.ones(len(added_docs), dtype=bool)])
+            live[removed_docs] = False
+            doc_positions = np.array([
+                latest_positions[name] if live[doc_id] else -1
+                for doc_id, name in enumerate(search_doc_names)
+            ], dtype=np.int32)
+            search_index = self.search_index.update(removed_docs, added_docs, doc_positions)
+
+        logger.info(f"Katalog diperbarui bertahap: {len(diff.removed)} dihapus, "
+                    f"{len(diff.changed)} berubah, {len(diff.added)} ditambahkan")
+        return CatalogSnapshot(
+            df,
+            latest_animes,
+            version,
+            recommender,
+            self.title_index.update(latest_animes.names, latest_remap),
+            search_index,
+            self.similarity_engine.update(latest_animes, latest_remap, latest_dirty),
+            search_doc_names
+        )
+
+
+def load_catalog(on_page: Optional[Callable[[int, int, int], None]] = None) -> pd.DataFrame:
+    """Mengambil katalog (maksimal 1000 anime, 50 halaman) dari Jikan sebagai DataFrame."""
+    rows = fetch_top_anime(
+        pages=50,
+        limit=25,
+        max_items=1000,
+        client=JikanClient(cache=DiskResponseCache()),
+        on_page=on_page
+    )
+    return build_catalog_frame(rows)
+
+
+class CatalogRefresher:
+    """Menyimpan snapshot terakhir yang valid dan menyegarkannya di latar belakang."""
+
+    def __init__(self, loader: Callable[..., pd.DataFrame] = load_catalog,
+                 max_age: float = DEFAULT_MAX_AGE, retry_interval: float = RETRY_INTERVAL,
+                 shared_dir: str = SHARED_CACHE_DIR):
+        self.loader = loader
+        self.max_age = max_age
+        self.retry_interval = retry_interval
+        self.shared_dir = shared_dir
+        self.last_error: Optional[str] = None
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._next_attempt = 0.0
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """
+        Mengembalikan snapshot terakhir tanpa menunggu.
+
+        Jika snapshot sudah kedaluwarsa, refresh dijadwalkan di latar belakang dan
+        snapshot lama tetap dikembalikan sampai yang baru selesai dibangun.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.age() >= self.max_age:
+            self.refresh_async()
+        return snapshot
+
+    def refresh(self, on_page: Optional[Callable[[int, int, int], None]] = None) -> Optional[CatalogSnapshot]:
+        """
+        Membangun snapshot baru di thread pemanggil lalu memasangnya.
+
+        Jika pengambilan gagal atau hasilnya kosong, snapshot lama dipertahankan.
+        """
+        try:
+            df = self.loader(on_page=on_page)
+            if df.empty:
+                raise ValueError("Katalog kosong")
+            snapshot = self._next_snapshot(self._snapshot, df)
+        except Exception as e:
+            logger.error(f"Error saat menyegarkan katalog: {str(e)}")
+            with self._lock:
+                self.last_error = str(e)
+                self._next_attempt = time.time() + self.retry_interval
+            return self._snapshot
+
+        with self._lock:
+            self._snapshot = snapshot
+            self.last_error = None
+        logger.info(f"Snapshot katalog versi {snapshot.version} dipasang ({len(snapshot.df)} anime)")
+        return snapshot
+
+    def _next_snapshot(self, current: Optional[CatalogSnapshot], df: pd.DataFrame) -> CatalogSnapshot:
+        """Snapshot untuk katalog baru: diturunkan dari yang lama jika perubahannya kecil."""
+        if current is not None:
+            diff = diff_catalog(current.df, df)
+            if diff is not None and len(diff) == 0:
+                # Katalog tidak berubah, pakai ulang semua indeks dengan umur baru
+                return CatalogSnapshot(current.df, current.latest_animes, current.version,
+                                       current.recommender, current.title_index, current.search_index,
+                                       current.similarity_engine, current.search_doc_names)
+            if diff is not None and len(diff) <= MAX_INCREMENTAL_FRACTION * len(df):
+                return current.apply_diff(diff, self.shared_dir)
+        return CatalogSnapshot.build(df, self.shared_dir)
+
+    def refresh_async(self) -> bool:
+        """Menjalankan refresh di thread latar belakang jika belum ada yang berjalan."""
+        with self._lock:
+            if self._refreshing or time.time() < self._next_attempt:
+                return False
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="catalog-refresher", daemon=True).start()
+        return True
@@ -0,0 +1,290 @@
+"""
+Representasi katalog anime yang hemat memori.
+
+Dua bentuk yang disediakan:
+
+- `compact_frame` memadatkan DataFrame katalog di tempat yang sama dipakai
+  sebelumnya: kolom `type`, `status` dan `genre` menjadi kategori (jika
+  nilainya banyak berulang), tanggal tayang menjadi datetime64, kolom numerik
+  yang muat menjadi int32/float32, dan teks yang berulang (sinopsis, URL
+  gambar) di-intern sehingga nilai yang sama hanya disimpan sekali.
+- `CompactCatalog` menyimpan record tampilan secara kolumnar: kode kategori
+  untuk tipe dan status, id genre dalam layout CSR, numerik int32/float32 dan
+  sinopsis yang di-intern. Record (dict) baru dibuat saat diakses, sehingga
+  daftar seperti `latest_animes` tidak lagi menyalin seluruh tabel sebagai
+  list dict dengan list genre masing-masing.
+
+`python compact_catalog.py [data/anime.csv]` melaporkan byte per judul
+sebelum dan sesudah pemadatan.
+"""
+import sys
+import logging
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_COLUMNS = ('type', 'status', 'genre')
+INTERN_COLUMNS = ('synopsis', 'image_url')
+DATETIME_COLUMNS = ('aired_from',)
+
+UNKNOWN = "Unknown"
+# Sama dengan default di jikan_client, tanpa ikut mengimpor `requests` di jalur CLI
+DEFAULT_SYNOPSIS = "Tidak ada sinopsis tersedia."
+DEFAULT_IMAGE_URL = "https://cdn.myanimelist.net/images/anime/4/19644.jpg"
+
+_INT32 = np.iinfo(np.int32)
+
+
+def intern_strings(values: Iterable) -> np.ndarray:
+    """Array objek di mana teks yang sama menunjuk ke satu objek string."""
+    pool: Dict[str, str] = {}
+    return np.array([pool.setdefault(value, value) if isinstance(value, str) else value for value in values],
+                    dtype=object)
+
+
+def _smallest_int(max_value: int) -> np.dtype:
+    """Tipe integer bertanda terkecil yang memuat 0..max_value."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _downcast(series: pd.Series) -> pd.Series:
+    """Integer (atau float bernilai bulat tanpa NaN) menjadi int32; float lain menjadi float32 jika tanpa kehilangan."""
+    if pd.api.types.is_bool_dtype(series) or not len(series) or series.dtype.itemsize <= 4:
+        return series
+    values = series.to_numpy()
+    if pd.api.types.is_integer_dtype(series) or \
+            (not np.isnan(values).any() and np.array_equal(values, np.round(values))):
+        if values.min() >= _INT32.min and values.max() <= _INT32.max:
+            return series.astype(np.int32)
+        return series
+    narrowed = values.astype(np.float32)
+    if np.array_equal(narrowed.astype(values.dtype), values, equal_nan=True):
+        return series.astype(np.float32)
+    return series
+
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mengembalikan salinan DataFrame katalog dengan tipe kolom yang ringkas.
+
+    Konversi numerik hanya dilakukan jika nilainya tetap sama persis, sehingga
+    fitur dan rekomendasi yang dihitung dari DataFrame tidak berubah.
+    """
+    data = {}
+    for column in df.columns:
+        series = df[column]
+        if column in CATEGORY_COLUMNS and series.dtype == object:
+            # Kategori hanya menghemat memori jika nilainya banyak berulang
+            if series.nunique() <= len(series) // 2:
+                series = series.astype('category')
+        elif column in DATETIME_COLUMNS and series.dtype == object:
+            series = pd.to_datetime(series, errors='coerce', utc=True)
+        elif column in INTERN_COLUMNS and series.dtype == object:
+            series = pd.Series(intern_strings(series.to_numpy()), index=series.index, name=column)
+        elif pd.api.types.is_integer_dtype(series) or pd.api.types.is_float_dtype(series):
+            series = _downcast(series)
+        data[column] = series
+    return pd.DataFrame(data, index=df.index, columns=df.columns)
+
+
+def _categorical(values: Iterable) -> Tuple[np.ndarray, List[str]]:
+    """Kode kategori (int8/int16/...) dan daftar kategorinya."""
+    codes, categories = pd.factorize(pd.Series(list(values), dtype=object), sort=False)
+    return codes.astype(_smallest_int(max(len(categories) - 1, 0))), [str(value) for value in categories]
+
+
+def _column(df: pd.DataFrame, name: str, default) -> pd.Series:
+    return df[name] if name in df.columns else pd.Series([default] * len(df), index=df.index)
+
+
+def _text(df: pd.DataFrame, name: str, default: str) -> pd.Series:
+    """Kolom teks (juga kolom kategori) dengan nilai kosong diganti `default`."""
+    return _column(df, name, default).astype(object).fillna(default).astype(str)
+
+
+class CompactCatalog(Sequence):
+    """
+    Record tampilan anime dalam layout kolumnar.
+
+    Bertindak sebagai sequence read-only dari dict dengan kunci yang sama
+    seperti record tampilan sebelumnya (name, rating, type, episodes, genre,
+    members, status, year, synopsis, image_url, genres).
+    """
+
+    def __init__(self, names: np.ndarray, ratings: np.ndarray, members: np.ndarray, episodes: np.ndarray,
+                 years: np.ndarray, type_codes: np.ndarray, types: List[str],
+                 status_codes: np.ndarray, statuses: List[str],
+                 genre_offsets: np.ndarray, genre_ids: np.ndarray, genres: List[str],
+                 synopses: np.ndarray, image_urls: np.ndarray):
+        self.names = names
+        self.ratings = ratings
+        self.members = members
+        self.episodes = episodes
+        # 0 berarti tahun tidak diketahui
+        self.years = years
+        self.type_codes = type_codes
+        self.types = types
+        self.status_codes = status_codes
+        self.statuses = statuses
+        self.genre_offsets = genre_offsets
+        self.genre_ids = genre_ids
+        self.genre_names = genres
+        self.synopses = synopses
+        self.image_urls = image_urls
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> 'CompactCatalog':
+        """Membangun katalog ringkas dari DataFrame katalog (urutan baris dipertahankan)."""
+        n_rows = len(df)
+        if 'year' in df.columns:
+            years = pd.to_numeric(df['year'], errors='coerce')
+        else:
+            years = pd.to_datetime(_column(df, 'aired_from', None), errors='coerce', utc=True).dt.year
+        years = years.fillna(0).to_numpy().astype(np.int16)
+
+        genre_ids: Dict[str, int] = {}
+        offsets = np.zeros(n_rows + 1, dtype=np.int32)
+        row_genres = []
+        for row, value in enumerate(_text(df, 'genre', UNKNOWN)):
+            ids = [genre_ids.setdefault(genre, len(genre_ids)) for genre in value.split(', ')]
+            row_genres.extend(ids)
+            offsets[row + 1] = offsets[row] + len(ids)
+
+        type_codes, types = _categorical(_text(df, 'type', UNKNOWN))
+        status_codes, statuses = _categorical(_text(df, 'status', UNKNOWN))
+        return cls(
+            names=df['name'].astype(str).to_numpy(dtype=object),
+            ratings=pd.to_numeric(df['rating'], errors='coerce').fillna(0.0).to_numpy(dtype=np.float32),
+            members=pd.to_numeric(_column(df, 'members', 0), errors='coerce').fillna(0).to_numpy(dtype=np.int32),
+            episodes=pd.to_numeric(_column(df, 'episodes', 0), errors='coerce').fillna(0).to_numpy(dtype=np.int32),
+            years=years,
+            type_codes=type_codes,
+            types=types,
+            status_codes=status_codes,
+            statuses=statuses,
+            genre_offsets=offsets,
+            genre_ids=np.asarray(row_genres, dtype=_smallest_int(max(len(genre_ids) - 1, 0))),
+            genres=list(genre_ids),
+            synopses=intern_strings(_text(df, 'synopsis', DEFAULT_SYNOPSIS)),
+            image_urls=intern_strings(_text(df, 'image_url', DEFAULT_IMAGE_URL)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def genres(self, pos: int) -> List[str]:
+        """Daftar genre satu judul dari layout CSR."""
+        ids = self.genre_ids[self.genre_offsets[pos]:self.genre_offsets[pos + 1]]
+        return [self.genre_names[genre_id] for genre_id in ids.tolist()]
+
+    def record(self, pos: int) -> dict:
+        """Membuat record tampilan untuk satu judul."""
+        genres = self.genres(pos)
+        year = int(self.years[pos])
+        return {
+            'name': self.names[pos],
+            # Rating float32 dibulatkan agar kembali ke nilai desimal aslinya (mis. 8.19)
+            'rating': round(float(self.ratings[pos]), 4),
+            'type': self.types[self.type_codes[pos]],
+            'episodes': int(self.episodes[pos]),
+            'genre': ', '.join(genres),
+            'members': int(self.members[pos]),
+            'status': self.statuses[self.status_codes[pos]],
+            'year': year if year else UNKNOWN,
+            'synopsis': self.synopses[pos],
+            'image_url': self.image_urls[pos],
+            'genres': genres,
+        }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.record(pos) for pos in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("indeks katalog di luar jangkauan")
+        return self.record(index)
+
+    def nbytes(self) -> int:
+        """Perkiraan memori total (array + objek string unik)."""
+        arrays = (self.names, self.ratings, self.members, self.episodes, self.years, self.type_codes,
+                  self.status_codes, self.genre_offsets, self.genre_ids, self.synopses, self.image_urls)
+        strings = {id(value): value for column in (self.names, self.synopses, self.image_urls) for value in column}
+        strings.update((id(value), value) for value in self.types + self.statuses + self.genre_names)
+        return sum(array.nbytes for array in arrays) + sum(sys.getsizeof(value) for value in strings.values())
+
+
+def object_nbytes(obj, seen=None) -> int:
+    """Ukuran dalam (deep) sebuah objek Python; objek yang dipakai bersama hanya dihitung sekali."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        size = sys.getsizeof(obj)
+        if obj.dtype == object:
+            size += sum(object_nbytes(value, seen) for value in obj.ravel())
+        return size
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(object_nbytes(key, seen) + object_nbytes(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set)):
+        size += sum(object_nbytes(value, seen) for value in obj)
+    return size
+
+
+def frame_nbytes(df: pd.DataFrame) -> int:
+    """Memori DataFrame; string yang sama (di-intern) hanya dihitung sekali."""
+    seen = set()
+    total = df.index.nbytes
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            total += series.cat.codes.to_numpy().nbytes + object_nbytes(series.cat.categories.to_numpy(), seen)
+        elif series.dtype == object:
+            total += object_nbytes(series.to_numpy(), seen)
+        else:
+            total += series.to_numpy().nbytes
+    return total
+
+
+def memory_report(df: pd.DataFrame) -> List[dict]:
+    """
+    Byte per judul sebelum dan sesudah pemadatan, untuk DataFrame katalog dan
+    record tampilan (list dict vs `CompactCatalog`).
+    """
+    n_rows = max(len(df), 1)
+    catalog = CompactCatalog.from_frame(df)
+    rows = [
+        ('dataframe', frame_nbytes(df), frame_nbytes(compact_frame(df))),
+        ('records', object_nbytes([catalog.record(pos) for pos in range(len(catalog))]), catalog.nbytes()),
+    ]
+    return [
+        {'structure': name, 'before_bytes_per_title': before / n_rows, 'after_bytes_per_title': after / n_rows,
+         'ratio': after / before if before else None}
+        for name, before, after in rows
+    ]
+
+
+def main(argv=None):
+    from anime_recomendation import ensure_data_folder, load_data
+
+    argv = sys.argv[1:] if argv is None else argv
+    csv_path = argv[0] if argv else ensure_data_folder()
+    df = load_data(csv_path)
+    print(f"{len(df)} judul dari {csv_path}")
+    print(f"{'struktur':<12}{'sebelum B/judul':>18}{'sesudah B/judul':>18}{'rasio':>8}")
+    for row in memory_report(df):
+        print(f"{row['structure']:<12}{row['before_bytes_per_title']:>18.1f}{row['after_bytes_per_title']:>18.1f}"
+              f"{row['ratio']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
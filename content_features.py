@@ -0,0 +1,281 @@
+"""
+Kemiripan konten anime dari sinopsis (TF-IDF) dan genre (multi-hot).
+
+Matriks konten dibangun sekali per versi data: vektor TF-IDF sinopsis dan
+vektor genre, masing-masing dinormalisasi L2 lalu digabung dengan bobot akar
+sehingga hasil kali dalam dua baris sama dengan
+
+    bobot_sinopsis * cos(sinopsis) + bobot_genre * cos(genre)
+
+Top-k tetangga kosinus untuk semua judul dihitung dengan perkalian matriks
+sparse per potongan baris yang ukurannya dibatasi anggaran memori, lalu
+disimpan ke disk di samping `data/anime.csv` bersama matriksnya.
+
+`blend_neighbors` menggabungkan skor konten dengan kemiripan numerik
+(rating/members/episodes) memakai bobot yang bisa diatur (`CONTENT_WEIGHT`).
+"""
+import os
+import logging
+from typing import TYPE_CHECKING, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from neighbor_index import source_signature
+
+if TYPE_CHECKING:
+    # scipy.sparse hanya diimpor saat indeks konten dipakai (bobot konten > 0)
+    import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+# Bobot konten terhadap kemiripan numerik (0 = hanya numerik, 1 = hanya konten)
+DEFAULT_CONTENT_WEIGHT = float(os.environ.get("CONTENT_WEIGHT", "0"))
+# Pembagian bobot di dalam skor konten
+SYNOPSIS_WEIGHT = 0.5
+GENRE_WEIGHT = 0.5
+
+DEFAULT_CONTENT_NEIGHBORS = 20
+MAX_SYNOPSIS_FEATURES = 50000
+# Batas memori blok skor padat (baris x seluruh katalog) per potongan
+DEFAULT_MEMORY_BUDGET = 256 * 2**20
+
+INDEX_VERSION = 1
+
+
+def content_index_path(csv_path: str) -> str:
+    """Mengembalikan lokasi file indeks konten untuk file CSV tertentu."""
+    base, _ = os.path.splitext(csv_path)
+    return f"{base}_content.npz"
+
+
+def _normalize_rows(matrix: 'sp.csr_matrix') -> 'sp.csr_matrix':
+    """Menormalisasi setiap baris ke panjang L2 = 1 (baris kosong dibiarkan nol)."""
+    import scipy.sparse as sp
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.csr_matrix(sp.diags((1.0 / norms).astype(np.float32)) @ matrix)
+
+
+def synopsis_matrix(synopses: Sequence[str]) -> 'sp.csr_matrix':
+    """Matriks TF-IDF sparse (float32, baris ternormalisasi) dari sinopsis."""
+    import scipy.sparse as sp
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    texts = pd.Series(synopses, dtype=object).fillna('').astype(str)
+    vectorizer = TfidfVectorizer(
+        stop_words='english',
+        sublinear_tf=True,
+        min_df=2 if len(texts) >= 100 else 1,
+        max_df=0.5 if len(texts) >= 100 else 1.0,
+        max_features=MAX_SYNOPSIS_FEATURES,
+        dtype=np.float32
+    )
+    try:
+        return sp.csr_matrix(vectorizer.fit_transform(texts))
+    except ValueError:
+        # Tidak ada term yang tersisa (mis. semua sinopsis kosong)
+        return sp.csr_matrix((len(texts), 0), dtype=np.float32)
+
+
+def genre_matrix(genres: Sequence[str]) -> 'sp.csr_matrix':
+    """Matriks genre multi-hot sparse (float32, baris ternormalisasi)."""
+    import scipy.sparse as sp
+
+    genre_ids = {}
+    rows, cols = [], []
+    for row, value in enumerate(genres):
+        if not isinstance(value, str):
+            continue
+        for genre in {genre.strip() for genre in value.split(',') if genre.strip()}:
+            rows.append(row)
+            cols.append(genre_ids.setdefault(genre, len(genre_ids)))
+    matrix = sp.csr_matrix(
+        (np.ones(len(rows), dtype=np.float32), (rows, cols)),
+        shape=(len(genres), len(genre_ids))
+    )
+    return _normalize_rows(matrix)
+
+
+def content_matrix(df: pd.DataFrame, synopsis_weight: float = SYNOPSIS_WEIGHT,
+                   genre_weight: float = GENRE_WEIGHT) -> 'sp.csr_matrix':
+    """Gabungan TF-IDF sinopsis dan genre; hasil kali dalam = kosinus berbobot."""
+    import scipy.sparse as sp
+
+    total = synopsis_weight + genre_weight
+    parts = [
+        synopsis_matrix(df['synopsis'] if 'synopsis' in df.columns else [''] * len(df)) *
+        np.float32(np.sqrt(synopsis_weight / total)),
+        genre_matrix(df['genre'] if 'genre' in df.columns else [None] * len(df)) *
+        np.float32(np.sqrt(genre_weight / total)),
+    ]
+    return sp.hstack(parts, format='csr', dtype=np.float32)
+
+
+def topk_cosine(matrix: 'sp.csr_matrix', k: int,
+                memory_budget: int = DEFAULT_MEMORY_BUDGET) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Top-k tetangga kosinus untuk semua baris dengan perkalian sparse per potongan.
+
+    Jumlah baris per potongan dipilih agar hasil perkalian sparse (hingga
+    8 byte per nilai) dan blok skor padatnya (float32) tidak melebihi
+    `memory_budget`.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Posisi tetangga (n x k, int32) dan skor
+        kosinusnya (n x k, float32), urut dari yang paling mirip
+    """
+    n_rows = matrix.shape[0]
+    k = min(k, max(n_rows - 1, 0))
+    indices = np.empty((n_rows, k), dtype=np.int32)
+    scores = np.empty((n_rows, k), dtype=np.float32)
+    if k == 0:
+        return indices, scores
+
+    chunk_size = int(max(1, min(n_rows, memory_budget // (n_rows * 12))))
+    transposed = matrix.T.tocsr()
+    for start in range(0, n_rows, chunk_size):
+        end = min(start + chunk_size, n_rows)
+        block = (matrix[start:end] @ transposed).toarray()
+        block[np.arange(end - start), np.arange(start, end)] = -np.inf
+        candidates = np.argpartition(block, -k, axis=1)[:, -k:]
+        candidate_scores = np.take_along_axis(block, candidates, axis=1)
+        # Urutkan skor menurun, posisi menaik untuk nilai seri
+        order = np.lexsort((candidates, -candidate_scores), axis=-1)
+        indices[start:end] = np.take_along_axis(candidates, order, axis=1)
+        scores[start:end] = np.take_along_axis(candidate_scores, order, axis=1)
+    return indices, scores
+
+
+class ContentIndex:
+    """Matriks konten dan tabel top-k tetangga kosinus untuk seluruh katalog."""
+
+    def __init__(self, matrix: 'sp.csr_matrix', indices: np.ndarray, scores: np.ndarray,
+                 signature: Optional[np.ndarray] = None):
+        self.matrix = matrix
+        self.indices = indices
+        self.scores = scores
+        self.signature = signature
+
+    @property
+    def k(self) -> int:
+        return self.indices.shape[1]
+
+    def __len__(self) -> int:
+        return self.indices.shape[0]
+
+    @classmethod
+    def build(cls, df: pd.DataFrame, k: int = DEFAULT_CONTENT_NEIGHBORS,
+              synopsis_weight: float = SYNOPSIS_WEIGHT, genre_weight: float = GENRE_WEIGHT,
+              memory_budget: int = DEFAULT_MEMORY_BUDGET,
+              signature: Optional[np.ndarray] = None) -> 'ContentIndex':
+        """Membangun matriks konten dan tabel tetangganya dari DataFrame katalog."""
+        matrix = content_matrix(df, synopsis_weight, genre_weight)
+        indices, scores = topk_cosine(matrix, k, memory_budget)
+        logger.info(f"Indeks konten dibangun untuk {matrix.shape[0]} anime ({matrix.shape[1]} fitur)")
+        return cls(matrix, indices, scores, signature)
+
+    def query(self, position: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """k judul dengan konten paling mirip dari tabel yang sudah dihitung."""
+        return self.indices[position, :k], self.scores[position, :k]
+
+    def similarity(self, position: int, candidates: np.ndarray) -> np.ndarray:
+        """Kosinus konten antara satu judul dan daftar posisi kandidat."""
+        return np.asarray((self.matrix[candidates] @ self.matrix[position].T).toarray()).ravel()
+
+    def save(self, path: str):
+        """Menyimpan matriks dan tabel tetangga ke disk (ditulis atomik)."""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            version=np.array([INDEX_VERSION]),
+            data=self.matrix.data,
+            matrix_indices=self.matrix.indices,
+            indptr=self.matrix.indptr,
+            shape=np.array(self.matrix.shape),
+            indices=self.indices,
+            scores=self.scores,
+            signature=self.signature if self.signature is not None else np.array([], dtype=np.int64)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'ContentIndex':
+        """Memuat indeks konten dari disk."""
+        import scipy.sparse as sp
+
+        with np.load(path) as data:
+            if int(data['version'][0]) != INDEX_VERSION:
+                raise ValueError("Versi indeks konten tidak didukung")
+            matrix = sp.csr_matrix((data['data'], data['matrix_indices'], data['indptr']),
+                                   shape=tuple(data['shape']))
+            return cls(matrix, data['indices'], data['scores'], data['signature'])
+
+
+def load_or_build_content_index(df: pd.DataFrame, csv_path: Optional[str] = None,
+                                k: int = DEFAULT_CONTENT_NEIGHBORS) -> ContentIndex:
+    """
+    Memuat indeks konten dari disk jika masih valid, atau membangunnya ulang.
+
+    Args:
+        df (pd.DataFrame): Katalog (baris sejajar dengan matriks fitur numerik)
+        csv_path (str): Lokasi file sumber; indeks disimpan di sampingnya
+        k (int): Jumlah tetangga konten per judul
+
+    Returns:
+        ContentIndex: Indeks yang siap dipakai
+    """
+    path = content_index_path(csv_path) if csv_path else None
+    signature = source_signature(csv_path) if csv_path else None
+
+    if path and os.path.exists(path):
+        try:
+            index = ContentIndex.load(path)
+            if len(index) == len(df) and index.k >= min(k, len(df) - 1) and \
+                    np.array_equal(index.signature, signature):
+                logger.info(f"Indeks konten dimuat dari: {path}")
+                return index
+        except Exception as e:
+            logger.warning(f"Indeks konten tidak dapat dibaca, membangun ulang: {str(e)}")
+
+    index = ContentIndex.build(df, k, signature=signature)
+    if path:
+        try:
+            index.save(path)
+            logger.info(f"Indeks konten disimpan ke: {path}")
+        except OSError as e:
+            logger.warning(f"Gagal menyimpan indeks konten: {str(e)}")
+    return index
+
+
+def blend_neighbors(position: int, features: np.ndarray, content: ContentIndex,
+                    numeric_candidates: np.ndarray, k: int,
+                    content_weight: float = DEFAULT_CONTENT_WEIGHT) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Menggabungkan tetangga numerik dan tetangga konten menjadi satu peringkat.
+
+    Kandidat adalah gabungan tetangga numerik dan tetangga konten dari tabel.
+    Untuk setiap kandidat dihitung kemiripan numerik `1 - jarak / jarak terjauh`
+    (seperti skor rekomendasi biasa) dan kosinus konten, lalu
+
+        skor = (1 - content_weight) * numerik + content_weight * konten
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Posisi k kandidat terbaik dan skor gabungannya
+    """
+    content_candidates, _ = content.query(position, content.k)
+    candidates = np.union1d(np.asarray(numeric_candidates, dtype=np.int64),
+                            np.asarray(content_candidates, dtype=np.int64))
+    candidates = candidates[candidates != position]
+    if len(candidates) == 0:
+        return candidates.astype(np.int32), np.empty(0, dtype=np.float32)
+
+    distances = np.linalg.norm(np.asarray(features[candidates], dtype=np.float64) -
+                               np.asarray(features[position], dtype=np.float64), axis=1)
+    max_distance = distances.max()
+    numeric_similarity = 1 - distances / max_distance if max_distance > 0 else np.ones(len(candidates))
+    scores = (1 - content_weight) * numeric_similarity + content_weight * content.similarity(position, candidates)
+
+    order = np.lexsort((candidates, -scores))[:k]
+    return candidates[order].astype(np.int32), scores[order].astype(np.float32)
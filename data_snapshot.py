@@ -0,0 +1,229 @@
+"""
+Snapshot biner kolumnar dari `data/anime.csv`.
+
+Snapshot menyimpan DataFrame yang sudah dibersihkan dan matriks fitur yang sudah
+dinormalisasi ke folder `data/anime_snapshot/`:
+
+- kolom numerik sebagai file `.npy`,
+- kolom teks sebagai satu blob UTF-8 beserta array offset,
+- kolom kategori sebagai kode integer beserta daftar kategorinya,
+- kolom tanggal sebagai int64 (nanodetik) beserta zona waktunya,
+- matriks fitur beserta judul per baris di subfolder `features/` dalam format
+  yang bisa dipetakan ke memori (lihat `shared_matrix`),
+- `meta.json` berisi ukuran, mtime dan hash SHA-256 file CSV sumber.
+
+Start berikutnya cukup membaca file biner tersebut tanpa parsing CSV maupun
+normalisasi ulang. Validasi kolom juga memakai metadata snapshot.
+"""
+import os
+import json
+import shutil
+import hashlib
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from shared_matrix import open_shared_matrix, write_shared_matrix
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 3
+META_FILE = 'meta.json'
+FEATURES_DIR = 'features'
+INDEX_FILE = 'index.npy'
+
+
+def snapshot_dir(csv_path: str) -> str:
+    """Mengembalikan lokasi folder snapshot untuk file CSV tertentu."""
+    base, _ = os.path.splitext(csv_path)
+    return f"{base}_snapshot"
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """Menghitung hash SHA-256 dari isi file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_string_column(base: str, values):
+    """Menyimpan kolom teks sebagai blob UTF-8 + offset (+ mask nilai kosong)."""
+    mask = pd.isna(values)
+    encoded = [b'' if missing else str(value).encode('utf-8') for value, missing in zip(values, mask)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    with open(f"{base}.utf8", 'wb') as f:
+        f.write(b''.join(encoded))
+    np.save(f"{base}.offsets.npy", offsets)
+    if mask.any():
+        np.save(f"{base}.mask.npy", mask)
+
+
+def _read_string_column(base: str) -> np.ndarray:
+    """Membaca kolom teks yang disimpan oleh `_write_string_column`."""
+    with open(f"{base}.utf8", 'rb') as f:
+        blob = f.read()
+    offsets = np.load(f"{base}.offsets.npy")
+    values = np.array(
+        [blob[start:end].decode('utf-8') for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())],
+        dtype=object
+    )
+    if os.path.exists(f"{base}.mask.npy"):
+        values[np.load(f"{base}.mask.npy")] = np.nan
+    return values
+
+
+def read_snapshot_meta(csv_path: str) -> Optional[dict]:
+    """
+    Membaca metadata snapshot jika snapshot masih sesuai dengan file CSV.
+
+    Snapshot dianggap valid jika ukuran file sama dan mtime sama. Jika hanya
+    mtime yang berubah, hash isi file dibandingkan; bila hash sama, mtime di
+    metadata diperbarui sehingga pengecekan berikutnya kembali murah.
+
+    Returns:
+        Optional[dict]: Metadata snapshot, atau None jika tidak ada / kedaluwarsa
+    """
+    meta_path = os.path.join(snapshot_dir(csv_path), META_FILE)
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        stat = os.stat(csv_path)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get('version') != SNAPSHOT_VERSION or meta['source']['size'] != stat.st_size:
+        return None
+    if meta['source']['mtime_ns'] == stat.st_mtime_ns:
+        return meta
+    if meta['source']['sha256'] != file_hash(csv_path):
+        return None
+
+    meta['source']['mtime_ns'] = stat.st_mtime_ns
+    try:
+        _write_meta(meta_path, meta)
+    except OSError:
+        pass
+    return meta
+
+
+def _write_meta(meta_path: str, meta: dict):
+    tmp_path = f"{meta_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, meta_path)
+
+
+def save_snapshot(csv_path: str, df: pd.DataFrame, features_scaled: pd.DataFrame):
+    """
+    Menyimpan DataFrame bersih dan fitur ternormalisasi sebagai snapshot biner.
+
+    File ditulis ke folder sementara lalu dipindahkan sekaligus, sehingga
+    pembaca lain tidak pernah melihat snapshot yang setengah jadi.
+    """
+    target_dir = snapshot_dir(csv_path)
+    tmp_dir = f"{target_dir}.tmp-{os.getpid()}"
+    stat = os.stat(csv_path)
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        columns = []
+        for i, column in enumerate(df.columns):
+            base = os.path.join(tmp_dir, f"col_{i}")
+            values = df[column].to_numpy()
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                np.save(f"{base}.codes.npy", df[column].cat.codes.to_numpy())
+                _write_string_column(f"{base}.categories", df[column].cat.categories.to_numpy())
+                kind = 'category'
+            elif pd.api.types.is_datetime64_any_dtype(df[column]):
+                dates = df[column].dt.tz_localize(None) if df[column].dt.tz is not None else df[column]
+                np.save(f"{base}.npy", dates.to_numpy(dtype='datetime64[ns]').view(np.int64))
+                kind = 'datetime'
+            elif pd.api.types.is_numeric_dtype(df[column]) and not pd.api.types.is_bool_dtype(df[column]):
+                np.save(f"{base}.npy", values)
+                kind = 'numeric'
+            else:
+                _write_string_column(base, values)
+                kind = 'string'
+            column_meta = {'name': column, 'kind': kind}
+            if kind == 'datetime' and df[column].dt.tz is not None:
+                column_meta['tz'] = str(df[column].dt.tz)
+            columns.append(column_meta)
+
+        np.save(os.path.join(tmp_dir, INDEX_FILE), df.index.to_numpy())
+        write_shared_matrix(os.path.join(tmp_dir, FEATURES_DIR), features_scaled.values, df['name'],
+                            features_scaled.columns)
+
+        meta = {
+            'version': SNAPSHOT_VERSION,
+            'source': {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': file_hash(csv_path)
+            },
+            'rows': len(df),
+            'columns': columns,
+            'feature_columns': list(features_scaled.columns)
+        }
+        _write_meta(os.path.join(tmp_dir, META_FILE), meta)
+
+        shutil.rmtree(target_dir, ignore_errors=True)
+        os.replace(tmp_dir, target_dir)
+        logger.info(f"Snapshot data disimpan ke: {target_dir}")
+    except Exception as e:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.warning(f"Gagal menyimpan snapshot data: {str(e)}")
+
+
+def load_snapshot(csv_path: str, meta: Optional[dict] = None,
+                  mmap: bool = False) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Memuat DataFrame bersih dan fitur ternormalisasi dari snapshot.
+
+    Dengan `mmap=True` matriks fitur dipetakan read-only ke memori sehingga
+    beberapa worker berbagi halaman memori yang sama.
+
+    Returns:
+        Optional[Tuple[pd.DataFrame, pd.DataFrame]]: (data, features_scaled),
+        atau None jika snapshot tidak ada atau sudah kedaluwarsa
+    """
+    if meta is None:
+        meta = read_snapshot_meta(csv_path)
+    if meta is None:
+        return None
+
+    directory = snapshot_dir(csv_path)
+    try:
+        data = {}
+        for i, column in enumerate(meta['columns']):
+            base = os.path.join(directory, f"col_{i}")
+            if column['kind'] == 'numeric':
+                data[column['name']] = np.load(f"{base}.npy")
+            elif column['kind'] == 'category':
+                data[column['name']] = pd.Categorical.from_codes(np.load(f"{base}.codes.npy"),
+                                                                 _read_string_column(f"{base}.categories"))
+            elif column['kind'] == 'datetime':
+                # DatetimeIndex (bukan Series) agar nilainya tetap posisional terhadap index snapshot
+                values = pd.DatetimeIndex(np.load(f"{base}.npy").view('datetime64[ns]'))
+                data[column['name']] = values.tz_localize(column['tz']) if column.get('tz') else values
+            else:
+                data[column['name']] = _read_string_column(base)
+        index = np.load(os.path.join(directory, INDEX_FILE))
+        df = pd.DataFrame(data, index=index, columns=[column['name'] for column in meta['columns']])
+
+        shared = open_shared_matrix(os.path.join(directory, FEATURES_DIR))
+        if mmap:
+            features_scaled = shared.to_frame()
+        else:
+            features_scaled = pd.DataFrame(np.array(shared.matrix), columns=shared.columns)
+    except Exception as e:
+        logger.warning(f"Snapshot data tidak dapat dibaca: {str(e)}")
+        return None
+
+    logger.info(f"Berhasil memuat {len(df)} data anime dari snapshot")
+    return df, features_scaled
@@ -0,0 +1,334 @@
+"""
+Klien Jikan API untuk mengambil daftar top anime secara paralel.
+
+- Pembatas laju token bucket sesuai batas resmi Jikan (3 request/detik dan
+  60 request/menit), dibagi oleh semua thread pengambil.
+- Retry dengan exponential backoff + jitter, dan menghormati header Retry-After
+  saat terkena rate limit (429) atau error server (5xx).
+- Halaman diproses begitu selesai diunduh (bukan menunggu semua halaman).
+
+Respons bisa disimpan di cache disk (`DiskResponseCache`) per URL beserta
+ETag/Last-Modified. Respons yang masih segar dibaca dari disk tanpa request;
+yang sudah kedaluwarsa divalidasi ulang dengan request kondisional, dan isi
+yang tersimpan tetap dipakai saat server menjawab 304 atau jaringan gagal.
+
+Alamat API bisa diarahkan ke server lokal lewat variabel lingkungan
+`JIKAN_BASE_URL`, misalnya server replay dari `jikan_replay.py`.
+"""
+import os
+import json
+import time
+import hashlib
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+JIKAN_BASE_URL = os.environ.get("JIKAN_BASE_URL", "https://api.jikan.moe/v4")
+JIKAN_CACHE_DIR = os.environ.get(
+    "JIKAN_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "jikan_cache")
+)
+
+# Batas laju resmi Jikan API v4
+REQUESTS_PER_SECOND = 3
+REQUESTS_PER_MINUTE = 60
+
+# Umur maksimum respons di cache sebelum divalidasi ulang (detik). Setiap entri
+# diberi jitter agar tidak semua halaman kedaluwarsa pada saat yang sama.
+CACHE_MAX_AGE = 3600
+CACHE_MAX_AGE_JITTER = 0.2
+
+DEFAULT_WORKERS = 3
+DEFAULT_TIMEOUT = 30
+MAX_RETRIES = 5
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+DEFAULT_IMAGE_URL = "https://cdn.myanimelist.net/images/anime/4/19644.jpg"
+DEFAULT_SYNOPSIS = "Tidak ada sinopsis tersedia."
+
+
+class TokenBucket:
+    """Token bucket thread-safe: `capacity` token, diisi ulang `rate` token per detik."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Mengambil satu token; mengembalikan waktu tunggu jika token belum cukup."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """Menunggu sampai satu token tersedia."""
+        while True:
+            wait = self._reserve()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """Gabungan beberapa token bucket (mis. per detik dan per menit)."""
+
+    def __init__(self, per_second: float = REQUESTS_PER_SECOND, per_minute: float = REQUESTS_PER_MINUTE):
+        self.buckets = [TokenBucket(per_second, per_second), TokenBucket(per_minute / 60.0, per_minute)]
+
+    def acquire(self):
+        for bucket in self.buckets:
+            bucket.acquire()
+
+
+def retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Membaca header Retry-After (detik atau tanggal HTTP) dalam satuan detik."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = BACKOFF_BASE, maximum: float = BACKOFF_MAX) -> float:
+    """Exponential backoff dengan full jitter."""
+    return random.uniform(0, min(maximum, base * (2 ** attempt)))
+
+
+class DiskResponseCache:
+    """Cache respons HTTP di disk: satu file JSON per URL."""
+
+    def __init__(self, directory: str = JIKAN_CACHE_DIR, max_age: float = CACHE_MAX_AGE):
+        self.directory = directory
+        self.max_age = max_age
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, url: str) -> str:
+        return os.path.join(self.directory, f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json")
+
+    def get(self, url: str) -> Optional[dict]:
+        """Entri cache untuk URL (body, etag, last_modified, expires_at), atau None."""
+        try:
+            with open(self._path(url), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, body: dict, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        """Menyimpan respons (ditulis atomik) dengan waktu kedaluwarsa yang diberi jitter."""
+        self._write(url, {
+            "url": url,
+            "body": body,
+            "etag": etag,
+            "last_modified": last_modified,
+            "expires_at": self._expiry()
+        })
+
+    def touch(self, url: str, entry: dict):
+        """Memperpanjang masa berlaku entri setelah server menjawab 304."""
+        entry["expires_at"] = self._expiry()
+        self._write(url, entry)
+
+    def is_fresh(self, entry: dict) -> bool:
+        return entry.get("expires_at", 0) > time.time()
+
+    def _expiry(self) -> float:
+        return time.time() + self.max_age * (1 + random.uniform(0, CACHE_MAX_AGE_JITTER))
+
+    def _write(self, url: str, entry: dict):
+        path = self._path(url)
+        tmp_path = f"{path}.tmp-{os.getpid()}-{threading.get_ident()}"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Gagal menyimpan cache untuk {url}: {str(e)}")
+
+
+class JikanClient:
+    """Klien HTTP Jikan dengan pembatas laju bersama, retry dan cache disk opsional."""
+
+    def __init__(self, base_url: str = None, limiter: Optional[RateLimiter] = None,
+                 timeout: float = DEFAULT_TIMEOUT, max_retries: int = MAX_RETRIES,
+                 cache: Optional[DiskResponseCache] = None):
+        self.base_url = (base_url or JIKAN_BASE_URL).rstrip('/')
+        self.limiter = limiter or RateLimiter()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.cache = cache
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # Satu session (connection pool) per thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+        return session
+
+    def get_json(self, path: str, params: Optional[dict] = None) -> dict:
+        """
+        Mengambil satu endpoint Jikan sebagai JSON, lewat cache disk jika ada.
+
+        Entri cache yang masih segar dikembalikan tanpa request. Entri yang sudah
+        kedaluwarsa divalidasi ulang secara kondisional; isi lama tetap dipakai
+        jika server menjawab 304 atau request gagal.
+
+        Raises:
+            requests.exceptions.RequestException: Jika request gagal dan tidak ada cache
+        """
+        url = requests.Request("GET", f"{self.base_url}/{path.lstrip('/')}", params=params).prepare().url
+        entry = self.cache.get(url) if self.cache is not None else None
+        if entry is not None and self.cache.is_fresh(entry):
+            return entry["body"]
+
+        headers = {}
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self._request(url, headers)
+        except requests.exceptions.RequestException as e:
+            if entry is None:
+                raise
+            logger.warning(f"Gagal memvalidasi ulang {url} ({str(e)}), memakai data dari cache")
+            return entry["body"]
+
+        if response.status_code == 304 and entry is not None:
+            self.cache.touch(url, entry)
+            return entry["body"]
+
+        body = response.json()
+        if self.cache is not None:
+            self.cache.put(url, body, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+        return body
+
+    def _request(self, url: str, headers: dict) -> requests.Response:
+        """Satu request GET dengan rate limit, retry, backoff dan Retry-After."""
+        for attempt in range(self.max_retries + 1):
+            self.limiter.acquire()
+            try:
+                response = self._session().get(url, headers=headers, timeout=self.timeout)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"Gagal menghubungi {url} ({str(e)}), mencoba lagi dalam {delay:.1f} detik")
+                time.sleep(delay)
+                continue
+
+            if response.status_code == 429 or response.status_code >= 500:
+                if attempt >= self.max_retries:
+                    response.raise_for_status()
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    delay = backoff_delay(attempt)
+                logger.warning(f"Status {response.status_code} dari {url}, menunggu {delay:.1f} detik")
+                time.sleep(delay)
+                continue
+
+            response.raise_for_status()
+            return response
+
+        raise requests.exceptions.RetryError(f"Gagal mengambil {url}")
+
+    def top_anime_page(self, page: int, limit: int = 25) -> dict:
+        """Mengambil satu halaman `top/anime`."""
+        return self.get_json("top/anime", params={"page": page, "limit": limit})
+
+
+def parse_anime(anime: dict) -> dict:
+    """Mengubah satu item Jikan menjadi baris katalog."""
+    image_url = anime['images']['jpg']['image_url'] if anime['images']['jpg']['image_url'] else DEFAULT_IMAGE_URL
+    return {
+        'name': anime['title'],
+        'rating': float(anime['score']) if anime['score'] else 0.0,
+        'type': anime['type'] or "Unknown",
+        'episodes': int(anime['episodes']) if anime['episodes'] else 0,
+        'genre': ', '.join([genre['name'] for genre in anime['genres']]) if anime['genres'] else "Unknown",
+        'members': int(anime['members']) if anime['members'] else 0,
+        'popularity': int(anime['popularity']) if anime['popularity'] else 0,
+        'status': anime['status'] or "Unknown",
+        'aired_from': anime['aired']['from'],
+        'synopsis': anime['synopsis'] or DEFAULT_SYNOPSIS,
+        'image_url': image_url
+    }
+
+
+def parse_page(result: dict) -> List[dict]:
+    """Mengubah satu halaman Jikan menjadi daftar baris katalog (item rusak dilewati)."""
+    rows = []
+    for anime in result.get("data", []):
+        try:
+            rows.append(parse_anime(anime))
+        except (KeyError, TypeError, ValueError):
+            continue
+    return rows
+
+
+def fetch_top_anime(pages: int = 50, limit: int = 25, max_items: int = 1000,
+                    workers: int = DEFAULT_WORKERS, client: Optional[JikanClient] = None,
+                    on_page: Optional[Callable[[int, int, int], None]] = None) -> List[dict]:
+    """
+    Mengambil beberapa halaman `top/anime` secara paralel.
+
+    Setiap halaman diparse begitu selesai diunduh. Halaman yang tetap gagal
+    setelah retry dilewati. Hasil akhir disusun ulang sesuai nomor halaman.
+
+    Args:
+        pages (int): Jumlah halaman yang diambil
+        limit (int): Jumlah item per halaman
+        max_items (int): Jumlah anime maksimum
+        workers (int): Jumlah thread pengambil
+        client (JikanClient): Klien yang dipakai (default: klien baru)
+        on_page: Callback (halaman, halaman_selesai, jumlah_item) yang dipanggil
+            dari thread pemanggil setiap kali satu halaman selesai
+
+    Returns:
+        List[dict]: Baris katalog, urut sesuai peringkat Jikan
+    """
+    client = client or JikanClient()
+    # Tidak perlu meminta halaman di luar batas jumlah item
+    pages = min(pages, -(-max_items // limit))
+    rows_by_page: Dict[int, List[dict]] = {}
+    n_items = 0
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(client.top_anime_page, page, limit): page for page in range(1, pages + 1)}
+        for done, future in enumerate(as_completed(futures), 1):
+            page = futures[future]
+            try:
+                rows_by_page[page] = parse_page(future.result())
+                n_items += len(rows_by_page[page])
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Gagal mengambil data halaman {page}: {str(e)}")
+            if on_page is not None:
+                on_page(page, done, n_items)
+
+    rows = [row for page in sorted(rows_by_page) for row in rows_by_page[page]]
+    return rows[:max_items]
@@ -0,0 +1,124 @@
+"""
+Server HTTP lokal yang memutar ulang halaman `top/anime` Jikan hasil rekaman.
+
+Dipakai untuk menguji `jikan_client` tanpa jaringan dan tanpa terkena rate
+limit sungguhan.
+
+Contoh:
+    python jikan_replay.py record --pages 50 --out data/jikan_pages
+    python jikan_replay.py serve --dir data/jikan_pages --port 8765 --rate-limit-every 7
+    JIKAN_BASE_URL=http://127.0.0.1:8765/v4 streamlit run streamlit_app.py
+"""
+import os
+import json
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+PAGE_FILE = "top_anime_page_{page}.json"
+
+
+def record_pages(pages: int, out_dir: str, limit: int = 25):
+    """Merekam halaman `top/anime` dari Jikan ke folder `out_dir`."""
+    from jikan_client import JikanClient
+
+    os.makedirs(out_dir, exist_ok=True)
+    client = JikanClient()
+    for page in range(1, pages + 1):
+        result = client.top_anime_page(page, limit)
+        with open(os.path.join(out_dir, PAGE_FILE.format(page=page)), "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False)
+        print(f"Halaman {page} direkam")
+
+
+def make_handler(pages_dir: str, rate_limit_every: int = 0, retry_after: float = 1.0):
+    """
+    Membuat handler yang melayani `/v4/top/anime?page=N` dari file rekaman.
+
+    Setiap halaman dikirim dengan ETag dan dijawab 304 untuk request kondisional
+    yang cocok. Jika `rate_limit_every` > 0, setiap request ke-N dijawab 429
+    dengan header Retry-After untuk menguji perilaku retry klien.
+    """
+    counter = {'requests': 0}
+    lock = threading.Lock()
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status: int, body: dict, headers: dict = None):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if not url.path.rstrip("/").endswith("/top/anime"):
+                self._send_json(404, {"error": "not found"})
+                return
+
+            with lock:
+                counter['requests'] += 1
+                limited = rate_limit_every > 0 and counter['requests'] % rate_limit_every == 0
+            if limited:
+                self._send_json(429, {"error": "rate limited"}, {"Retry-After": str(retry_after)})
+                return
+
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            path = os.path.join(pages_dir, PAGE_FILE.format(page=page))
+            if not os.path.exists(path):
+                self._send_json(200, {"data": [], "pagination": {"has_next_page": False}})
+                return
+            with open(path, "rb") as f:
+                raw = f.read()
+            etag = f'"{hashlib.sha1(raw).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            self._send_json(200, json.loads(raw), {"ETag": etag})
+
+        def log_message(self, format, *args):
+            pass
+
+    return ReplayHandler
+
+
+def serve_replay(pages_dir: str, host: str = "127.0.0.1", port: int = 8765,
+                 rate_limit_every: int = 0) -> ThreadingHTTPServer:
+    """Menjalankan server replay di thread latar belakang dan mengembalikannya."""
+    server = ThreadingHTTPServer((host, port), make_handler(pages_dir, rate_limit_every))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rekam atau putar ulang halaman top/anime Jikan")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record = subparsers.add_parser("record", help="Rekam halaman dari Jikan")
+    record.add_argument("--pages", type=int, default=50)
+    record.add_argument("--out", default=os.path.join("data", "jikan_pages"))
+
+    serve = subparsers.add_parser("serve", help="Putar ulang halaman hasil rekaman")
+    serve.add_argument("--dir", default=os.path.join("data", "jikan_pages"))
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--rate-limit-every", type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == "record":
+        record_pages(args.pages, args.out)
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), make_handler(args.dir, args.rate_limit_every))
+        print(f"Server replay berjalan di http://{args.host}:{args.port}/v4")
+        server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Pengukuran waktu per tahap (parsing CSV, normalisasi fitur, perhitungan jarak,
+pembuatan hasil, rendering) ke histogram di dalam proses.
+
+Tahap dibungkus dengan `timed`, yang bisa dipakai sebagai context manager
+maupun decorator:
+
+    with timed('render'):
+        ...
+
+    @timed('load_data')
+    def load_data(...):
+        ...
+
+Pengukuran mati secara default; saat mati `timed` hanya memeriksa satu flag
+sehingga overhead-nya hampir nol. Aktifkan lewat `enable()` (mis. opsi
+`--profile` di CLI) atau variabel lingkungan `ANIME_METRICS=1`. Isi histogram
+bisa diekspor dalam format teks Prometheus (`render_prometheus`) atau sebagai
+ringkasan (`summary`).
+"""
+import os
+import time
+import bisect
+import logging
+import threading
+import functools
+from typing import Callable, Dict, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+METRIC_NAME = "anime_stage_duration_seconds"
+# Batas atas bucket histogram (detik)
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_enabled = os.environ.get("ANIME_METRICS", "0").lower() in ("1", "true", "yes")
+
+
+class Histogram:
+    """Histogram durasi satu tahap dengan bucket tetap."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def quantile(self, q: float) -> float:
+        """Perkiraan kuantil (batas atas bucket yang memuatnya)."""
+        with self._lock:
+            counts, total, largest = list(self.counts), self.count, self.max
+        if not total:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for upper, count in zip(self.buckets, counts):
+            seen += count
+            if seen >= rank:
+                return min(upper, largest)
+        return largest
+
+
+_histograms: Dict[str, Histogram] = {}
+_registry_lock = threading.Lock()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def observe(stage: str, seconds: float):
+    """Mencatat satu durasi untuk sebuah tahap."""
+    histogram = _histograms.get(stage)
+    if histogram is None:
+        with _registry_lock:
+            histogram = _histograms.setdefault(stage, Histogram())
+    histogram.observe(seconds)
+
+
+class timed:
+    """Mengukur durasi sebuah tahap; bisa dipakai dengan `with` atau sebagai decorator."""
+
+    __slots__ = ('stage', '_start')
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._start = None
+
+    def __enter__(self) -> 'timed':
+        self._start = time.perf_counter() if _enabled else None
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._start is not None:
+            observe(self.stage, time.perf_counter() - self._start)
+        return False
+
+    def __call__(self, func: Callable) -> Callable:
+        stage = self.stage
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(stage, time.perf_counter() - start)
+        return wrapper
+
+
+def reset():
+    """Mengosongkan semua histogram."""
+    with _registry_lock:
+        _histograms.clear()
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus() -> str:
+    """Isi semua histogram dalam format teks eksposisi Prometheus."""
+    lines = [
+        f"# HELP {METRIC_NAME} Durasi setiap tahap sistem rekomendasi anime.",
+        f"# TYPE {METRIC_NAME} histogram",
+    ]
+    with _registry_lock:
+        histograms = sorted(_histograms.items())
+    for stage, histogram in histograms:
+        label = f'stage="{_escape_label(stage)}"'
+        with histogram._lock:
+            counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+        cumulative = 0
+        for upper, bucket_count in zip(histogram.buckets, counts):
+            cumulative += bucket_count
+            lines.append(f'{METRIC_NAME}_bucket{{{label},le="{upper:g}"}} {cumulative}')
+        lines.append(f'{METRIC_NAME}_bucket{{{label},le="+Inf"}} {count}')
+        lines.append(f'{METRIC_NAME}_sum{{{label}}} {total:.9g}')
+        lines.append(f'{METRIC_NAME}_count{{{label}}} {count}')
+    return "\n".join(lines) + "\n"
+
+
+def summary() -> List[dict]:
+    """Ringkasan per tahap (jumlah panggilan, total, rata-rata, p95 perkiraan, maksimum), dari total terbesar."""
+    with _registry_lock:
+        histograms = list(_histograms.items())
+    rows = [
+        {
+            'stage': stage,
+            'count': histogram.count,
+            'total_ms': histogram.sum * 1000,
+            'mean_ms': histogram.sum / histogram.count * 1000 if histogram.count else 0.0,
+            'p95_ms': histogram.quantile(0.95) * 1000,
+            'max_ms': histogram.max * 1000,
+        }
+        for stage, histogram in histograms
+    ]
+    return sorted(rows, key=lambda row: row['total_ms'], reverse=True)
+
+
+def format_summary() -> str:
+    """Ringkasan per tahap sebagai tabel teks untuk `--profile`."""
+    rows = summary()
+    if not rows:
+        return "Tidak ada tahap yang terukur."
+    header = f"{'tahap':<24}{'panggilan':>10}{'total ms':>12}{'rata-rata ms':>14}{'p95 ms (≤)':>12}{'maks ms':>11}"
+    lines = [header, "-" * len(header)]
+    for row in rows:
+        lines.append(f"{row['stage']:<24}{row['count']:>10}{row['total_ms']:>12.2f}{row['mean_ms']:>14.3f}"
+                     f"{row['p95_ms']:>12.3f}{row['max_ms']:>11.3f}")
+    return "\n".join(lines)
@@ -0,0 +1,258 @@
+"""
+Indeks tetangga terdekat (top-k) untuk seluruh katalog anime.
+
+Tabel tetangga dihitung sekali setelah `prepare_features` dengan blok jarak
+per potongan (chunk) dan seleksi parsial (`np.argpartition`), lalu disimpan ke
+disk di samping `data/anime.csv`. Setiap query cukup membaca satu baris tabel
+sehingga biayanya O(k), bukan O(n log n).
+"""
+import os
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Jumlah tetangga yang disimpan per judul dan ukuran blok perhitungan jarak
+DEFAULT_NEIGHBORS = 20
+DEFAULT_CHUNK_SIZE = 1024
+# Kandidat tambahan yang jaraknya dihitung ulang secara langsung
+REFINE_MARGIN = 8
+
+INDEX_VERSION = 2
+
+
+def neighbor_index_path(csv_path: str) -> str:
+    """Mengembalikan lokasi file indeks tetangga untuk file CSV tertentu."""
+    base, _ = os.path.splitext(csv_path)
+    return f"{base}_neighbors.npz"
+
+
+def source_signature(csv_path: str) -> np.ndarray:
+    """Tanda tangan ringan (ukuran dan mtime) dari file sumber."""
+    stat = os.stat(csv_path)
+    return np.array([stat.st_size, stat.st_mtime_ns], dtype=np.int64)
+
+
+def topk_neighbors(features: np.ndarray, seeds: np.ndarray, k: int,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE,
+                   exclude_self: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Menghitung k tetangga terdekat (jarak Euclidean) untuk setiap baris `seeds`.
+
+    Args:
+        features (np.ndarray): Matriks fitur (n x d)
+        seeds (np.ndarray): Posisi baris yang dicari tetangganya
+        k (int): Jumlah tetangga per baris
+        chunk_size (int): Jumlah baris seed per blok perhitungan jarak
+        exclude_self (bool): Mengecualikan baris seed dari hasilnya sendiri
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Posisi tetangga (int32) dan jaraknya
+        (float32), masing-masing berukuran (len(seeds) x k), urut dari yang
+        terdekat.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    seeds = np.asarray(seeds, dtype=np.int64)
+    n_rows = features.shape[0]
+    k = min(k, n_rows - 1 if exclude_self else n_rows)
+
+    indices = np.empty((len(seeds), max(k, 0)), dtype=np.int32)
+    distances = np.empty((len(seeds), max(k, 0)), dtype=np.float32)
+    if k <= 0 or len(seeds) == 0:
+        return indices, distances
+
+    # ||a - b||^2 = ||a||^2 + ||b||^2 - 2ab, dihitung per blok agar memori terbatas
+    squared_norms = np.einsum('ij,ij->i', features, features)
+    for start in range(0, len(seeds), chunk_size):
+        block_seeds = seeds[start:start + chunk_size]
+        block = features[block_seeds]
+        sq_dist = squared_norms[block_seeds][:, None] + squared_norms[None, :] - 2.0 * (block @ features.T)
+        np.maximum(sq_dist, 0.0, out=sq_dist)
+        if exclude_self:
+            sq_dist[np.arange(len(block_seeds)), block_seeds] = np.inf
+
+        # Seleksi parsial dengan sedikit kandidat cadangan, lalu hitung ulang jarak
+        # kandidat secara langsung karena ekspansi norma kehilangan presisi untuk
+        # fitur berskala besar (mis. members yang belum dinormalisasi)
+        n_candidates = min(k + REFINE_MARGIN, n_rows - 1 if exclude_self else n_rows)
+        candidates = np.argpartition(sq_dist, n_candidates - 1, axis=1)[:, :n_candidates]
+        candidate_dist = np.linalg.norm(features[candidates] - block[:, None, :], axis=2)
+        if exclude_self:
+            candidate_dist[candidates == block_seeds[:, None]] = np.inf
+        order = np.lexsort((candidates, candidate_dist), axis=-1)[:, :k]
+
+        end = start + len(block_seeds)
+        indices[start:end] = np.take_along_axis(candidates, order, axis=1)
+        distances[start:end] = np.take_along_axis(candidate_dist, order, axis=1)
+
+    return indices, distances
+
+
+class NeighborIndex:
+    """Tabel k tetangga terdekat untuk setiap judul dalam katalog."""
+
+    def __init__(self, indices: np.ndarray, distances: np.ndarray,
+                 signature: Optional[np.ndarray] = None):
+        self.indices = indices
+        self.distances = distances
+        self.signature = signature
+
+    @property
+    def k(self) -> int:
+        return self.indices.shape[1]
+
+    def __len__(self) -> int:
+        return self.indices.shape[0]
+
+    @classmethod
+    def build(cls, features: np.ndarray, k: int = DEFAULT_NEIGHBORS,
+              chunk_size: int = DEFAULT_CHUNK_SIZE,
+              signature: Optional[np.ndarray] = None) -> 'NeighborIndex':
+        """Membangun tabel tetangga untuk semua baris dalam matriks fitur."""
+        features = np.asarray(features, dtype=np.float64)
+        seeds = np.arange(features.shape[0])
+        indices, distances = topk_neighbors(features, seeds, k, chunk_size)
+        return cls(indices, distances, signature)
+
+    def query(self, position: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Mengembalikan k tetangga terdekat untuk judul pada posisi tertentu."""
+        return self.indices[position, :k], self.distances[position, :k]
+
+    def update(self, features: np.ndarray, remap: np.ndarray, dirty: np.ndarray,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> 'NeighborIndex':
+        """
+        Memperbarui tabel untuk katalog yang sebagian barisnya berubah.
+
+        Baris baru/berubah (`dirty`) dihitung ulang penuh. Baris lain hanya
+        membuang tetangga yang dihapus/berubah lalu membandingkan dirinya dengan
+        baris `dirty` saja. Jika setelah itu tetangga ke-k lebih jauh daripada
+        tetangga ke-k lama, mungkin ada kandidat di luar tabel yang terlewat,
+        sehingga baris tersebut dihitung ulang penuh. Biayanya sebanding dengan
+        jumlah baris yang berubah, bukan ukuran katalog.
+
+        Args:
+            features (np.ndarray): Matriks fitur katalog baru (n_baru x d)
+            remap (np.ndarray): Posisi baru untuk setiap baris lama (-1 jika dihapus)
+            dirty (np.ndarray): Posisi baru dari baris yang ditambahkan atau berubah
+            chunk_size (int): Ukuran blok perhitungan jarak
+
+        Returns:
+            NeighborIndex: Tabel baru; tabel ini tidak diubah
+        """
+        features = np.asarray(features, dtype=np.float64)
+        remap = np.asarray(remap, dtype=np.int64)
+        dirty = np.unique(np.asarray(dirty, dtype=np.int64))
+        n_rows = features.shape[0]
+        k = self.k
+        if k == 0 or n_rows - 1 < k or len(self) - 1 < k:
+            return NeighborIndex.build(features, k, chunk_size)
+
+        indices = np.empty((n_rows, k), dtype=np.int32)
+        distances = np.empty((n_rows, k), dtype=np.float32)
+        is_dirty = np.zeros(n_rows, dtype=bool)
+        is_dirty[dirty] = True
+
+        # Baris lama yang masih ada dan fiturnya tidak berubah
+        old_rows = np.flatnonzero(remap >= 0)
+        old_rows = old_rows[~is_dirty[remap[old_rows]]]
+        refresh = [dirty]
+
+        for start in range(0, len(old_rows), chunk_size):
+            block_old = old_rows[start:start + chunk_size]
+            block_new = remap[block_old]
+            kept = remap[self.indices[block_old]]
+            kept_dist = self.distances[block_old].astype(np.float32)
+            invalid = (kept < 0) | is_dirty[np.maximum(kept, 0)]
+            kept_dist = np.where(invalid, np.inf, kept_dist)
+
+            # Bandingkan hanya dengan baris yang baru/berubah
+            dirty_dist = np.linalg.norm(
+                features[dirty][None, :, :] - features[block_new][:, None, :], axis=2
+            ).astype(np.float32)
+            candidates = np.concatenate([kept, np.broadcast_to(dirty, (len(block_new), len(dirty)))], axis=1)
+            candidate_dist = np.concatenate([kept_dist, dirty_dist], axis=1)
+            order = np.lexsort((candidates, candidate_dist), axis=-1)[:, :k]
+            block_indices = np.take_along_axis(candidates, order, axis=1)
+            block_distances = np.take_along_axis(candidate_dist, order, axis=1)
+
+            # Tabel lama hanya menjamin kandidat sampai jarak ke-k lama
+            incomplete = invalid.any(axis=1) & ~(block_distances[:, -1] < self.distances[block_old, -1])
+            indices[block_new] = block_indices
+            distances[block_new] = block_distances
+            refresh.append(block_new[incomplete])
+
+        refresh = np.concatenate(refresh)
+        if len(refresh):
+            indices[refresh], distances[refresh] = topk_neighbors(features, refresh, k, chunk_size)
+        logger.info(f"Indeks tetangga diperbarui: {len(dirty)} baris berubah, {len(refresh)} baris dihitung ulang")
+        return NeighborIndex(indices, distances)
+
+    def save(self, path: str):
+        """Menyimpan tabel tetangga ke disk (ditulis atomik)."""
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(
+            tmp_path,
+            version=np.array([INDEX_VERSION]),
+            indices=self.indices,
+            distances=self.distances,
+            signature=self.signature if self.signature is not None else np.array([], dtype=np.int64)
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'NeighborIndex':
+        """Memuat tabel tetangga dari disk."""
+        with np.load(path) as data:
+            if int(data['version'][0]) != INDEX_VERSION:
+                raise ValueError("Versi indeks tetangga tidak didukung")
+            return cls(data['indices'], data['distances'], data['signature'])
+
+    def is_valid_for(self, n_rows: int, k: int, signature: Optional[np.ndarray] = None) -> bool:
+        """Memeriksa apakah tabel masih sesuai dengan data dan k yang diminta."""
+        if len(self) != n_rows or self.k < min(k, n_rows - 1):
+            return False
+        if signature is not None:
+            return self.signature is not None and np.array_equal(self.signature, signature)
+        return True
+
+
+def load_or_build_neighbor_index(features: np.ndarray, csv_path: Optional[str] = None,
+                                 k: int = DEFAULT_NEIGHBORS,
+                                 chunk_size: int = DEFAULT_CHUNK_SIZE) -> NeighborIndex:
+    """
+    Memuat tabel tetangga dari disk jika masih valid, atau membangunnya ulang.
+
+    Args:
+        features (np.ndarray): Matriks fitur yang telah dinormalisasi
+        csv_path (str): Lokasi file sumber; tabel disimpan di sampingnya
+        k (int): Jumlah tetangga per judul
+        chunk_size (int): Ukuran blok perhitungan jarak
+
+    Returns:
+        NeighborIndex: Tabel tetangga yang siap dipakai
+    """
+    features = np.asarray(features, dtype=np.float64)
+    n_rows = features.shape[0]
+    path = neighbor_index_path(csv_path) if csv_path else None
+    signature = source_signature(csv_path) if csv_path else None
+
+    if path and os.path.exists(path):
+        try:
+            index = NeighborIndex.load(path)
+            if index.is_valid_for(n_rows, k, signature):
+                logger.info(f"Indeks tetangga dimuat dari: {path}")
+                return index
+        except Exception as e:
+            logger.warning(f"Indeks tetangga tidak dapat dibaca, membangun ulang: {str(e)}")
+
+    logger.info(f"Membangun indeks {k} tetangga untuk {n_rows} anime...")
+    index = NeighborIndex.build(features, k, chunk_size, signature)
+    if path:
+        try:
+            index.save(path)
+            logger.info(f"Indeks tetangga disimpan ke: {path}")
+        except OSError as e:
+            logger.warning(f"Gagal menyimpan indeks tetangga: {str(e)}")
+    return index
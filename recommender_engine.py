@@ -0,0 +1,90 @@
+"""
+Mesin rekomendasi KNN yang dibangun sekali per versi data.
+
+Mesin menyimpan matriks fitur, indeks tetangga yang sudah dihitung (tabel
+top-k untuk semua judul) dan peta nama -> baris. Objek ini dimaksudkan untuk
+dibagi ke semua sesi/worker sehingga query tidak pernah melatih model ulang.
+
+Mode pencarian dipilih lewat konfigurasi (`RECOMMENDER_MODE`):
+
+- `exact`: tabel top-k untuk semua judul (dibangun O(n^2)), dengan pencarian
+  exact per query jika k melebihi tabel,
+- `ann`: indeks IVF aproksimasi (`ann_index.IVFIndex`) untuk katalog besar.
+"""
+import os
+import logging
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ann_index import IVFIndex
+from neighbor_index import DEFAULT_NEIGHBORS, NeighborIndex, topk_neighbors
+from title_index import TitleIndex
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDER_MODE = os.environ.get("RECOMMENDER_MODE", "exact").lower()
+MODES = ('exact', 'ann')
+
+
+class RecommenderEngine:
+    """Fitur, indeks tetangga dan indeks judul untuk satu versi katalog."""
+
+    def __init__(self, features: np.ndarray, names: Sequence[str], version: str = '',
+                 n_neighbors: int = DEFAULT_NEIGHBORS, title_index: Optional[TitleIndex] = None,
+                 neighbor_index: Optional[NeighborIndex] = None, mode: Optional[str] = None,
+                 ann_index: Optional[IVFIndex] = None):
+        self.features = features
+        self.version = version
+        self.mode = (mode or RECOMMENDER_MODE).lower()
+        if self.mode not in MODES:
+            raise ValueError(f"Mode rekomendasi tidak dikenal: {self.mode}")
+        self.title_index = title_index if title_index is not None else TitleIndex(names)
+        self.neighbor_index = None
+        self.ann_index = None
+        if self.mode == 'ann':
+            self.ann_index = ann_index if ann_index is not None else IVFIndex.build(features)
+        else:
+            self.neighbor_index = neighbor_index if neighbor_index is not None else \
+                NeighborIndex.build(features, k=n_neighbors)
+        logger.info(f"Mesin rekomendasi ({self.mode}) siap untuk {len(self.title_index)} anime "
+                    f"(versi {version or '-'})")
+
+    def __len__(self) -> int:
+        return len(self.title_index)
+
+    def position(self, name: str) -> Optional[int]:
+        """Posisi baris untuk judul tertentu (case insensitive), atau None."""
+        positions = self.title_index.exact(name)
+        return positions[0] if positions else None
+
+    def kneighbors(self, position: int, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mengembalikan k tetangga terdekat (tanpa judul itu sendiri).
+
+        Pada mode `ann` hasil diambil dari indeks IVF. Pada mode `exact`, jika k
+        masih tercakup tabel tetangga hasil dibaca langsung dari tabel; selain
+        itu jarak dihitung untuk satu baris saja dengan seleksi parsial.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Posisi tetangga dan jaraknya
+        """
+        if self.ann_index is not None:
+            return self.ann_index.query(position, k)
+        if k <= self.neighbor_index.k:
+            return self.neighbor_index.query(position, k)
+        indices, distances = topk_neighbors(self.features, np.array([position]), k)
+        return indices[0], distances[0]
+
+    def recommend(self, name: str, k: int = 5) -> List[Tuple[int, float]]:
+        """
+        Rekomendasi untuk sebuah judul sebagai pasangan (posisi, jarak).
+
+        Returns:
+            List[Tuple[int, float]]: Tetangga terdekat, kosong jika judul tidak ada
+        """
+        position = self.position(name)
+        if position is None:
+            return []
+        indices, distances = self.kneighbors(position, k)
+        return [(int(i), float(d)) for i, d in zip(indices, distances)]
@@ -0,0 +1,136 @@
+"""
+Cache respons di dalam proses untuk query rekomendasi dan pencarian.
+
+Kunci cache adalah (jenis query, query yang dinormalisasi, k, filter, versi
+data), sehingga query yang sama persis seperti "Naruto" top-5 tidak dihitung
+ulang. Entri dibuang berdasarkan LRU jika jumlahnya melewati batas dan
+kedaluwarsa setelah TTL. Saat versi katalog berubah seluruh isi cache dibuang.
+
+Nilai yang disimpan dibagi ke semua pemanggil dan harus diperlakukan read-only.
+"""
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from title_index import normalize_title
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 3600
+
+
+def normalize_query(query: str) -> str:
+    """Query yang dinormalisasi untuk kunci cache (huruf kecil, spasi tunggal)."""
+    return normalize_title(query)
+
+
+def _filters_key(filters: Optional[dict]) -> Tuple:
+    return tuple(sorted(filters.items())) if filters else ()
+
+
+class ResponseCache:
+    """Cache LRU dengan TTL dan penghitung hit/miss, aman dipakai dari banyak thread."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: float = DEFAULT_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.version = None
+        self._clock = clock
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(kind: str, query: str, k: int = None, filters: Optional[dict] = None,
+                 version: str = '') -> Tuple:
+        return (kind, normalize_query(query), k, _filters_key(filters), version)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Nilai untuk kunci jika ada dan belum kedaluwarsa (dihitung sebagai hit/miss)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                del self._entries[key]
+                self.expirations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any):
+        """Menyimpan nilai dan membuang entri yang paling lama tidak dipakai jika penuh."""
+        with self._lock:
+            self._entries[key] = (self._clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, kind: str, query: str, compute: Callable[[], Any], k: int = None,
+                       filters: Optional[dict] = None, version: str = '') -> Any:
+        """
+        Mengembalikan respons dari cache atau menghitungnya dengan `compute()`.
+
+        Args:
+            kind (str): Jenis query (mis. 'search' atau 'recommend')
+            query (str): Query dari pengguna; dinormalisasi untuk kunci
+            compute (Callable): Fungsi tanpa argumen yang menghitung respons
+            k (int): Jumlah hasil yang diminta
+            filters (dict): Filter tambahan yang memengaruhi hasil
+            version (str): Versi data katalog
+
+        Returns:
+            Any: Respons dari cache atau hasil `compute()`
+        """
+        key = self.make_key(kind, query, k, filters, version)
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def set_version(self, version: str) -> bool:
+        """Membuang seluruh isi cache jika versi data berubah; True jika cache dikosongkan."""
+        with self._lock:
+            if version == self.version:
+                return False
+            changed = self.version is not None
+            self.version = version
+            if changed:
+                self._entries.clear()
+                self.invalidations += 1
+                logger.info(f"Cache respons dikosongkan untuk versi data {version}")
+            return changed
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Penghitung hit, miss, pembuangan dan rasio hit."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'invalidations': self.invalidations,
+            }
@@ -0,0 +1,260 @@
+"""
+Penyimpanan ulasan dan komentar anime di SQLite (mode WAL).
+
+Setiap ulasan atau komentar baru cukup satu INSERT dalam transaksi sendiri,
+bukan menulis ulang seluruh `reviews.json`, sehingga sesi yang berjalan
+bersamaan tidak saling menimpa. Ulasan diindeks per judul anime sehingga
+membaca ulasan satu judul tidak perlu memuat semua ulasan.
+
+Tabel `review_stats` menyimpan agregat per judul (jumlah ulasan, jumlah dan
+total rating, waktu ulasan terakhir) yang diperbarui dalam transaksi yang sama
+dengan INSERT ulasannya, sehingga daftar "paling banyak diulas" cukup membaca
+N baris teratas dari indeks, bukan menghitung ulasan untuk seluruh katalog.
+
+Isi `reviews.json` lama diimpor sekali saat basis data pertama kali dibuka.
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REVIEWS_DB_PATH = os.environ.get(
+    "REVIEWS_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "reviews.sqlite3")
+)
+
+# Waktu tunggu (milidetik) jika basis data sedang dikunci proses lain
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS reviews ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " anime TEXT NOT NULL,"
+    " user TEXT NOT NULL,"
+    " text TEXT NOT NULL,"
+    " rating INTEGER,"
+    " created_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS reviews_anime ON reviews (anime, id)",
+    "CREATE TABLE IF NOT EXISTS comments ("
+    " id INTEGER PRIMARY KEY AUTOINCREMENT,"
+    " review_id INTEGER NOT NULL REFERENCES reviews (id),"
+    " user TEXT NOT NULL,"
+    " text TEXT NOT NULL,"
+    " created_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS comments_review ON comments (review_id, id)",
+    "CREATE TABLE IF NOT EXISTS imports ("
+    " source TEXT PRIMARY KEY,"
+    " imported_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS review_stats ("
+    " anime TEXT PRIMARY KEY,"
+    " review_count INTEGER NOT NULL,"
+    " rating_sum INTEGER NOT NULL,"
+    " rating_count INTEGER NOT NULL,"
+    " last_review_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS review_stats_most_reviewed ON review_stats (review_count DESC, last_review_at DESC)",
+)
+
+# Versi skema (PRAGMA user_version); versi 1 menambahkan tabel review_stats
+SCHEMA_VERSION = 1
+
+_UPSERT_STATS = (
+    "INSERT INTO review_stats (anime, review_count, rating_sum, rating_count, last_review_at)"
+    " VALUES (?, 1, COALESCE(?, 0), ? IS NOT NULL, ?)"
+    " ON CONFLICT (anime) DO UPDATE SET"
+    " review_count = review_count + 1,"
+    " rating_sum = rating_sum + excluded.rating_sum,"
+    " rating_count = rating_count + excluded.rating_count,"
+    " last_review_at = MAX(last_review_at, excluded.last_review_at)"
+)
+
+_REBUILD_STATS = (
+    "INSERT OR REPLACE INTO review_stats (anime, review_count, rating_sum, rating_count, last_review_at)"
+    " SELECT anime, COUNT(*), COALESCE(SUM(rating), 0), COUNT(rating), MAX(created_at)"
+    " FROM reviews GROUP BY anime"
+)
+
+
+def _stats_record(row) -> dict:
+    return {
+        "anime": row["anime"],
+        "review_count": row["review_count"],
+        "average_rating": row["rating_sum"] / row["rating_count"] if row["rating_count"] else None,
+        "last_review_at": row["last_review_at"],
+    }
+
+
+class ReviewStore:
+    """Ulasan dan komentar per judul anime di atas SQLite."""
+
+    def __init__(self, path: str = REVIEWS_DB_PATH):
+        self.path = path
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                                     timeout=BUSY_TIMEOUT_MS / 1000)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+            if self._conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                # Basis data lama: isi agregat dari ulasan yang sudah ada
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(_REBUILD_STATS)
+                self._conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+                self._conn.execute("COMMIT")
+
+    def _write(self, sql: str, params: tuple) -> int:
+        """Menjalankan satu perintah tulis dalam transaksinya sendiri."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(sql, params)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return cursor.lastrowid
+
+    def add_review(self, anime: str, user: str, text: str, rating: Optional[int] = None) -> int:
+        """Menambahkan ulasan untuk sebuah judul (beserta agregatnya) dan mengembalikan id-nya."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO reviews (anime, user, text, rating, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (anime, user, text, rating, now)
+                )
+                self._conn.execute(_UPSERT_STATS, (anime, rating, rating, now))
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            return cursor.lastrowid
+
+    def add_comment(self, review_id: int, user: str, text: str) -> int:
+        """Menambahkan komentar pada sebuah ulasan dan mengembalikan id-nya."""
+        return self._write(
+            "INSERT INTO comments (review_id, user, text, created_at) VALUES (?, ?, ?, ?)",
+            (review_id, user, text, time.time())
+        )
+
+    def reviews_for(self, anime: str) -> List[dict]:
+        """
+        Ulasan untuk satu judul beserta komentarnya, urut sesuai waktu penulisan.
+
+        Returns:
+            List[dict]: Record dengan kunci id, user, text, rating (jika ada) dan comments
+        """
+        with self._lock:
+            review_rows = self._conn.execute(
+                "SELECT id, user, text, rating FROM reviews WHERE anime = ? ORDER BY id", (anime,)
+            ).fetchall()
+            comment_rows = self._conn.execute(
+                "SELECT c.review_id, c.user, c.text FROM comments c JOIN reviews r ON r.id = c.review_id"
+                " WHERE r.anime = ? ORDER BY c.id", (anime,)
+            ).fetchall()
+
+        reviews = []
+        by_id: Dict[int, dict] = {}
+        for row in review_rows:
+            review = {"id": row["id"], "user": row["user"], "text": row["text"], "comments": []}
+            if row["rating"] is not None:
+                review["rating"] = row["rating"]
+            reviews.append(review)
+            by_id[row["id"]] = review
+        for row in comment_rows:
+            by_id[row["review_id"]]["comments"].append({"user": row["user"], "text": row["text"]})
+        return reviews
+
+    def review_counts(self) -> Dict[str, int]:
+        """Jumlah ulasan untuk setiap judul yang punya ulasan."""
+        with self._lock:
+            rows = self._conn.execute("SELECT anime, review_count FROM review_stats").fetchall()
+        return {anime: count for anime, count in rows}
+
+    def stats(self, anime: str) -> Optional[dict]:
+        """Agregat ulasan satu judul (jumlah, rata-rata rating, waktu terakhir), atau None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM review_stats WHERE anime = ?", (anime,)
+            ).fetchone()
+        return _stats_record(row) if row is not None else None
+
+    def most_reviewed(self, limit: int = 10, offset: int = 0) -> List[dict]:
+        """
+        Judul dengan ulasan terbanyak (seri: ulasan terbaru lebih dulu).
+
+        Returns:
+            List[dict]: Agregat dengan kunci anime, review_count, average_rating, last_review_at
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM review_stats ORDER BY review_count DESC, last_review_at DESC LIMIT ? OFFSET ?",
+                (limit, offset)
+            ).fetchall()
+        return [_stats_record(row) for row in rows]
+
+    def import_json(self, json_path: str) -> int:
+        """
+        Mengimpor ulasan dari format `reviews.json` lama (sekali per file).
+
+        Returns:
+            int: Jumlah ulasan yang diimpor (0 jika file tidak ada atau sudah diimpor)
+        """
+        if not os.path.exists(json_path):
+            return 0
+        source = os.path.abspath(json_path)
+        with open(json_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+
+        imported = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                if self._conn.execute("SELECT 1 FROM imports WHERE source = ?", (source,)).fetchone():
+                    self._conn.execute("ROLLBACK")
+                    return 0
+                now = time.time()
+                for anime, reviews in data.items():
+                    for review in reviews:
+                        cursor = self._conn.execute(
+                            "INSERT INTO reviews (anime, user, text, rating, created_at) VALUES (?, ?, ?, ?, ?)",
+                            (anime, review.get("user", ""), review.get("text", ""), review.get("rating"), now)
+                        )
+                        self._conn.executemany(
+                            "INSERT INTO comments (review_id, user, text, created_at) VALUES (?, ?, ?, ?)",
+                            [(cursor.lastrowid, comment.get("user", ""), comment.get("text", ""), now)
+                             for comment in review.get("comments", [])]
+                        )
+                        imported += 1
+                self._conn.execute(_REBUILD_STATS)
+                self._conn.execute("INSERT INTO imports (source, imported_at) VALUES (?, ?)", (source, now))
+                self._conn.execute("COMMIT")
+            except Exception as e:
+                self._conn.execute("ROLLBACK")
+                logger.error(f"Error saat mengimpor ulasan dari {json_path}: {str(e)}")
+                raise
+        logger.info(f"{imported} ulasan diimpor dari {json_path}")
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def open_review_store(path: str = REVIEWS_DB_PATH, legacy_json: Optional[str] = None) -> ReviewStore:
+    """Membuka penyimpanan ulasan dan mengimpor `reviews.json` lama jika belum pernah."""
+    store = ReviewStore(path)
+    if legacy_json:
+        store.import_json(legacy_json)
+    return store
@@ -0,0 +1,211 @@
+"""
+Indeks terbalik (inverted index) dengan skor BM25 untuk pencarian anime.
+
+Nama, genre dan sinopsis ditokenisasi sekali saat data dimuat. Setiap field
+diberi bobot (judul paling penting, lalu genre, lalu sinopsis) sehingga
+frekuensi term dijumlahkan secara berbobot ala BM25F. Query hanya menyentuh
+posting list dari term-termnya, lalu hasil diurutkan berdasarkan skor.
+
+Term query yang tidak ada di kosakata diperluas ke term yang berawalan sama
+(mis. "nar" -> "naruto"), agar perilaku pencarian potongan kata tetap ada.
+
+Indeks bisa diperbarui secara bertahap (`update`): dokumen yang dihapus hanya
+ditandai, dokumen baru ditambahkan ke posting list term-termnya saja, dan
+posting list lain dipakai bersama dengan indeks lama.
+"""
+import re
+import copy
+import bisect
+import itertools
+import logging
+from collections import defaultdict
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Parameter BM25
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Bobot tiap field dokumen
+FIELD_WEIGHTS = {'name': 3.0, 'genres': 2.0, 'synopsis': 1.0}
+
+# Batas jumlah term hasil perluasan awalan untuk satu term query
+MAX_PREFIX_EXPANSIONS = 50
+
+_TOKEN = re.compile(r'\w+')
+
+
+def tokenize(text) -> List[str]:
+    """Memecah teks menjadi token huruf kecil."""
+    if not isinstance(text, str):
+        return []
+    return _TOKEN.findall(text.lower())
+
+
+def _document_fields(record: dict) -> Dict[str, str]:
+    genres = record.get('genres')
+    if isinstance(genres, (list, tuple)):
+        genres = ' '.join(str(genre) for genre in genres)
+    else:
+        genres = record.get('genre', '')
+    return {'name': record.get('name', ''), 'genres': genres, 'synopsis': record.get('synopsis', '')}
+
+
+def _tokenize_documents(records: Sequence[dict], first_doc_id: int = 0
+                        ) -> Tuple[Dict[str, Dict[int, float]], np.ndarray]:
+    """Frekuensi term berbobot per dokumen dan panjang dokumen berbobot."""
+    postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+    doc_lengths = np.zeros(len(records), dtype=np.float32)
+    for offset, record in enumerate(records):
+        doc_id = first_doc_id + offset
+        for field, text in _document_fields(record).items():
+            weight = FIELD_WEIGHTS[field]
+            for token in tokenize(text):
+                term_docs = postings[token]
+                term_docs[doc_id] = term_docs.get(doc_id, 0.0) + weight
+                doc_lengths[offset] += weight
+    return postings, doc_lengths
+
+
+def _posting_arrays(docs: Dict[int, float]) -> Tuple[np.ndarray, np.ndarray]:
+    return (np.fromiter(docs.keys(), dtype=np.int32, count=len(docs)),
+            np.fromiter(docs.values(), dtype=np.float32, count=len(docs)))
+
+
+class BM25Index:
+    """
+    Indeks BM25 atas daftar record anime.
+
+    Id dokumen internal stabil selama pembaruan bertahap; `search` mengembalikan
+    posisi record di daftar saat ini (sama dengan id dokumen untuk indeks baru).
+    """
+
+    def __init__(self, records: Sequence[dict], k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+
+        postings, self._doc_lengths = _tokenize_documents(records)
+        # Posting list disimpan sebagai array (id dokumen terurut, tf berbobot)
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            term: _posting_arrays(docs) for term, docs in postings.items()
+        }
+        self._vocabulary = sorted(self._postings)
+        self._live = np.ones(len(records), dtype=bool)
+        self._positions = np.arange(len(records), dtype=np.int32)
+        self._update_lengths()
+        logger.info(f"Indeks pencarian dibangun untuk {self.n_docs} anime ({len(self._vocabulary)} term)")
+
+    def _update_lengths(self):
+        """Menghitung ulang jumlah dokumen aktif dan normalisasi panjang dokumen."""
+        self.n_docs = int(self._live.sum())
+        avg_length = self._doc_lengths[self._live].mean(dtype=np.float64) if self.n_docs else 0.0
+        self._length_norm = self.k1 * (1 - self.b + self.b * self._doc_lengths / avg_length) if avg_length \
+            else np.full(len(self._doc_lengths), self.k1)
+
+    @property
+    def live(self) -> np.ndarray:
+        """Penanda dokumen aktif untuk setiap id dokumen internal."""
+        return self._live
+
+    @property
+    def n_removed(self) -> int:
+        """Jumlah dokumen yang sudah dihapus tetapi masih ada di posting list."""
+        return len(self._live) - self.n_docs
+
+    def update(self, removed: Sequence[int], added: Sequence[dict], positions: np.ndarray) -> 'BM25Index':
+        """
+        Membuat indeks baru dengan sebagian dokumen dihapus dan/atau ditambahkan.
+
+        Hanya dokumen baru yang ditokenisasi; posting list yang tidak tersentuh
+        dipakai bersama dengan indeks ini, yang tidak ikut berubah.
+
+        Args:
+            removed (Sequence[int]): Id dokumen internal yang dihapus
+            added (Sequence[dict]): Record baru; mendapat id internal berikutnya
+            positions (np.ndarray): Posisi record di daftar baru untuk setiap id
+                internal setelah penambahan (-1 untuk dokumen yang dihapus)
+
+        Returns:
+            BM25Index: Indeks yang sudah diperbarui
+        """
+        index = copy.copy(self)
+        first_doc_id = len(self._live)
+        postings, doc_lengths = _tokenize_documents(added, first_doc_id)
+
+        index._postings = dict(self._postings)
+        new_terms = []
+        for term, docs in postings.items():
+            doc_ids, tf = _posting_arrays(docs)
+            if term in index._postings:
+                old_ids, old_tf = index._postings[term]
+                doc_ids, tf = np.concatenate([old_ids, doc_ids]), np.concatenate([old_tf, tf])
+            else:
+                new_terms.append(term)
+            index._postings[term] = (doc_ids, tf)
+        if new_terms:
+            index._vocabulary = sorted(self._vocabulary + new_terms)
+
+        index._live = np.concatenate([self._live, np.ones(len(added), dtype=bool)])
+        index._live[np.asarray(removed, dtype=np.int64)] = False
+        index._doc_lengths = np.concatenate([self._doc_lengths, doc_lengths])
+        index._positions = np.asarray(positions, dtype=np.int32)
+        index._update_lengths()
+        logger.info(f"Indeks pencarian diperbarui: {len(removed)} dihapus, {len(added)} ditambahkan")
+        return index
+
+    def _expand(self, term: str) -> List[str]:
+        """Term itu sendiri jika masih ada di dokumen aktif, atau term-term yang berawalan sama."""
+        # Term yang semua dokumennya sudah dihapus dianggap tidak ada (sama seperti indeks yang dibangun ulang)
+        if term in self._postings and (self.n_removed == 0 or self._doc_freq(self._postings[term][0]) > 0):
+            return [term]
+        start = bisect.bisect_left(self._vocabulary, term)
+        expanded = []
+        for candidate in itertools.islice(self._vocabulary, start, None):
+            if not candidate.startswith(term) or len(expanded) >= MAX_PREFIX_EXPANSIONS:
+                break
+            # Term yang semua dokumennya sudah dihapus tidak ikut mengisi kuota
+            if self.n_removed == 0 or self._doc_freq(self._postings[candidate][0]) > 0:
+                expanded.append(candidate)
+        return expanded
+
+    def _doc_freq(self, doc_ids: np.ndarray) -> int:
+        return len(doc_ids) if self.n_removed == 0 else int(np.count_nonzero(self._live[doc_ids]))
+
+    def _idf(self, doc_freq: int) -> float:
+        return float(np.log(1 + (self.n_docs - doc_freq + 0.5) / (doc_freq + 0.5)))
+
+    def search(self, query: str, limit: int = None, offset: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Mencari dokumen yang relevan dengan query, diurutkan berdasarkan skor BM25.
+
+        Args:
+            query (str): Kata kunci (judul, genre, atau kata dalam sinopsis)
+            limit (int): Jumlah hasil maksimum (None = semua hasil)
+            offset (int): Jumlah hasil teratas yang dilewati (untuk paginasi)
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Posisi record dan skornya, dari yang paling relevan
+        """
+        scores = np.zeros(len(self._live), dtype=np.float32)
+        matched = False
+        for term in dict.fromkeys(tokenize(query)):
+            for expanded in self._expand(term):
+                doc_ids, tf = self._postings[expanded]
+                idf = self._idf(self._doc_freq(doc_ids))
+                scores[doc_ids] += idf * tf * (self.k1 + 1) / (tf + self._length_norm[doc_ids])
+                matched = True
+
+        if not matched:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float32)
+
+        doc_ids = np.flatnonzero((scores > 0) & self._live)
+        doc_scores = scores[doc_ids]
+        positions = self._positions[doc_ids]
+        # Urutkan berdasarkan skor menurun; seri diurutkan sesuai posisi record
+        order = np.lexsort((positions, -doc_scores))
+        end = None if limit is None else offset + limit
+        order = order[offset:end]
+        return positions[order].astype(np.int32), doc_scores[order]
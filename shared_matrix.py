@@ -0,0 +1,102 @@
+"""
+Matriks fitur read-only yang dipetakan ke memori (memory-mapped).
+
+Matriks float dan pemetaan baris -> judul disimpan sebagai file `.npy` di satu
+folder. Setiap worker (Streamlit, web, atau proses batch) membuka file yang sama
+dengan `mmap_mode='r'`, sehingga halaman memorinya dibagi lewat page cache OS
+dan tidak ada salinan pribadi per proses.
+"""
+import os
+import json
+import shutil
+import hashlib
+import logging
+from typing import List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MATRIX_FILE = 'matrix.npy'
+TITLES_FILE = 'titles.npy'
+COLUMNS_FILE = 'columns.json'
+
+
+class SharedMatrix:
+    """Matriks fitur read-only beserta judul untuk setiap barisnya."""
+
+    def __init__(self, matrix: np.ndarray, titles: np.ndarray, columns: List[str], path: Optional[str] = None):
+        self.matrix = matrix
+        self.titles = titles
+        self.columns = columns
+        self.path = path
+
+    def __len__(self) -> int:
+        return self.matrix.shape[0]
+
+    def title(self, row: int) -> str:
+        """Mengembalikan judul anime untuk baris tertentu."""
+        return str(self.titles[row])
+
+    def to_frame(self) -> pd.DataFrame:
+        """Membungkus matriks sebagai DataFrame tanpa menyalin datanya."""
+        return pd.DataFrame(self.matrix, columns=self.columns, copy=False)
+
+
+def data_version(df: pd.DataFrame, columns: Sequence[str]) -> str:
+    """Menghitung versi data (hash) dari kolom-kolom tertentu pada DataFrame."""
+    hashed = pd.util.hash_pandas_object(df[list(columns)], index=False).to_numpy()
+    return hashlib.sha1(hashed.tobytes()).hexdigest()[:16]
+
+
+def write_shared_matrix(path: str, matrix: np.ndarray, titles: Sequence[str], columns: Sequence[str]):
+    """
+    Menulis matriks dan judul ke folder `path` agar bisa dipetakan ke memori.
+
+    Penulisan dilakukan ke folder sementara lalu dipindahkan sekaligus. Jika
+    worker lain sudah lebih dulu menulis folder yang sama, hasilnya dipakai
+    dan salinan sementara dibuang.
+    """
+    tmp_path = f"{path}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+    try:
+        np.save(os.path.join(tmp_path, MATRIX_FILE), np.ascontiguousarray(matrix, dtype=np.float64))
+        np.save(os.path.join(tmp_path, TITLES_FILE), np.asarray([str(title) for title in titles], dtype=str))
+        with open(os.path.join(tmp_path, COLUMNS_FILE), 'w', encoding='utf-8') as f:
+            json.dump(list(columns), f, ensure_ascii=False)
+
+        if os.path.exists(path):
+            shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+    except OSError:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        if not os.path.exists(path):
+            raise
+
+
+def open_shared_matrix(path: str) -> SharedMatrix:
+    """Membuka matriks yang ditulis `write_shared_matrix` secara zero-copy."""
+    matrix = np.load(os.path.join(path, MATRIX_FILE), mmap_mode='r')
+    titles = np.load(os.path.join(path, TITLES_FILE), mmap_mode='r')
+    with open(os.path.join(path, COLUMNS_FILE), 'r', encoding='utf-8') as f:
+        columns = json.load(f)
+    return SharedMatrix(matrix, titles, columns, path)
+
+
+def load_or_create_shared_matrix(path: str, matrix_fn, titles_fn, columns: Sequence[str]) -> SharedMatrix:
+    """
+    Membuka matriks bersama di `path`, atau membuatnya terlebih dahulu.
+
+    Args:
+        path (str): Folder matriks (sebaiknya mengandung versi data)
+        matrix_fn: Fungsi tanpa argumen yang menghasilkan matriks float
+        titles_fn: Fungsi tanpa argumen yang menghasilkan judul per baris
+        columns (Sequence[str]): Nama kolom matriks
+    """
+    if not os.path.exists(os.path.join(path, COLUMNS_FILE)):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        write_shared_matrix(path, matrix_fn(), titles_fn(), columns)
+        logger.info(f"Matriks fitur bersama ditulis ke: {path}")
+    return open_shared_matrix(path)
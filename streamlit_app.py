@@ -1,15 +1,15 @@
 import streamlit as st
 import pandas as pd
-from sklearn.neighbors import NearestNeighbors
-from sklearn.preprocessing import StandardScaler
-import requests
 from typing import List, Tuple
-import time
 from datetime import datetime, timedelta
 from functools import lru_cache
-from deep_translator import GoogleTranslator
-import json
-import os
+
+from catalog_refresher import CatalogRefresher
+from translation_cache import SynopsisTranslator
+from review_store import ReviewStore, open_review_store
+from response_cache import ResponseCache
+import metrics
+from metrics import timed
 
 # Inisialisasi session state jika belum ada
 if 'language' not in st.session_state:
@@ -152,244 +152,134 @@ st.markdown("<h1 style='text-align: center; color: #ff4b4b; margin-bottom: 2rem;
 st.markdown("<p style='text-align: center; margin-top: -1.5rem; margin-bottom: 2rem; color: black; font-weight: bold; font-size: 1.1em;'>さあ、始めよう！Temukan Anime Favoritmu Menggunakan Sistem Rekomendasi Kami</p>", unsafe_allow_html=True)
 
 REVIEWS_FILE = "reviews.json"
-
-def load_reviews():
-    if not os.path.exists(REVIEWS_FILE):
-        return {}
-    try:
-        with open(REVIEWS_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return {}
-
-def save_reviews(reviews):
-    with open(REVIEWS_FILE, "w", encoding="utf-8") as f:
-        json.dump(reviews, f, ensure_ascii=False, indent=2)
-
-# Cache untuk menyimpan hasil API
-@st.cache_data(ttl=3600)  # Cache selama 1 jam
-def get_anime_data(page: int, limit: int = 25) -> dict:
-    """Fungsi helper untuk mengambil data anime dari API dengan penanganan error"""
-    try:
-        url = f"https://api.jikan.moe/v4/top/anime?page={page}&limit={limit}"
-        response = requests.get(url, timeout=30)  # Timeout diperbesar menjadi 30 detik
-        response.raise_for_status()  # Raise exception untuk status code selain 200
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        # Jika timeout, beri pesan khusus
-        if "timed out" in str(e):
-            return {"error": "timeout"}
-        return {"error": str(e)}
-
-# Load data anime dari Jikan API
-@st.cache_data(ttl=3600)  # Aktifkan kembali cache
-#@st.cache_data(ttl=3600)  # Nonaktifkan cache sementara untuk debugging
-def load_anime_data():
-    try:
-        new_anime_list = []
-        max_retries = 3
-        pages_to_fetch = 50  # Ambil 50 halaman saja
-        items_per_page = 25  # Tetap 25 item per halaman
-        
-        # Container untuk progress bar dan status
-        progress_container = st.empty()
-        status_container = st.empty()
-        
-        with st.spinner('Memuat data anime...'):
-            for page in range(1, pages_to_fetch + 1):
-                if len(new_anime_list) >= 1000:  # Maksimal 1000 anime
-                    break
-                retries = 0
-                while retries < max_retries:
-                    status_container.info(f"Mengambil halaman {page} dari {pages_to_fetch}...")
-                    # Update progress bar
-                    progress = min(len(new_anime_list) / 1000, 1.0)
-                    progress_container.progress(progress)
-                    result = get_anime_data(page, items_per_page)
-                    if "error" in result:
-                        if result["error"] == "timeout":
-                            status_container.warning("Timeout, mencoba lagi setelah 5 detik...")
-                            time.sleep(5)  # Delay lebih lama jika timeout
-                            retries += 1
-                            continue
-                        if "429" in str(result["error"]):  # Rate limit
-                            status_container.warning("Terkena rate limit, menunggu...")
-                            time.sleep(2)  # Delay lebih lama jika rate limit
-                            retries += 1
-                            continue
-                        else:
-                            status_container.error(f"Error: {result['error']}")
-                            retries += 1
-                            if retries >= max_retries:
-                                status_container.error(f"Gagal mengambil data halaman {page} setelah {max_retries} percobaan, lanjut ke halaman berikutnya.")
-                                break  # Lanjut ke halaman berikutnya
-                            time.sleep(2)
-                            continue
-                    # Proses data anime
-                    for anime in result.get("data", []):
-                        try:
-                            image_url = anime['images']['jpg']['image_url'] if anime['images']['jpg']['image_url'] else "https://cdn.myanimelist.net/images/anime/4/19644.jpg"
-                            new_anime = {
-                                'name': anime['title'],
-                                'rating': float(anime['score']) if anime['score'] else 0.0,
-                                'type': anime['type'] or "Unknown",
-                                'episodes': int(anime['episodes']) if anime['episodes'] else 0,
-                                'genre': ', '.join([genre['name'] for genre in anime['genres']]) if anime['genres'] else "Unknown",
-                                'members': int(anime['members']) if anime['members'] else 0,
-                                'popularity': int(anime['popularity']) if anime['popularity'] else 0,
-                                'status': anime['status'] or "Unknown",
-                                'aired_from': anime['aired']['from'],
-                                'synopsis': anime['synopsis'] or "Tidak ada sinopsis tersedia.",
-                                'image_url': image_url
-                            }
-                            new_anime_list.append(new_anime)
-                            if len(new_anime_list) >= 1000:  # Maksimal 1000 anime
-                                break
-                        except Exception as e:
-                            continue
-                    # Berhasil mendapatkan data, lanjut ke halaman berikutnya
-                    time.sleep(1.5)  # Delay antar request agar tidak terlalu cepat
-                    break  # Keluar dari loop retry
-                # Jika gagal setelah retry, lanjut ke halaman berikutnya
-                if retries >= max_retries:
-                    continue
-        
-        # Bersihkan progress dan status
-        progress_container.empty()
-        status_container.empty()
-        
-        if not new_anime_list:
-            return pd.DataFrame()
-        
-        # Buat DataFrame
-        df = pd.DataFrame(new_anime_list)
-        
-        # Konversi kolom tanggal
-        df['aired_from'] = pd.to_datetime(df['aired_from'], errors='coerce')
-        df['year'] = df['aired_from'].dt.year
-        
-        # Isi nilai NaN dengan nilai default
-        df['rating'] = df['rating'].fillna(0.0)
-        df['members'] = df['members'].fillna(0)
-        df['episodes'] = df['episodes'].fillna(0)
-        df['synopsis'] = df['synopsis'].fillna("Tidak ada sinopsis tersedia.")
-        df['genre'] = df['genre'].fillna("Unknown")
-        df['status'] = df['status'].fillna("Unknown")
-        df['type'] = df['type'].fillna("Unknown")
-        
-        # Urutkan berdasarkan rating tertinggi
-        df = df.sort_values(by=['rating', 'popularity'], ascending=[False, True])
-        
-        return df
-        
-    except Exception as e:
-        st.error(f"Error saat memuat data: {str(e)}")
-        return pd.DataFrame()
-
-# Load data
-anime_df = load_anime_data()
-
-if anime_df.empty:
+SEARCH_PAGE_SIZE = 12  # Kelipatan 3 agar grid hasil pencarian tetap rapi
+DEFAULT_SYNOPSIS_LANGUAGE = 'id'  # Pilihan pertama pada selectbox bahasa sinopsis
+
+# Ulasan disimpan di SQLite (WAL); reviews.json lama diimpor sekali saat pertama dibuka
+@st.cache_resource
+def get_review_store() -> ReviewStore:
+    """Membuka penyimpanan ulasan bersama untuk semua sesi"""
+    return open_review_store(legacy_json=REVIEWS_FILE)
+
+review_store = get_review_store()
+
+def most_reviewed_animes(limit: int) -> List[Tuple[dict, dict]]:
+    """Anime katalog dengan ulasan terbanyak beserta agregat ulasannya (O(limit), bukan O(katalog))"""
+    found = []
+    offset = 0
+    while len(found) < limit:
+        rows = review_store.most_reviewed(limit * 2, offset)
+        if not rows:
+            break
+        for row in rows:
+            positions = latest_title_index.exact(row['anime'])
+            if positions:
+                found.append((latest_animes[positions[0]], row))
+        offset += len(rows)
+    return found[:limit]
+
+# Satu penyegar katalog untuk semua sesi: request selalu memakai snapshot
+# terakhir yang valid, sementara refresh berjalan di latar belakang
+@st.cache_resource
+def get_catalog_refresher() -> CatalogRefresher:
+    """Membuat penyegar katalog bersama (snapshot dibangun saat pertama dipakai)"""
+    return CatalogRefresher()
+
+def load_initial_catalog(refresher: CatalogRefresher):
+    """Membangun snapshot pertama di thread ini sambil menampilkan progres unduhan"""
+    progress_container = st.empty()
+    status_container = st.empty()
+
+    def on_page(page: int, pages_done: int, n_items: int):
+        # Dipanggil setiap kali satu halaman selesai diunduh dan diparse
+        status_container.info(f"Halaman {page} selesai ({pages_done} halaman, {n_items} anime)...")
+        progress_container.progress(min(n_items / 1000, 1.0))
+
+    with st.spinner('Memuat data anime...'), timed('load_catalog'):
+        snapshot = refresher.refresh(on_page=on_page)
+
+    # Bersihkan progress dan status
+    progress_container.empty()
+    status_container.empty()
+    return snapshot
+
+catalog_refresher = get_catalog_refresher()
+catalog = catalog_refresher.current()
+if catalog is None:
+    catalog = load_initial_catalog(catalog_refresher)
+
+if catalog is None:
+    st.error(f"Error saat memuat data: {catalog_refresher.last_error}")
     st.error("Tidak dapat memuat data anime. Silakan coba lagi nanti.")
     st.stop()
 
-# Pilih anime populer dengan rating tinggi (1000 anime)
-popular_anime = anime_df[
-    (anime_df['members'] > 50000) &  # Menurunkan threshold members
-    (anime_df['rating'] > 7.0)  # Menurunkan threshold rating
-].sort_values('rating', ascending=False)
-
-# Konversi ke format yang kita gunakan
-latest_animes = []
-for _, row in popular_anime.iterrows():
-    anime_dict = {
-        "name": row['name'],
-        "image_url": row['image_url'],  # Gunakan URL gambar yang sudah diambil
-        "year": int(row['year']) if pd.notnull(row['year']) else "Unknown",
-        "status": row['status'],
-        "rating": float(row['rating']),
-        "type": row['type'],
-        "episodes": int(row['episodes']) if pd.notnull(row['episodes']) else 0,
-        "genres": str(row['genre']).split(', '),
-        "synopsis": row['synopsis'] if pd.notnull(row['synopsis']) else "Tidak ada sinopsis tersedia."
-    }
-    latest_animes.append(anime_dict)
+# Semua data untuk rerun ini diambil dari satu snapshot yang sama
+anime_df = catalog.df
+anime_data_version = catalog.version
+recommender = catalog.recommender
+latest_animes = catalog.latest_animes
+latest_title_index = catalog.title_index
+search_index = catalog.search_index
+similarity_engine = catalog.similarity_engine
+
+# Cache respons bersama (LRU + TTL) untuk pencarian dan rekomendasi di semua sesi
+@st.cache_resource
+def get_response_cache() -> ResponseCache:
+    """Membuat cache respons bersama untuk pencarian dan rekomendasi"""
+    return ResponseCache()
+
+response_cache = get_response_cache()
+# Setiap snapshot baru (termasuk perubahan genre atau sinopsis) membuang respons lama
+response_version = f"{anime_data_version}@{catalog.built_at}"
+response_cache.set_version(response_version)
 
 # Fungsi untuk mencari anime dengan tampilan yang lebih baik
-@st.cache_data(ttl=3600)
+@timed('search_anime')
 def search_anime(query: str) -> List[dict]:
-    query = query.lower()
-    return [
-        anime for anime in latest_animes
-        if query in anime["name"].lower() or
-        query in " ".join(anime["genres"]).lower() or
-        (anime["synopsis"] and query in anime["synopsis"].lower())
-    ]
+    """Mencari anime lewat indeks BM25, diurutkan dari yang paling relevan"""
+    def compute() -> List[dict]:
+        doc_ids, _ = search_index.search(query)
+        return [latest_animes[doc_id] for doc_id in doc_ids]
+
+    return response_cache.get_or_compute('search', query, compute, version=response_version)
 
 # Fungsi rekomendasi yang ditingkatkan
-@st.cache_data(ttl=3600)
+@timed('get_anime_recommendations')
 def get_anime_recommendations(selected_anime: str, n_recommendations: int = 5) -> List[dict]:
-    selected = next((a for a in latest_animes if a["name"].lower() == selected_anime.lower()), None)
-    if not selected:
-        return []
-    
-    recommendations = []
-    for anime in latest_animes:
-        if anime["name"] != selected["name"]:
-            # Menghitung kecocokan berdasarkan genre, rating, dan tipe
-            common_genres = set(anime["genres"]) & set(selected["genres"])
-            genre_similarity = len(common_genres) / len(set(anime["genres"]) | set(selected["genres"]))
-            rating_similarity = 1 - abs(anime["rating"] - selected["rating"]) / 10
-            type_similarity = 1 if anime["type"] == selected["type"] else 0
-            
-            # Skor akhir dengan bobot yang disesuaikan
-            similarity = (
-                genre_similarity * 0.6 + 
-                rating_similarity * 0.25 + 
-                type_similarity * 0.15
-            )
-            recommendations.append((anime, similarity))
-    
-    recommendations.sort(key=lambda x: x[1], reverse=True)
-    return recommendations[:n_recommendations]
-
-# Fungsi untuk mendapatkan rekomendasi anime menggunakan KNN
-@st.cache_data(ttl=3600)
-def get_knn_recommendations(selected_anime: str, n_recommendations: int = 5) -> List[dict]:
-    # Mengambil fitur yang relevan untuk KNN
-    features = anime_df[['rating', 'members']].copy()  # Pastikan ini adalah DataFrame dengan nama kolom
-    knn = NearestNeighbors(n_neighbors=n_recommendations)
-    knn.fit(features)
-
-    # Mencari indeks anime yang dipilih
-    selected_index = anime_df[anime_df['name'].str.lower() == selected_anime.lower()].index
-    if selected_index.empty:
-        return []
-
-    # Mencari rekomendasi
-    selected_features = features.iloc[selected_index[0]].values.reshape(1, -1)  # Mengubah menjadi 2D array
-    distances, indices = knn.kneighbors(selected_features)
-    
-    recommendations = []
-    for idx in indices[0]:
-        if idx != selected_index[0]:  # Menghindari anime yang sama
-            recommendations.append(anime_df.iloc[idx].to_dict())
+    def compute() -> List[dict]:
+        selected_positions = latest_title_index.exact(selected_anime)
+        if not selected_positions:
+            return []
+
+        # Skor genre (0.6), rating (0.25) dan tipe (0.15) dihitung sekaligus untuk semua anime
+        return [
+            (latest_animes[pos], similarity)
+            for pos, similarity in similarity_engine.recommend(selected_positions[0], n_recommendations)
+        ]
+
+    return response_cache.get_or_compute('recommend', selected_anime, compute, k=n_recommendations,
+                                         version=response_version)
+
+# Satu penerjemah (cache SQLite + thread pool) untuk semua sesi
+@st.cache_resource
+def get_synopsis_translator() -> SynopsisTranslator:
+    """Membuat penerjemah sinopsis bersama dengan cache terjemahan di disk"""
+    return SynopsisTranslator()
 
-    return recommendations
+synopsis_translator = get_synopsis_translator()
 
+def prefetch_synopses(animes: List[dict]):
+    """Menerjemahkan sinopsis satu halaman di latar belakang ke bahasa default pilihan sinopsis"""
+    synopsis_translator.prefetch([anime.get('synopsis') for anime in animes], DEFAULT_SYNOPSIS_LANGUAGE)
+
+@timed('translate_synopsis')
 def translate_synopsis(synopsis: str, target_language: str) -> str:
     """Fungsi untuk menerjemahkan sinopsis berdasarkan bahasa target"""
     if target_language == 'en':
         return synopsis # Kembalikan sinopsis asli jika target bahasa Inggris
     try:
-        # translated = GoogleTranslator(source='auto', target=target_language).translate(synopsis)
-        # Ganti dengan kode terjemahan jika target bukan 'en'
-        if target_language in ['id', 'ja', 'zh-CN']: # Tambahkan 'ja' dan 'zh-CN'
-             translated = GoogleTranslator(source='auto', target=target_language).translate(synopsis) # Gunakan target_language dari parameter
-             return translated
-        else:
-             # Jika target bahasa lain yang tidak ditangani, kembalikan asli saja
-             return synopsis
+        # Hanya 'id', 'ja' dan 'zh-CN' yang diterjemahkan; hasil diambil dari cache jika ada
+        return synopsis_translator.translate(synopsis, target_language)
 
     except Exception as e:
         st.error(f"Terjadi kesalahan saat menerjemahkan sinopsis: {str(e)}")
@@ -399,28 +289,19 @@ def translate_synopsis(synopsis: str, target_language: str) -> str:
 tabs = st.tabs(["🏠 Beranda", "🔍 Pencarian", "⭐ Top Anime"])
 
 # Tab Beranda
-with tabs[0]:
+with tabs[0], timed('render_home'):
     st.markdown("<h2 style='text-align: center; margin-bottom: 2rem;'>📺 Anime Terpopuler</h2>", unsafe_allow_html=True)
     
-    # Muat ulasan
-    reviews = load_reviews()
-    
-    # Hitung jumlah ulasan untuk setiap anime
-    anime_review_counts = {name: len(reviews.get(name, [])) for name in [a['name'] for a in latest_animes]}
-    
-    # Urutkan daftar anime berdasarkan jumlah ulasan (terbanyak ke tersedikit)
-    # Filter hanya anime dengan ulasan (jumlah ulasan > 0)
-    sorted_anime_by_reviews = sorted(
-        [anime for anime in latest_animes if anime_review_counts.get(anime['name'], 0) > 0],
-        key=lambda x: anime_review_counts.get(x['name'], 0),
-        reverse=True
-    )
+    # Anime dengan ulasan terbanyak dibaca dari tabel agregat yang sudah terurut,
+    # hanya judul yang ada di katalog saat ini
+    sorted_anime_by_reviews = most_reviewed_animes(6)
     
     # Tampilkan 6 anime teratas dengan ulasan terbanyak
     # Gunakan daftar yang sudah diurutkan
+    prefetch_synopses([anime for anime, _ in sorted_anime_by_reviews])
     cols = st.columns(3)
     # Ubah loop untuk menggunakan sorted_anime_by_reviews
-    for idx, anime in enumerate(sorted_anime_by_reviews[:6]):
+    for idx, (anime, anime_review_stats) in enumerate(sorted_anime_by_reviews):
         with cols[idx % 3]:
             with st.container():
                 st.markdown(f"""
@@ -462,10 +343,11 @@ with tabs[0]:
                     st.write(translate_synopsis(synopsis_text, lang_code))
                 
                 # ====== Fitur Ulasan & Komentar ======
-                reviews = load_reviews()
-                anime_reviews = reviews.get(anime['name'], [])
+                anime_reviews = review_store.reviews_for(anime['name'])
                 review_count = len(anime_reviews)
                 review_title = f"💬 Ulasan{f' ({review_count})' if review_count > 0 else ''}"
+                if anime_review_stats['average_rating'] is not None:
+                    review_title += f" • ⭐ {anime_review_stats['average_rating']:.1f}"
 
                 with st.expander(review_title):
                     if anime_reviews:
@@ -480,10 +362,7 @@ with tabs[0]:
                                 comment_text = st.text_area("Komentar", key=f"home_comment_text_{anime['name']}_{ridx}")
                                 submit_comment = st.form_submit_button("Kirim Komentar")
                                 if submit_comment and comment_user and comment_text:
-                                    if 'comments' not in review:
-                                        review['comments'] = []
-                                    review['comments'].append({"user": comment_user, "text": comment_text})
-                                    save_reviews(reviews)
+                                    review_store.add_comment(review['id'], comment_user, comment_text)
                                     st.success("Komentar berhasil ditambahkan!")
                                     st.rerun()
                     else:
@@ -500,9 +379,7 @@ with tabs[0]:
                         submit_review = st.form_submit_button("Kirim Ulasan")
                         if submit_review and user and review_text:
                             # Simpan ulasan dengan rating
-                            anime_reviews.append({"user": user, "text": review_text, "rating": rating, "comments": []})
-                            reviews[anime['name']] = anime_reviews
-                            save_reviews(reviews)
+                            review_store.add_review(anime['name'], user, review_text, rating)
                             st.success("Ulasan berhasil ditambahkan!")
                             st.rerun()
                 
@@ -545,21 +422,15 @@ with tabs[0]:
     )
     if selected_knn_anime:
         st.markdown("### 🔎 Lihat Rekomendasi Lainnya:", unsafe_allow_html=True)
-        # Ambil rekomendasi dan jarak dari KNN
-        features = anime_df[['rating', 'members']].copy()
-        knn = NearestNeighbors(n_neighbors=6)
-        knn.fit(features)
-        selected_index = anime_df[anime_df['name'].str.lower() == selected_knn_anime.lower()].index
-        if not selected_index.empty:
-            selected_features = features.iloc[selected_index[0]].values.reshape(1, -1)
-            distances, indices = knn.kneighbors(selected_features)
-            max_distance = distances[0][1:].max() if len(distances[0]) > 1 else 1.0
-            min_distance = distances[0][1:].min() if len(distances[0]) > 1 else 0.0
+        # Ambil rekomendasi dan jarak dari mesin KNN bersama (anime itu sendiri tidak ikut)
+        selected_pos = recommender.position(selected_knn_anime)
+        if selected_pos is not None:
+            indices, distances = recommender.kneighbors(selected_pos, 5)
+            max_distance = distances.max() if len(distances) > 0 else 1.0
+            min_distance = distances.min() if len(distances) > 0 else 0.0
             cols_knn = st.columns(3)
             shown = 0
-            for i, (idx, dist) in enumerate(zip(indices[0], distances[0])):
-                if idx == selected_index[0]:
-                    continue  # Lewati anime yang sama
+            for i, (idx, dist) in enumerate(zip(indices, distances)):
                 similarity = 1 - ((dist - min_distance) / (max_distance - min_distance + 1e-8))  # Normalisasi ke 0-1
                 similarity_percent = similarity * 100
                 anime = anime_df.iloc[idx].to_dict()
@@ -601,8 +472,7 @@ with tabs[0]:
                                         'zh-CN'
                             st.write(translate_synopsis(synopsis_text, lang_code))
                         # ====== Fitur Ulasan & Komentar ======
-                        reviews = load_reviews()
-                        anime_reviews = reviews.get(anime['name'], [])
+                        anime_reviews = review_store.reviews_for(anime['name'])
                         review_count = len(anime_reviews)
                         review_title = f"💬 Ulasan Pengguna{f' ({review_count})' if review_count > 0 else ''}"
                         with st.expander(review_title):
@@ -616,10 +486,7 @@ with tabs[0]:
                                         comment_text = st.text_area("Komentar", key=f"knn_comment_text_{shown}_{anime['name']}_{ridx}")
                                         submit_comment = st.form_submit_button("Kirim Komentar")
                                         if submit_comment and comment_user and comment_text:
-                                            if 'comments' not in review:
-                                                review['comments'] = []
-                                            review['comments'].append({"user": comment_user, "text": comment_text})
-                                            save_reviews(reviews)
+                                            review_store.add_comment(review['id'], comment_user, comment_text)
                                             st.success("Komentar berhasil ditambahkan!")
                                             st.rerun()
                             else:
@@ -631,9 +498,7 @@ with tabs[0]:
                                 rating = st.selectbox("Rating (1-10)", options=[1,2,3,4,5,6,7,8,9,10], key=f"knn_rating_{shown}_{anime['name']}")
                                 submit_review = st.form_submit_button("Kirim Ulasan")
                                 if submit_review and user and review_text:
-                                    anime_reviews.append({"user": user, "text": review_text, "rating": rating, "comments": []})
-                                    reviews[anime['name']] = anime_reviews
-                                    save_reviews(reviews)
+                                    review_store.add_review(anime['name'], user, review_text, rating)
                                     st.success("Ulasan berhasil ditambahkan!")
                                     st.rerun()
                 shown += 1
@@ -642,7 +507,7 @@ with tabs[0]:
     st.markdown("</div>", unsafe_allow_html=True) # Tutup div untuk tombol 'Lihat Rekomendasi Lainnya'
 
 # Tab Pencarian
-with tabs[1]:
+with tabs[1], timed('render_search'):
     st.markdown("<h2 style='text-align: center;'>🔍 Pencarian Anime</h2>", unsafe_allow_html=True)
     search_query = st.text_input("Cari Anime", placeholder="Masukkan judul, genre, atau kata kunci...", 
                                 help="Cari berdasarkan judul, genre, atau kata kunci dalam sinopsis")
@@ -652,6 +517,14 @@ with tabs[1]:
     
     if search_query:
         results = search_anime(search_query)
+
+        # Jika tidak ada yang cocok, coba judul yang mirip (toleran salah ketik)
+        if not results:
+            similar_titles = latest_title_index.similar(search_query, limit=6)
+            results = [latest_animes[pos] for pos, _ in similar_titles]
+            if results:
+                st.info(f"Tidak ada hasil persis untuk '{search_query}'. Mungkin maksud Anda: "
+                        f"{', '.join(anime['name'] for anime in results)}")
         
         # Filter hasil berdasarkan rating
         results = [anime for anime in results if anime['rating'] >= rating_filter]
@@ -659,10 +532,20 @@ with tabs[1]:
         if results:
             st.markdown(f"<p style='text-align: center; font-size: 1.2rem; color: #2d3436;'>Ditemukan {len(results)} hasil untuk '{search_query}' dengan rating >= {rating_filter}</p>", 
                        unsafe_allow_html=True)
+
+            # Paginasi hasil yang sudah diurutkan berdasarkan relevansi
+            total_pages = (len(results) + SEARCH_PAGE_SIZE - 1) // SEARCH_PAGE_SIZE
+            page = 1
+            if total_pages > 1:
+                page = st.number_input(f"Halaman (1-{total_pages})", min_value=1, max_value=total_pages, value=1, step=1)
+            page_start = (page - 1) * SEARCH_PAGE_SIZE
             
+            # Sinopsis halaman ini diterjemahkan paralel sebelum kartu ditampilkan
+            prefetch_synopses(results[page_start:page_start + SEARCH_PAGE_SIZE])
+
             # Tampilkan hasil pencarian dalam grid
             cols = st.columns(3)
-            for idx, anime in enumerate(results):
+            for idx, anime in enumerate(results[page_start:page_start + SEARCH_PAGE_SIZE], start=page_start):
                 with cols[idx % 3]:
                     with st.container():
                         st.markdown(f"""
@@ -704,8 +587,7 @@ with tabs[1]:
                             st.write(translate_synopsis(synopsis_text, lang_code))
                 
                         # ====== Fitur Ulasan & Komentar ======
-                        reviews = load_reviews()
-                        anime_reviews = reviews.get(anime['name'], [])
+                        anime_reviews = review_store.reviews_for(anime['name'])
                         review_count = len(anime_reviews)
                         review_title = f"💬 Ulasan Pengguna{f' ({review_count})' if review_count > 0 else ''}"
 
@@ -722,10 +604,7 @@ with tabs[1]:
                                         comment_text = st.text_area("Komentar", key=f"search_comment_text_{idx}_{anime['name']}_{ridx}")
                                         submit_comment = st.form_submit_button("Kirim Komentar")
                                         if submit_comment and comment_user and comment_text:
-                                            if 'comments' not in review:
-                                                review['comments'] = []
-                                            review['comments'].append({"user": comment_user, "text": comment_text})
-                                            save_reviews(reviews)
+                                            review_store.add_comment(review['id'], comment_user, comment_text)
                                             st.success("Komentar berhasil ditambahkan!")
                                             st.rerun()
                             else:
@@ -740,9 +619,7 @@ with tabs[1]:
                                 rating = st.selectbox("Rating (1-10)", options=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10], key=f"search_rating_{idx}_{anime['name']}")
                                 submit_review = st.form_submit_button("Kirim Ulasan")
                                 if submit_review and user and review_text:
-                                    anime_reviews.append({"user": user, "text": review_text, "rating": rating, "comments": []})
-                                    reviews[anime['name']] = anime_reviews
-                                    save_reviews(reviews)
+                                    review_store.add_review(anime['name'], user, review_text, rating)
                                     st.success("Ulasan berhasil ditambahkan!")
                                     st.rerun()
                         # ===============================================
@@ -778,10 +655,11 @@ with tabs[1]:
             st.warning("Tidak ditemukan anime yang sesuai dengan pencarian dan rating yang ditentukan.")
 
 # Tab Top Anime
-with tabs[2]:
+with tabs[2], timed('render_top'):
     st.markdown("<h2 style='text-align: center;'>⭐ Top Anime</h2>", unsafe_allow_html=True)
     
     # Tampilkan 20 anime teratas
+    prefetch_synopses(latest_animes[:20])
     for idx, anime in enumerate(latest_animes[:20]):
         with st.container():
             col1, col2 = st.columns([1, 2])
@@ -815,8 +693,7 @@ with tabs[2]:
                     st.write(translate_synopsis(synopsis_text, lang_code))
                 
                 # ====== Fitur Ulasan & Komentar ======
-                reviews = load_reviews()
-                anime_reviews = reviews.get(anime['name'], [])
+                anime_reviews = review_store.reviews_for(anime['name'])
                 review_count = len(anime_reviews)
                 review_title = f"💬 Ulasan Pengguna{f' ({review_count})' if review_count > 0 else ''}"
 
@@ -833,10 +710,7 @@ with tabs[2]:
                                 comment_text = st.text_area("Komentar", key=f"top_comment_text_{idx}_{anime['name']}_{ridx}")
                                 submit_comment = st.form_submit_button("Kirim Komentar")
                                 if submit_comment and comment_user and comment_text:
-                                    if 'comments' not in review:
-                                        review['comments'] = []
-                                    review['comments'].append({"user": comment_user, "text": comment_text})
-                                    save_reviews(reviews)
+                                    review_store.add_comment(review['id'], comment_user, comment_text)
                                     st.success("Komentar berhasil ditambahkan!")
                                     st.rerun()
                     else:
@@ -852,9 +726,7 @@ with tabs[2]:
                         rating = st.selectbox("Rating (1-10)", options=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10], key=f"top_rating_{idx}_{anime['name']}")
                         submit_review = st.form_submit_button("Kirim Ulasan")
                         if submit_review and user and review_text:
-                            anime_reviews.append({"user": user, "text": review_text, "rating": rating, "comments": []})
-                            reviews[anime['name']] = anime_reviews
-                            save_reviews(reviews)
+                            review_store.add_review(anime['name'], user, review_text, rating)
                             st.success("Ulasan berhasil ditambahkan!")
                             st.rerun()
                 
@@ -887,7 +759,7 @@ with tabs[2]:
                 st.markdown("</div>", unsafe_allow_html=True)
 
 # Sidebar yang lebih informatif
-with st.sidebar:
+with st.sidebar, timed('render_sidebar'):
     st.markdown("<h3 style='text-align: center;'>📊 Statistik Anime</h3>", unsafe_allow_html=True)
 
     # Statistik umum
@@ -922,6 +794,12 @@ with st.sidebar:
         })
         st.bar_chart(rating_df)
 
+# Waktu per tahap (aktif jika ANIME_METRICS=1)
+if metrics.is_enabled():
+    with st.sidebar.expander("⏱️ Waktu per tahap"):
+        st.dataframe(pd.DataFrame(metrics.summary()), hide_index=True)
+        st.code(metrics.render_prometheus(), language="text")
+
 # Footer yang lebih menarik
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,42 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from anime_recomendation import load_dataset
+
+DATA_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "anime.csv")
+
+
+def test_snapshot_roundtrip_keeps_rows_aligned_with_gaps_in_index(tmp_path):
+    csv_path = str(tmp_path / "anime.csv")
+    df = pd.read_csv(DATA_CSV).head(50)
+    # Baris tanpa rating dibuang saat pembersihan sehingga index punya celah
+    df.loc[[3, 17], 'rating'] = np.nan
+    df.to_csv(csv_path, index=False)
+
+    cold_df, cold_features = load_dataset(csv_path)
+    assert not cold_df.index.equals(pd.RangeIndex(len(cold_df)))
+    warm_df, warm_features = load_dataset(csv_path)
+
+    assert_frame_equal(warm_df, cold_df)
+    assert_frame_equal(warm_features, cold_features)
+
+
+def test_snapshot_roundtrip_naive_datetime(tmp_path):
+    from data_snapshot import load_snapshot, save_snapshot
+
+    csv_path = str(tmp_path / "anime.csv")
+    shutil.copy(DATA_CSV, csv_path)
+    df = pd.DataFrame({
+        'name': ['a', 'b', 'c'],
+        'aired_from': pd.to_datetime(['2020-01-01', None, '2023-05-06']),
+    }, index=[0, 2, 5])
+    features = pd.DataFrame({'rating': [0.1, 0.5, 0.9]})
+
+    save_snapshot(csv_path, df, features)
+    loaded_df, _ = load_snapshot(csv_path)
+
+    assert_frame_equal(loaded_df, df)
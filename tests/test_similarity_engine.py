@@ -0,0 +1,30 @@
+import numpy as np
+
+from similarity_engine import GenreSimilarityEngine
+
+
+def record(name, rating, anime_type, genres):
+    return {'name': name, 'rating': rating, 'type': anime_type, 'genres': genres}
+
+
+def test_update_matches_rebuilt_engine():
+    records = [
+        record('A', 8.0, 'TV', ['Action', 'Drama']),
+        record('B', 7.5, 'Movie', ['Action']),
+        record('C', 9.0, 'TV', ['Comedy']),
+        record('D', 6.5, 'OVA', ['Drama', 'Romance']),
+    ]
+    engine = GenreSimilarityEngine(records)
+
+    # 'B' dihapus, 'C' berubah (genre baru), 'E' ditambahkan, urutan berubah
+    new_records = [
+        records[3],
+        record('C', 8.2, 'ONA', ['Comedy', 'Isekai']),
+        records[0],
+        record('E', 7.0, 'TV', ['Action', 'Isekai']),
+    ]
+    updated = engine.update(new_records, np.array([2, -1, 1, 0]), dirty=[1])
+    rebuilt = GenreSimilarityEngine(new_records)
+
+    for position in range(len(new_records)):
+        assert updated.recommend(position, 3) == rebuilt.recommend(position, 3)
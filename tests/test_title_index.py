@@ -0,0 +1,41 @@
+from title_index import TitleIndex
+
+TITLES = ['Sousou no Frieren', 'Gintama', 'Naruto: Shippuuden', 'Naruto', 'One Piece', 'Kimi no Na wa.', 'Nana']
+
+
+def similar_names(query, limit=5):
+    index = TitleIndex(TITLES)
+    return [index.names[pos] for pos, _ in index.similar(query, limit=limit)]
+
+
+def test_similar_matches_typo_in_word_of_longer_title():
+    assert similar_names('frirenn')[0] == 'Sousou no Frieren'
+
+
+def test_similar_matches_one_edit_typo_on_short_title():
+    assert similar_names('gintma')[0] == 'Gintama'
+    assert similar_names('narto')[0] == 'Naruto'
+    assert similar_names('nena')[0] == 'Nana'
+
+
+def test_similar_ranks_closest_full_title_first():
+    assert similar_names('naruto')[:2] == ['Naruto', 'Naruto: Shippuuden']
+
+
+def test_similar_ignores_unrelated_query():
+    assert similar_names('xyzzy') == []
+
+
+def test_update_matches_rebuilt_index():
+    index = TitleIndex(TITLES)
+    # 'Gintama' dihapus, sisanya diurutkan ulang, dua judul baru di akhir
+    names = ['Naruto', 'Sousou no Frieren', 'One Piece', 'Nana', 'Kimi no Na wa.', 'Naruto: Shippuuden',
+             'Gintama.', 'Frieren Specials']
+    remap = [names.index(title) if title in names else -1 for title in TITLES]
+
+    updated, rebuilt = index.update(names, remap), TitleIndex(names)
+
+    for query in ['naruto', 'gintama', 'frieren', 'no', 'frirenn', 'Gintama.', 'one']:
+        assert updated.exact(query) == rebuilt.exact(query)
+        assert updated.contains(query).tolist() == rebuilt.contains(query).tolist()
+        assert updated.similar(query) == rebuilt.similar(query)
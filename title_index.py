@@ -0,0 +1,244 @@
+"""
+Indeks judul anime untuk pencarian exact dan substring tanpa memindai DataFrame.
+
+Indeks dibangun sekali saat data dimuat:
+
+- hash map dari judul yang dinormalisasi ke posisi baris (pencarian exact),
+- posting list trigram (3 karakter) ke posisi baris (pencarian substring).
+
+Query substring cukup mengiris posting list trigram-trigramnya lalu memverifikasi
+kandidat yang tersisa, bukan menjalankan `str.lower().str.contains` atas semua baris.
+
+Saat katalog berubah sebagian, `update` menurunkan indeks baru dengan memetakan
+ulang posisi judul lama; hanya judul baru yang dipecah menjadi trigram.
+
+Untuk judul yang salah ketik, `similar` memberi peringkat kandidat berdasarkan
+kemiripan trigram berpadding terhadap bagian judul seukuran query (seperti
+`word_similarity` di pg_trgm), sehingga "frirenn" tetap cocok dengan
+"Sousou no Frieren"; nilai seri diurutkan dengan Jaccard atas seluruh judul.
+Posting list fuzzy disimpan dalam layout CSR sehingga skor dihitung dengan
+beberapa operasi NumPy atas kandidat yang berbagi trigram saja.
+"""
+import re
+import logging
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NGRAM_SIZE = 3
+
+_WHITESPACE = re.compile(r'\s+')
+_WORD = re.compile(r'\w+')
+
+
+def normalize_title(title: str) -> str:
+    """Menormalisasi judul: huruf kecil, tanpa spasi di tepi, spasi tunggal."""
+    return _WHITESPACE.sub(' ', str(title).lower()).strip()
+
+
+# Skor minimum agar sebuah judul dianggap mirip dengan query
+DEFAULT_MIN_SIMILARITY = 0.3
+# Batas bawah skor minimum untuk query pendek (lihat `TitleIndex.similar`)
+SHORT_QUERY_MIN_SIMILARITY = 0.2
+
+
+def title_ngrams(text: str, n: int = NGRAM_SIZE) -> set:
+    """Mengembalikan himpunan n-gram karakter dari teks."""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def padded_ngrams(text: str, n: int = NGRAM_SIZE) -> set:
+    """N-gram per kata (tanpa tanda baca) dengan padding spasi agar kata pendek tetap punya n-gram."""
+    grams = set()
+    for word in _WORD.findall(str(text).lower()):
+        grams |= title_ngrams(f"{' ' * (n - 1)}{word} ", n)
+    return grams
+
+
+def _csr_postings(grams: np.ndarray, rows: np.ndarray, n_grams: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Posting list dalam layout CSR: posisi per trigram (terurut) dan pointer awal setiap trigram."""
+    order = np.lexsort((rows, grams))
+    ptr = np.zeros(n_grams + 1, dtype=np.int64)
+    np.cumsum(np.bincount(grams, minlength=n_grams), out=ptr[1:])
+    return rows[order], ptr
+
+
+def _build_postings(titles: Iterable[Tuple[int, set]], gram_ids: Optional[Dict[str, int]] = None,
+                    rows: Optional[np.ndarray] = None, ptr: Optional[np.ndarray] = None,
+                    remap: Optional[np.ndarray] = None) -> Tuple[Dict[str, int], np.ndarray, np.ndarray]:
+    """
+    Membangun posting list CSR dari pasangan (posisi, himpunan trigram).
+
+    Jika posting list lama diberikan, posisinya dipetakan ulang lewat `remap`
+    (-1 = dihapus) lalu digabung dengan judul-judul baru.
+    """
+    gram_ids = dict(gram_ids) if gram_ids is not None else {}
+    new_grams, new_rows = [], []
+    for pos, title_grams in titles:
+        for gram in title_grams:
+            new_grams.append(gram_ids.setdefault(gram, len(gram_ids)))
+            new_rows.append(pos)
+    grams = np.asarray(new_grams, dtype=np.int32)
+    positions = np.asarray(new_rows, dtype=np.int32)
+    if rows is not None:
+        old_grams = np.repeat(np.arange(len(ptr) - 1, dtype=np.int32), np.diff(ptr))
+        old_rows = remap[rows]
+        keep = old_rows >= 0
+        grams = np.concatenate([old_grams[keep], grams])
+        positions = np.concatenate([old_rows[keep].astype(np.int32), positions])
+    return (gram_ids,) + _csr_postings(grams, positions, len(gram_ids))
+
+
+class TitleIndex:
+    """Indeks judul untuk satu katalog; posisi mengikuti urutan baris katalog."""
+
+    def __init__(self, names: Iterable[str]):
+        self.names = [str(name) for name in names]
+        self._lowered = [name.lower() for name in self.names]
+
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+        for pos, lowered in enumerate(self._lowered):
+            self._exact[normalize_title(lowered)].append(pos)
+        self._exact = dict(self._exact)
+
+        self._gram_ids, self._gram_rows, self._gram_ptr = _build_postings(
+            (pos, title_ngrams(lowered)) for pos, lowered in enumerate(self._lowered))
+        # Posting list fuzzy: trigram berpadding per kata
+        fuzzy_grams = [padded_ngrams(lowered) for lowered in self._lowered]
+        self._fuzzy_ids, self._fuzzy_rows, self._fuzzy_ptr = _build_postings(enumerate(fuzzy_grams))
+        self._fuzzy_counts = np.fromiter(map(len, fuzzy_grams), dtype=np.int32, count=len(fuzzy_grams))
+        logger.info(f"Indeks judul dibangun untuk {len(self.names)} anime ({len(self._gram_ids)} trigram)")
+
+    def update(self, names: Sequence[str], remap: np.ndarray) -> 'TitleIndex':
+        """
+        Membuat indeks untuk daftar judul baru dari indeks ini tanpa memproses ulang judul lama.
+
+        Args:
+            names (Sequence[str]): Semua judul katalog baru, sesuai urutan barunya
+            remap (np.ndarray): Posisi baru setiap judul lama (-1 jika dihapus);
+                judul lama harus tetap sama di posisi barunya. Posisi baru yang
+                tidak dituju `remap` dianggap judul baru.
+
+        Returns:
+            TitleIndex: Indeks baru (indeks ini tidak diubah)
+        """
+        remap = np.asarray(remap, dtype=np.int64)
+        index = TitleIndex.__new__(TitleIndex)
+        index.names = [str(name) for name in names]
+        index._lowered = [name.lower() for name in index.names]
+
+        is_new = np.ones(len(index.names), dtype=bool)
+        is_new[remap[remap >= 0]] = False
+        added = np.flatnonzero(is_new).tolist()
+
+        index._exact = {}
+        for key, positions in self._exact.items():
+            kept = [int(remap[pos]) for pos in positions if remap[pos] >= 0]
+            if kept:
+                index._exact[key] = kept
+        for pos in added:
+            index._exact.setdefault(normalize_title(index._lowered[pos]), []).append(pos)
+        for positions in index._exact.values():
+            positions.sort()
+
+        index._gram_ids, index._gram_rows, index._gram_ptr = _build_postings(
+            ((pos, title_ngrams(index._lowered[pos])) for pos in added),
+            self._gram_ids, self._gram_rows, self._gram_ptr, remap)
+        added_fuzzy = [(pos, padded_ngrams(index._lowered[pos])) for pos in added]
+        index._fuzzy_ids, index._fuzzy_rows, index._fuzzy_ptr = _build_postings(
+            added_fuzzy, self._fuzzy_ids, self._fuzzy_rows, self._fuzzy_ptr, remap)
+        index._fuzzy_counts = np.zeros(len(index.names), dtype=np.int32)
+        kept = np.flatnonzero(remap >= 0)
+        index._fuzzy_counts[remap[kept]] = self._fuzzy_counts[kept]
+        for pos, title_grams in added_fuzzy:
+            index._fuzzy_counts[pos] = len(title_grams)
+        logger.info(f"Indeks judul diperbarui: {len(self.names) - len(kept)} dihapus, {len(added)} ditambahkan")
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def exact(self, query: str) -> List[int]:
+        """Posisi baris yang judulnya sama persis dengan query (case insensitive)."""
+        return list(self._exact.get(normalize_title(query), []))
+
+    def contains(self, query: str) -> np.ndarray:
+        """
+        Posisi baris yang judulnya mengandung query (case insensitive), terurut.
+
+        Args:
+            query (str): Potongan judul yang dicari
+
+        Returns:
+            np.ndarray: Posisi baris yang cocok sesuai urutan katalog
+        """
+        query = query.lower()
+        if len(query) < NGRAM_SIZE:
+            # Query terlalu pendek untuk trigram, periksa judul yang sudah di-lowercase
+            return np.asarray([pos for pos, name in enumerate(self._lowered) if query in name], dtype=np.int32)
+
+        grams = title_ngrams(query)
+        postings = []
+        for gram in grams:
+            gram_id = self._gram_ids.get(gram)
+            if gram_id is None:
+                return np.empty(0, dtype=np.int32)
+            postings.append(self._gram_rows[self._gram_ptr[gram_id]:self._gram_ptr[gram_id + 1]])
+
+        # Iris dari posting list terpendek agar kandidat cepat menyusut
+        postings.sort(key=len)
+        candidates = postings[0]
+        for positions in postings[1:]:
+            candidates = np.intersect1d(candidates, positions, assume_unique=True)
+            if len(candidates) == 0:
+                return candidates
+
+        # Trigram yang sama belum menjamin urutannya sama, verifikasi kandidat
+        return np.asarray([pos for pos in candidates.tolist() if query in self._lowered[pos]], dtype=np.int32)
+
+    def similar(self, query: str, limit: int = 5,
+                min_score: float = DEFAULT_MIN_SIMILARITY) -> List[Tuple[int, float]]:
+        """
+        Mencari judul yang paling mirip dengan query (toleran terhadap salah ketik).
+
+        Skor adalah Jaccard antara trigram query dan bagian judul seukuran query
+        (trigram bersama / (|query| + min(|judul|, |query|) - trigram bersama)),
+        sehingga judul panjang tidak tenggelam hanya karena kata-kata lainnya.
+        Satu huruf yang salah menghilangkan hingga 3 trigram, jadi untuk query
+        pendek skor minimum diturunkan ke skor satu substitusi, (n - 3) / (n + 3)
+        untuk n trigram query, tetapi tidak di bawah `SHORT_QUERY_MIN_SIMILARITY`.
+
+        Args:
+            query (str): Judul yang dicari, boleh salah ketik
+            limit (int): Jumlah kandidat maksimum
+            min_score (float): Skor kemiripan minimum (0-1)
+
+        Returns:
+            List[Tuple[int, float]]: Pasangan (posisi baris, skor) dari yang paling mirip
+        """
+        query_grams = padded_ngrams(query)
+        gram_ids = [self._fuzzy_ids[gram] for gram in query_grams if gram in self._fuzzy_ids]
+        if not gram_ids or limit <= 0:
+            return []
+
+        # Hitung jumlah trigram bersama hanya untuk judul yang muncul di posting list
+        rows = np.concatenate([self._fuzzy_rows[self._fuzzy_ptr[g]:self._fuzzy_ptr[g + 1]] for g in gram_ids])
+        shared = np.bincount(rows, minlength=len(self.names))
+
+        n_grams = len(query_grams)
+        min_score = min(min_score, max((n_grams - 3) / (n_grams + 3), SHORT_QUERY_MIN_SIMILARITY))
+        # Skor <= shared / |query|, jadi judul dengan trigram bersama terlalu sedikit bisa dilewati
+        candidates = np.flatnonzero(shared >= min_score * n_grams)
+        shared = shared[candidates]
+        counts = self._fuzzy_counts[candidates]
+        scores = shared / (n_grams + np.minimum(counts, n_grams) - shared)
+
+        keep = scores >= min_score
+        candidates, scores, shared, counts = candidates[keep], scores[keep], shared[keep], counts[keep]
+        # Seri diurutkan dengan Jaccard atas seluruh judul (judul yang lebih pas lebih dulu)
+        full_scores = shared / (n_grams + counts - shared)
+        order = np.lexsort((candidates, -full_scores, -scores))[:limit]
+        return [(int(candidates[i]), float(scores[i])) for i in order]
@@ -0,0 +1,232 @@
+"""
+Cache terjemahan sinopsis yang persisten dan terjemahan paralel per halaman.
+
+Hasil terjemahan disimpan di SQLite dengan kunci (hash teks, bahasa target)
+sehingga sinopsis yang sama tidak diterjemahkan ulang untuk setiap pengguna
+dan setiap rerun. Entri yang paling lama tidak dipakai dibuang (LRU) jika
+jumlahnya melewati batas.
+
+Penerjemah bisa diganti lewat variabel lingkungan `SYNOPSIS_TRANSLATOR`:
+`google` (default, memakai deep_translator) atau `echo` (penerjemah lokal
+tiruan untuk pengujian tanpa jaringan).
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TRANSLATION_CACHE_PATH = os.environ.get(
+    "TRANSLATION_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "translations.sqlite3")
+)
+SYNOPSIS_TRANSLATOR = os.environ.get("SYNOPSIS_TRANSLATOR", "google")
+
+# Bahasa yang diterjemahkan; bahasa lain (termasuk 'en') dikembalikan apa adanya
+SUPPORTED_LANGUAGES = ('id', 'ja', 'zh-CN')
+
+DEFAULT_MAX_ENTRIES = 20000
+DEFAULT_WORKERS = 4
+# Pemangkasan LRU dijalankan setiap sekian kali penyimpanan
+EVICT_EVERY = 100
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class GoogleTranslatorBackend:
+    """Penerjemah Google lewat deep_translator."""
+
+    def translate(self, text: str, target_language: str) -> str:
+        from deep_translator import GoogleTranslator
+        return GoogleTranslator(source='auto', target=target_language).translate(text)
+
+
+class EchoTranslator:
+    """Penerjemah lokal tiruan: menandai teks dengan bahasa target (untuk pengujian)."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+
+    def translate(self, text: str, target_language: str) -> str:
+        if self.delay:
+            time.sleep(self.delay)
+        return f"[{target_language}] {text}"
+
+
+def get_translator(name: str = None):
+    """Membuat penerjemah sesuai nama (`google` atau `echo`)."""
+    name = (name or SYNOPSIS_TRANSLATOR).lower()
+    if name == 'echo':
+        return EchoTranslator()
+    if name == 'google':
+        return GoogleTranslatorBackend()
+    raise ValueError(f"Penerjemah tidak dikenal: {name}")
+
+
+class TranslationCache:
+    """Cache terjemahan di SQLite dengan kunci (hash teks, bahasa) dan pembuangan LRU."""
+
+    def __init__(self, path: str = TRANSLATION_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        if path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = threading.Lock()
+        self._puts = 0
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                " text_hash TEXT NOT NULL,"
+                " language TEXT NOT NULL,"
+                " translated TEXT NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " PRIMARY KEY (text_hash, language))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS translations_last_used ON translations (last_used)")
+
+    def get_many(self, keys: List[Tuple[str, str]]) -> Dict[Tuple[str, str], str]:
+        """Terjemahan yang tersimpan untuk daftar kunci (hash teks, bahasa)."""
+        found = {}
+        if not keys:
+            return found
+        now = time.time()
+        with self._lock:
+            for hash_value, language in keys:
+                row = self._conn.execute(
+                    "SELECT translated FROM translations WHERE text_hash = ? AND language = ?",
+                    (hash_value, language)
+                ).fetchone()
+                if row is not None:
+                    found[(hash_value, language)] = row[0]
+            if found:
+                self._conn.executemany(
+                    "UPDATE translations SET last_used = ? WHERE text_hash = ? AND language = ?",
+                    [(now, hash_value, language) for hash_value, language in found]
+                )
+        return found
+
+    def get(self, text: str, language: str) -> Optional[str]:
+        key = (text_hash(text), language)
+        return self.get_many([key]).get(key)
+
+    def put(self, text: str, language: str, translated: str):
+        """Menyimpan satu terjemahan; sesekali memangkas entri yang paling lama tidak dipakai."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO translations (text_hash, language, translated, last_used) VALUES (?, ?, ?, ?)",
+                (text_hash(text), language, translated, time.time())
+            )
+            self._puts += 1
+            if self._puts % EVICT_EVERY == 0:
+                self._evict()
+
+    def _evict(self):
+        self._conn.execute(
+            "DELETE FROM translations WHERE rowid IN ("
+            " SELECT rowid FROM translations ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,)
+        )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._evict()
+            self._conn.close()
+
+
+class SynopsisTranslator:
+    """
+    Menerjemahkan sinopsis lewat cache, satu per satu atau per halaman secara paralel.
+
+    Teks yang sedang diterjemahkan di latar belakang tidak diterjemahkan dua kali:
+    pemanggil berikutnya menunggu hasil yang sama.
+    """
+
+    def __init__(self, cache: Optional[TranslationCache] = None, translator=None,
+                 workers: int = DEFAULT_WORKERS):
+        self.cache = cache if cache is not None else TranslationCache()
+        self.translator = translator if translator is not None else get_translator()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+        self._pending: Dict[Tuple[str, str], Future] = {}
+        # Reentrant: callback future yang sudah selesai dijalankan di thread pemanggil
+        self._lock = threading.RLock()
+
+    def _translate_and_store(self, text: str, language: str) -> str:
+        translated = self.translator.translate(text, language)
+        self.cache.put(text, language, translated)
+        return translated
+
+    def _submit(self, text: str, language: str, key: Tuple[str, str]) -> Future:
+        """Future untuk terjemahan teks, memakai yang sedang berjalan jika ada."""
+        with self._lock:
+            future = self._pending.get(key)
+            if future is None:
+                future = self._executor.submit(self._translate_and_store, text, language)
+                self._pending[key] = future
+                future.add_done_callback(lambda _, key=key: self._forget(key))
+            return future
+
+    def _forget(self, key: Tuple[str, str]):
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def translate(self, text: str, target_language: str) -> str:
+        """
+        Menerjemahkan satu teks (hasil diambil dari cache jika ada).
+
+        Raises:
+            Exception: Jika penerjemah gagal
+        """
+        if target_language not in SUPPORTED_LANGUAGES or not text:
+            return text
+        cached = self.cache.get(text, target_language)
+        if cached is not None:
+            return cached
+        return self._submit(text, target_language, (text_hash(text), target_language)).result()
+
+    def _schedule(self, texts: Iterable[str], target_language: str) -> Tuple[Dict[str, str], Dict[str, Future]]:
+        """Terjemahan yang sudah ada di cache, dan future untuk teks sisanya."""
+        keys = {text: (text_hash(text), target_language) for text in dict.fromkeys(texts) if text}
+        found = self.cache.get_many(list(keys.values()))
+        cached = {text: found[key] for text, key in keys.items() if key in found}
+        futures = {
+            text: self._submit(text, target_language, key)
+            for text, key in keys.items() if key not in found
+        }
+        return cached, futures
+
+    def prefetch(self, texts: Iterable[str], target_language: str) -> int:
+        """Menerjemahkan teks di latar belakang tanpa menunggu; mengembalikan jumlah yang dijadwalkan."""
+        if target_language not in SUPPORTED_LANGUAGES:
+            return 0
+        _, futures = self._schedule(texts, target_language)
+        return len(futures)
+
+    def translate_many(self, texts: List[str], target_language: str) -> List[str]:
+        """
+        Menerjemahkan banyak teks sekaligus secara paralel.
+
+        Teks yang gagal diterjemahkan dikembalikan apa adanya.
+        """
+        if target_language not in SUPPORTED_LANGUAGES:
+            return list(texts)
+        results, futures = self._schedule(texts, target_language)
+        for text, future in futures.items():
+            try:
+                results[text] = future.result()
+            except Exception as e:
+                logger.warning(f"Gagal menerjemahkan sinopsis: {str(e)}")
+                results[text] = text
+        return [results.get(text, text) for text in texts]